@@ -0,0 +1,365 @@
+import asyncio
+import time
+from collections import Counter, deque
+from contextlib import asynccontextmanager, contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from threading import Event, Lock
+from typing import Any, AsyncIterator, ContextManager, Iterator, Self
+
+from django.conf import settings
+
+from decyphr import deadlines, stats
+from decyphr.exceptions import DeadlineExceededException, ProviderUnavailableException
+from decyphr.priority import BULK, INTERACTIVE, LANE_WEIGHTS, priority_class
+
+# The providers the current request holds a slot for, so that a nested call to the
+# same provider doesn't wait on a slot it already holds
+admitted_providers: ContextVar[frozenset[str]] = ContextVar(
+    "admitted_providers", default=frozenset()
+)
+
+
+@dataclass
+class Waiter:
+    lane: str
+    finish_tag: float
+    event: Event = field(default_factory=Event)
+
+
+class ProviderPool:
+    """Provider Pool
+
+    Lets up to `limit` calls to a provider run at once, with up to `max_queue` more
+    waiting for a slot in each lane. `reserve` of the slots are kept for the
+    interactive lane, so bulk calls never take more than `limit - reserve`.
+
+    When both lanes have calls waiting, a free slot goes to them by weighted fair
+    queuing: each waiting call is tagged with the virtual time at which its lane
+    would be done with it, given the lane's weight in `LANE_WEIGHTS`, and the slot
+    goes to the call with the earliest tag that its lane is allowed to run. A
+    finished call hands its slot straight to the next call.
+    """
+
+    name: str
+    limit: int
+    reserve: int
+    max_queue: int
+    lock: Lock
+    active: Counter
+    queues: dict[str, deque[Waiter]]
+    virtual_time: float
+    last_tags: dict[str, float]
+    admitted: Counter
+    rejected: Counter
+    timed_out: Counter
+    wait_time: float
+
+    def __init__(
+        self: Self, name: str, limit: int, max_queue: int, reserve: int = 0
+    ) -> None:
+        self.name = name
+        self.limit = limit
+        self.reserve = min(reserve, limit - 1)
+        self.max_queue = max_queue
+        self.lock = Lock()
+        self.active = Counter()
+        self.queues = {lane: deque() for lane in LANE_WEIGHTS}
+        self.virtual_time = 0.0
+        self.last_tags = {lane: 0.0 for lane in LANE_WEIGHTS}
+        self.admitted = Counter()
+        self.rejected = Counter()
+        self.timed_out = Counter()
+        self.wait_time = 0.0
+
+    def can_run(self: Self, lane: str) -> bool:
+        if self.active.total() >= self.limit:
+            return False
+        return lane == INTERACTIVE or self.active[BULK] < self.limit - self.reserve
+
+    def next_waiter(self: Self) -> Waiter | None:
+        heads = [
+            queue[0]
+            for lane, queue in self.queues.items()
+            if queue and self.can_run(lane)
+        ]
+        return min(heads, key=lambda waiter: waiter.finish_tag, default=None)
+
+    def dispatch(self: Self) -> None:
+        # Called with the lock held whenever a slot may have become free
+        while (waiter := self.next_waiter()) is not None:
+            self.queues[waiter.lane].popleft()
+            self.active[waiter.lane] += 1
+            self.virtual_time = waiter.finish_tag
+            waiter.event.set()
+
+    def try_acquire(self: Self, lane: str) -> Waiter | None:
+        """Try acquire
+
+        Take a slot if one is free and no call in the lane is waiting, or join the
+        lane's queue
+
+        Args:
+            lane (str): `interactive` or `bulk`
+
+        Returns:
+            Waiter | None: `None` if a slot was taken, or the place in the queue,
+                whose event is set when a slot is handed over
+
+        Raises:
+            ProviderUnavailableException if the lane's queue is full
+        """
+        with self.lock:
+            if not self.queues[lane] and self.can_run(lane):
+                self.active[lane] += 1
+                self.admitted[lane] += 1
+                return None
+
+            if len(self.queues[lane]) >= self.max_queue:
+                self.rejected[lane] += 1
+                raise ProviderUnavailableException(
+                    f"Too many requests are waiting for {self.name}.", 1
+                )
+
+            finish_tag = (
+                max(self.virtual_time, self.last_tags[lane]) + 1 / LANE_WEIGHTS[lane]
+            )
+            self.last_tags[lane] = finish_tag
+            waiter = Waiter(lane, finish_tag)
+            self.queues[lane].append(waiter)
+            return waiter
+
+    def finish_wait(
+        self: Self, waiter: Waiter, waited: float, deadline_bound: bool = False
+    ) -> None:
+        """Finish wait
+
+        Take the slot handed to the waiter, or leave the queue if none was
+
+        Args:
+            waiter (Waiter): The place in the queue returned by `try_acquire`
+            waited (float): How long the caller waited, in seconds
+            deadline_bound (bool): Whether the wait ended at the request's deadline
+                rather than the queue timeout
+
+        Raises:
+            ProviderUnavailableException if no slot was handed over in time
+            DeadlineExceededException if the request's deadline passed first
+        """
+        with self.lock:
+            self.wait_time += waited
+            # A slot may have been handed over between the wait ending and the lock
+            # being taken
+            if not waiter.event.is_set():
+                self.queues[waiter.lane].remove(waiter)
+                self.timed_out[waiter.lane] += 1
+                if deadline_bound:
+                    raise DeadlineExceededException("admission")
+                raise ProviderUnavailableException(
+                    f"Timed out waiting for {self.name}.", 1
+                )
+            self.admitted[waiter.lane] += 1
+
+    def acquire(
+        self: Self, lane: str, timeout: float, deadline_bound: bool = False
+    ) -> None:
+        waiter = self.try_acquire(lane)
+        if waiter is not None:
+            started = time.monotonic()
+            waiter.event.wait(timeout)
+            self.finish_wait(waiter, time.monotonic() - started, deadline_bound)
+
+    async def aacquire(
+        self: Self, lane: str, timeout: float, deadline_bound: bool = False
+    ) -> None:
+        waiter = self.try_acquire(lane)
+        if waiter is not None:
+            # Waited for off the event loop, and only when there is a queue
+            started = time.monotonic()
+            try:
+                await asyncio.to_thread(waiter.event.wait, timeout)
+            except asyncio.CancelledError:
+                self.abandon(waiter)
+                raise
+            self.finish_wait(waiter, time.monotonic() - started, deadline_bound)
+
+    def abandon(self: Self, waiter: Waiter) -> None:
+        # Give up the place in the queue, or the slot if one was handed over
+        with self.lock:
+            if waiter.event.is_set():
+                handed_over = True
+            else:
+                self.queues[waiter.lane].remove(waiter)
+                handed_over = False
+        if handed_over:
+            self.release(waiter.lane)
+
+    def release(self: Self, lane: str) -> None:
+        with self.lock:
+            self.active[lane] -= 1
+            self.dispatch()
+
+    def stats(self: Self) -> dict[str, Any]:
+        with self.lock:
+            admitted = self.admitted.total()
+            timed_out = self.timed_out.total()
+            waits = admitted + timed_out
+            return {
+                "limit": self.limit,
+                "reserve": self.reserve,
+                "active": self.active.total(),
+                "queue_depth": sum(len(queue) for queue in self.queues.values()),
+                "admitted": admitted,
+                "rejected": self.rejected.total(),
+                "timed_out": timed_out,
+                "mean_wait_ms": round(self.wait_time / waits * 1000, 2) if waits else 0,
+                "lanes": {
+                    lane: {
+                        "active": self.active[lane],
+                        "queue_depth": len(self.queues[lane]),
+                        "admitted": self.admitted[lane],
+                        "rejected": self.rejected[lane],
+                        "timed_out": self.timed_out[lane],
+                    }
+                    for lane in LANE_WEIGHTS
+                },
+            }
+
+
+class Admission:
+    """Admission
+
+    Bounds the number of calls each provider has in flight in this process, so that
+    a slow or overloaded provider can't tie up every worker thread and starve the
+    requests that don't need it. Calls over `concurrency` wait for up to
+    `queue_timeout` seconds in a queue of up to `queue_size`, and calls that find
+    the queue full are refused straight away with a `ProviderUnavailableException`,
+    which the views turn into a 503 with a `Retry-After` header.
+
+    Calls queue in the lane of the request's priority class, with `reserve` slots
+    kept for interactive requests (see `ProviderPool`).
+
+    Providers are named like the rate limits, e.g. `translate.amazon`. A
+    `concurrency` of 0 turns admission control off.
+    """
+
+    concurrency: int
+    queue_size: int
+    queue_timeout: float
+    reserve: int
+    pools: dict[str, ProviderPool]
+    lock: Lock
+
+    def __init__(
+        self: Self,
+        concurrency: int,
+        queue_size: int,
+        queue_timeout: float,
+        reserve: int = 0,
+    ) -> None:
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.reserve = reserve
+        self.pools = {}
+        self.lock = Lock()
+
+    def get_pool(self: Self, name: str) -> ProviderPool:
+        with self.lock:
+            if name not in self.pools:
+                self.pools[name] = ProviderPool(
+                    name, self.concurrency, self.queue_size, self.reserve
+                )
+            return self.pools[name]
+
+    def get_timeout(self: Self) -> tuple[float, bool]:
+        # Calls wait no longer than the time left before the request's deadline
+        left = deadlines.check("admission")
+        if left is None or left >= self.queue_timeout:
+            return self.queue_timeout, False
+        return left, True
+
+    def is_admitted(self: Self, name: str) -> bool:
+        return not self.concurrency or name in admitted_providers.get()
+
+    @contextmanager
+    def admit(self: Self, name: str) -> Iterator[None]:
+        """Admit
+
+        Hold a slot for the provider for the duration of the block
+
+        Args:
+            name (str): The name of the provider, e.g. `translate.amazon`
+
+        Raises:
+            ProviderUnavailableException if the queue is full, or no slot became free
+                within `queue_timeout`
+            DeadlineExceededException if the request's deadline passed while waiting
+        """
+        if self.is_admitted(name):
+            yield
+            return
+
+        lane = priority_class.get()
+        pool = self.get_pool(name)
+        pool.acquire(lane, *self.get_timeout())
+        token = admitted_providers.set(admitted_providers.get() | {name})
+        try:
+            yield
+        finally:
+            admitted_providers.reset(token)
+            pool.release(lane)
+
+    def maybe_admit(self: Self, name: str | None) -> ContextManager[None]:
+        """Maybe admit
+
+        `admit` for the named provider, or nothing if no provider is named, for
+        calls whose caller may already hold the slot
+
+        Args:
+            name (str | None): The name of the provider, e.g. `translate.amazon`
+        """
+        return nullcontext() if name is None else self.admit(name)
+
+    @asynccontextmanager
+    async def aadmit(self: Self, name: str) -> AsyncIterator[None]:
+        """Admit
+
+        Async equivalent of `admit`
+        """
+        if self.is_admitted(name):
+            yield
+            return
+
+        lane = priority_class.get()
+        pool = self.get_pool(name)
+        await pool.aacquire(lane, *self.get_timeout())
+        token = admitted_providers.set(admitted_providers.get() | {name})
+        try:
+            yield
+        finally:
+            admitted_providers.reset(token)
+            pool.release(lane)
+
+    def stats(self: Self) -> dict[str, dict[str, Any]]:
+        """Stats
+
+        Returns:
+            dict[str, dict[str, Any]]: For each provider, the calls in flight and
+                waiting, and how many calls were admitted, refused because the queue
+                was full, or timed out waiting, with the mean wait in milliseconds,
+                in total and per lane
+        """
+        with self.lock:
+            pools = list(self.pools.values())
+        return {pool.name: pool.stats() for pool in pools}
+
+
+admission = Admission(
+    concurrency=settings.PROVIDER_CONCURRENCY,
+    queue_size=settings.PROVIDER_QUEUE_SIZE,
+    queue_timeout=settings.PROVIDER_QUEUE_TIMEOUT,
+    reserve=settings.PROVIDER_INTERACTIVE_RESERVE,
+)
+
+stats.register("admission", admission.stats)
@@ -0,0 +1,268 @@
+# type: ignore
+import os
+from datetime import datetime, timezone
+from threading import Event, RLock, Thread
+from typing import Any, Callable, Hashable, Self
+
+from boto3 import client
+from botocore.config import Config
+from deepl import Translator
+from deepl.http_client import HttpClient
+from django.conf import settings
+from google.auth.transport.requests import AuthorizedSession, Request
+from google.oauth2 import service_account
+
+from decyphr import deadlines
+
+# How long before the Google access token expires that it should be refreshed
+CREDENTIAL_REFRESH_MARGIN = 300
+
+# How long to wait before trying again if a background refresh fails
+CREDENTIAL_RETRY_INTERVAL = 30
+
+
+class CredentialRefresher:
+    """Credential Refresher
+
+    Keeps a set of Google credentials valid by refreshing them on a daemon thread
+    shortly before they expire, so that no request has to block on a token refresh.
+    """
+
+    credentials: service_account.Credentials
+    stopped: Event
+    thread: Thread
+
+    def __init__(self: Self, credentials: service_account.Credentials) -> None:
+        self.credentials = credentials
+        self.stopped = Event()
+        self.thread = Thread(
+            target=self.run, name="google-credential-refresher", daemon=True
+        )
+
+    def start(self: Self) -> None:
+        self.thread.start()
+
+    def stop(self: Self) -> None:
+        self.stopped.set()
+
+    def seconds_until_refresh(self: Self) -> float:
+        """Seconds until refresh
+
+        Returns:
+            float: How long to wait before the next refresh. Credentials that have
+                never been refreshed are refreshed straight away
+        """
+        if not self.credentials.valid or self.credentials.expiry is None:
+            return 0
+
+        expiry = self.credentials.expiry.replace(tzinfo=timezone.utc)
+        remaining = (expiry - datetime.now(timezone.utc)).total_seconds()
+        return max(remaining - CREDENTIAL_REFRESH_MARGIN, 0)
+
+    def run(self: Self) -> None:
+        while not self.stopped.wait(self.seconds_until_refresh()):
+            try:
+                self.credentials.refresh(Request())
+            except Exception:
+                self.stopped.wait(CREDENTIAL_RETRY_INTERVAL)
+
+
+class ClientRegistry:
+    """Client Registry
+
+    Holds a single instance of each provider SDK client for the lifetime of the
+    process. Clients are built lazily on first use and shared between threads so
+    that their HTTP connection pools and gRPC channels are reused across requests.
+
+    Connections and background threads do not survive a fork, so the registry is
+    emptied in the child process and the clients are rebuilt on their next use.
+    """
+
+    clients: dict[Hashable, Any]
+    refreshers: list[CredentialRefresher]
+    lock: RLock
+
+    def __init__(self: Self) -> None:
+        self.clients = {}
+        self.refreshers = []
+        self.lock = RLock()
+        os.register_at_fork(after_in_child=self.reset)
+
+    def get(self: Self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """Get
+
+        Get the client stored against the key, building it with the factory if this
+        is the first time it has been requested by this process.
+
+        Args:
+            key (Hashable): Identifies the client
+            factory (Callable[[], Any]): Builds the client
+
+        Returns:
+            Any: The client
+        """
+        try:
+            return self.clients[key]
+        except KeyError:
+            pass
+
+        with self.lock:
+            if key not in self.clients:
+                self.clients[key] = factory()
+            return self.clients[key]
+
+    def add_refresher(self: Self, refresher: CredentialRefresher) -> None:
+        with self.lock:
+            self.refreshers.append(refresher)
+        refresher.start()
+
+    def reset(self: Self) -> None:
+        """Reset
+
+        Drop every client so that they are rebuilt on their next use. The lock is
+        replaced rather than acquired as it may have been held by another thread at
+        the time of a fork.
+        """
+        for refresher in self.refreshers:
+            refresher.stop()
+
+        self.lock = RLock()
+        self.clients = {}
+        self.refreshers = []
+
+
+registry = ClientRegistry()
+
+
+def get_boto3_client(
+    service_name: str,
+    region: str,
+    aws_access_key_id: str,
+    aws_secret_access_key: str,
+    timeout: float | None = None,
+) -> Any:
+    """Get boto3 client
+
+    boto3 clients are thread safe and keep a pool of keep-alive connections, so one
+    client is shared per service and region.
+
+    boto3 only takes timeouts and retries when a client is built, so calls with a
+    deadline share a client per tier of time left, which times out within that tier
+    and only retries if there is time for it.
+
+    Args:
+        service_name (str): The AWS service, e.g. `translate`
+        region (str): The AWS region
+        aws_access_key_id (str): The access key ID
+        aws_secret_access_key (str): The secret access key
+        timeout (float): The time left for the call, if it has a deadline
+
+    Returns:
+        Any: The boto3 client
+    """
+    tier = None if timeout is None else deadlines.timeout_tier(timeout)
+    timeouts = (
+        {}
+        if tier is None
+        else {
+            "connect_timeout": tier,
+            "read_timeout": tier,
+            "retries": {"total_max_attempts": deadlines.max_attempts(tier)},
+        }
+    )
+
+    return registry.get(
+        ("boto3", service_name, region, aws_access_key_id, tier),
+        lambda: client(
+            service_name,
+            region_name=region,
+            aws_access_key_id=aws_access_key_id,
+            aws_secret_access_key=aws_secret_access_key,
+            config=Config(
+                max_pool_connections=settings.PROVIDER_MAX_POOL_CONNECTIONS,
+                tcp_keepalive=True,
+                **timeouts,
+            ),
+        ),
+    )
+
+
+class DeadlineHttpClient(HttpClient):
+    """Deadline HTTP Client
+
+    The DeepL SDK has no per-call timeout, so its HTTP client is replaced with one
+    that caps each attempt at the time left before the request's deadline, and only
+    retries while there is time for it
+    """
+
+    def _internal_request(
+        self: Self, request: Any, stream: bool, timeout: float = None, **kwargs: Any
+    ) -> Any:
+        left = deadlines.remaining()
+        if left is not None:
+            timeout = max(min(timeout or left, left), deadlines.MIN_TIMEOUT)
+        if timeout is None:
+            return super()._internal_request(request, stream, **kwargs)
+        return super()._internal_request(request, stream, timeout, **kwargs)
+
+    def _should_retry(
+        self: Self, response: Any, exception: Exception | None, num_retries: int
+    ) -> bool:
+        return deadlines.should_retry() and super()._should_retry(
+            response, exception, num_retries
+        )
+
+
+def build_deepl_translator(api_key: str) -> Translator:
+    translator = Translator(api_key)
+    translator._client = DeadlineHttpClient()
+    return translator
+
+
+def get_deepl_translator(api_key: str) -> Translator:
+    """Get DeepL translator
+
+    Args:
+        api_key (str): The DeepL API key
+
+    Returns:
+        Translator: The shared DeepL client for the key
+    """
+    return registry.get(("deepl", api_key), lambda: build_deepl_translator(api_key))
+
+
+class DeadlineSession(AuthorizedSession):
+    """Deadline Session
+
+    Caps each request made by a Google client that has no per-call timeout at the
+    time left before the request's deadline
+    """
+
+    def request(self: Self, method: str, url: str, *args: Any, **kwargs: Any) -> Any:
+        left = deadlines.remaining()
+        if left is not None:
+            timeout = max(left, deadlines.MIN_TIMEOUT)
+            kwargs["timeout"] = timeout
+            kwargs["max_allowed_time"] = timeout
+        return super().request(method, url, *args, **kwargs)
+
+
+def build_google_credentials() -> service_account.Credentials:
+    credentials = service_account.Credentials.from_service_account_file(
+        filename=settings.GOOGLE_CLOUD_CRED_FILE_NAME,
+        scopes=settings.GOOGLE_CLOUD_SCOPES,
+    )
+    registry.add_refresher(CredentialRefresher(credentials))
+    return credentials
+
+
+def get_google_credentials() -> service_account.Credentials:
+    """Get Google credentials
+
+    The service account file is read once per process and the resulting credentials
+    are kept fresh in the background.
+
+    Returns:
+        service_account.Credentials: The shared credentials
+    """
+    return registry.get("google.credentials", build_google_credentials)
@@ -0,0 +1,209 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Iterable, Iterator, Self
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+
+from decyphr.exceptions import DeadlineExceededException
+
+DEADLINE_HEADER = "X-Request-Timeout"
+
+# Provider SDKs only retry a failed call while at least this many seconds are left
+RETRY_BUDGET = 5
+
+# The shortest timeout handed to a provider SDK, so that a call made just before the
+# deadline isn't given a timeout too short to ever succeed
+MIN_TIMEOUT = 0.5
+
+# SDK clients that take their timeouts when they are built are kept per tier of
+# remaining time, rounded down, rather than per request
+TIMEOUT_TIERS = (0.5, 1, 2, 5, 10, 30, 60)
+
+# The time, on the monotonic clock, by which the current request must be answered
+deadline: ContextVar[float | None] = ContextVar("deadline", default=None)
+
+
+def remaining() -> float | None:
+    """Remaining
+
+    Returns:
+        float | None: The seconds left before the current request's deadline, or
+            `None` if it has no deadline
+    """
+    current = deadline.get()
+    return None if current is None else current - time.monotonic()
+
+
+def check(stage: str) -> float | None:
+    """Check
+
+    Args:
+        stage (str): The stage about to start, e.g. `translate.deepl`
+
+    Returns:
+        float | None: The seconds left before the deadline, or `None` if there is no
+            deadline
+
+    Raises:
+        DeadlineExceededException if the deadline has passed
+    """
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceededException(stage)
+    return left
+
+
+def provider_timeout(stage: str) -> float | None:
+    """Provider timeout
+
+    Args:
+        stage (str): The provider about to be called, e.g. `translate.deepl`
+
+    Returns:
+        float | None: The timeout for the call, or `None` to use the SDK's default
+
+    Raises:
+        DeadlineExceededException if the deadline has passed
+    """
+    left = check(stage)
+    return None if left is None else max(left, MIN_TIMEOUT)
+
+
+def timeout_tier(timeout: float) -> float:
+    return max([tier for tier in TIMEOUT_TIERS if tier <= timeout], default=MIN_TIMEOUT)
+
+
+def max_attempts(timeout: float) -> int:
+    """Max attempts
+
+    Args:
+        timeout (float): The time left for the call
+
+    Returns:
+        int: How many times the SDK may try the call, one plus a retry for each
+            `RETRY_BUDGET` seconds left, up to 3
+    """
+    return min(3, 1 + int(timeout // RETRY_BUDGET))
+
+
+def should_retry() -> bool:
+    left = remaining()
+    return left is None or left >= RETRY_BUDGET
+
+
+@contextmanager
+def within_deadline(stage: str) -> Iterator[float | None]:
+    """Within deadline
+
+    Wrap a provider call, handing it the timeout to use. A call that fails once the
+    deadline has passed, usually by timing out, fails with a
+    `DeadlineExceededException` naming the stage.
+
+    Args:
+        stage (str): The provider being called, e.g. `translate.deepl`
+
+    Yields:
+        float | None: The timeout for the call, or `None` if there is no deadline
+
+    Raises:
+        DeadlineExceededException if the deadline has passed
+    """
+    timeout = provider_timeout(stage)
+    try:
+        yield timeout
+    except DeadlineExceededException:
+        raise
+    except Exception as error:
+        left = remaining()
+        if left is not None and left <= 0:
+            raise DeadlineExceededException(stage) from error
+        raise
+
+
+def raise_exceeded(results: Iterable[Any]) -> None:
+    """Raise exceeded
+
+    Fail a batch whose calls ran out of time as a whole, rather than returning the
+    error in place of each of its results
+
+    Args:
+        results (Iterable[Any]): The results, or errors, of the calls
+
+    Raises:
+        DeadlineExceededException if any of the calls ran out of time
+    """
+    for result in results:
+        if isinstance(result, DeadlineExceededException):
+            raise result
+
+
+def get_request_timeout(request: HttpRequest) -> float | None:
+    """Get request timeout
+
+    Args:
+        request (HttpRequest): The request
+
+    Returns:
+        float | None: The seconds the client gave in the `X-Request-Timeout`
+            header, or else the default in `REQUEST_TIMEOUTS` for the longest
+            matching path prefix, or else `REQUEST_TIMEOUT`. `None` if that is 0
+    """
+    try:
+        timeout = float(request.headers[DEADLINE_HEADER])
+    except (KeyError, ValueError):
+        prefixes = [
+            prefix
+            for prefix in settings.REQUEST_TIMEOUTS
+            if request.path.startswith(prefix)
+        ]
+        timeout = (
+            settings.REQUEST_TIMEOUTS[max(prefixes, key=len)]
+            if prefixes
+            else settings.REQUEST_TIMEOUT
+        )
+
+    return timeout if timeout > 0 else None
+
+
+class DeadlineMiddleware:
+    """Deadline Middleware
+
+    Sets the deadline of each request, which the admission control, rate limits and
+    provider calls check so that no work is done for a client that has given up
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    get_response: Callable
+
+    def __init__(self: Self, get_response: Callable) -> None:
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def start(self: Self, request: HttpRequest) -> Any:
+        timeout = get_request_timeout(request)
+        return deadline.set(None if timeout is None else time.monotonic() + timeout)
+
+    def __call__(
+        self: Self, request: HttpRequest
+    ) -> HttpResponse | Awaitable[HttpResponse]:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        token = self.start(request)
+        try:
+            return self.get_response(request)
+        finally:
+            deadline.reset(token)
+
+    async def __acall__(self: Self, request: HttpRequest) -> HttpResponse:
+        token = self.start(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            deadline.reset(token)
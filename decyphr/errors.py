@@ -0,0 +1,85 @@
+from typing import Any
+
+from django.http import JsonResponse
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import exception_handler as drf_exception_handler
+
+from decyphr.exceptions import DeadlineExceededException, ProviderUnavailableException
+
+
+def error_response_parts(
+    exc: Exception,
+) -> tuple[dict[str, str], int, dict[str, str]] | None:
+    """Error response parts
+
+    Args:
+        exc (Exception): The error raised while handling the request
+
+    Returns:
+        tuple[dict[str, str], int, dict[str, str]] | None: The body, status code and
+            headers of the response to a provider being unavailable (503, with a
+            `Retry-After` header) or the request's deadline passing (504, naming
+            the stage), or `None` for any other error
+    """
+    if isinstance(exc, ProviderUnavailableException):
+        return (
+            {"detail": exc.detail},
+            status.HTTP_503_SERVICE_UNAVAILABLE,
+            {"Retry-After": str(exc.retry_after)},
+        )
+    if isinstance(exc, DeadlineExceededException):
+        return (
+            {"detail": exc.detail, "stage": exc.stage},
+            status.HTTP_504_GATEWAY_TIMEOUT,
+            {},
+        )
+    return None
+
+
+def error_item(exc: Exception) -> dict[str, Any]:
+    """Error item
+
+    Args:
+        exc (Exception): The error raised in place of one of the results of a batch
+
+    Returns:
+        dict[str, Any]: The error's message, with the `retry_after` or `stage` that
+            the 503 or 504 response to the error would have given
+    """
+    if isinstance(exc, ProviderUnavailableException):
+        return {"error": exc.detail, "retry_after": exc.retry_after}
+    if isinstance(exc, DeadlineExceededException):
+        return {"error": exc.detail, "stage": exc.stage}
+    return {"error": str(exc)}
+
+
+def exception_handler(exc: Exception, context: dict[str, Any]) -> Response | None:
+    """Exception handler
+
+    The `EXCEPTION_HANDLER` of the DRF views, which answers provider and deadline
+    errors, and leaves every other error to DRF's own handler
+    """
+    parts = error_response_parts(exc)
+    if parts is None:
+        return drf_exception_handler(exc, context)
+
+    data, status_code, headers = parts
+    return Response(data, status=status_code, headers=headers)
+
+
+def json_error_response(
+    exc: ProviderUnavailableException | DeadlineExceededException,
+) -> JsonResponse:
+    """JSON error response
+
+    Equivalent of `exception_handler` for the plain Django views
+
+    Args:
+        exc (ProviderUnavailableException | DeadlineExceededException): The error
+
+    Returns:
+        JsonResponse: The 503 or 504 response
+    """
+    data, status_code, headers = error_response_parts(exc)
+    return JsonResponse(data, status=status_code, headers=headers)
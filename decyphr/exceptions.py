@@ -0,0 +1,33 @@
+from typing import Self
+
+
+class ProviderUnavailableException(Exception):
+    """Provider Unavailable Exception
+
+    Raised when a request cannot be sent to any provider right now. `retry_after` is
+    how many seconds the client should wait before trying again.
+    """
+
+    detail: str
+    retry_after: int
+
+    def __init__(self: Self, detail: str, retry_after: int) -> None:
+        super().__init__(detail)
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class DeadlineExceededException(Exception):
+    """Deadline Exceeded Exception
+
+    Raised when the request's deadline passes, or is too close to finish the work,
+    before or during `stage`, e.g. `admission` or `translate.deepl`.
+    """
+
+    detail: str
+    stage: str
+
+    def __init__(self: Self, stage: str) -> None:
+        self.detail = f"The request deadline was exceeded during {stage}."
+        super().__init__(self.detail)
+        self.stage = stage
@@ -0,0 +1,114 @@
+import asyncio
+import contextvars
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import partial
+from threading import current_thread
+from typing import Any, Callable, Sequence
+
+from django.conf import settings
+
+from decyphr.clients import registry
+
+FAN_OUT_THREAD_NAME = "provider-fan-out"
+
+
+def get_provider_executor() -> ThreadPoolExecutor:
+    """Get provider executor
+
+    None of the provider SDKs have native asyncio support, so their blocking calls
+    are handed off to a dedicated pool of threads. This keeps them off the event loop
+    and off the single thread Django uses for `sync_to_async(thread_sensitive=True)`
+    work such as the ORM.
+
+    Returns:
+        ThreadPoolExecutor: The pool shared by every provider call in the process
+    """
+    return registry.get(
+        "provider.executor",
+        lambda: ThreadPoolExecutor(
+            max_workers=settings.PROVIDER_IO_THREADS,
+            thread_name_prefix="provider-io",
+        ),
+    )
+
+
+def get_fan_out_executor() -> ThreadPoolExecutor:
+    """Get fan-out executor
+
+    The calls a request splits into, e.g. the chunks of a batch, run on a pool of
+    their own. Requests already running on the provider executor, such as hedged
+    calls, wait on them, so sharing that pool could leave every one of its threads
+    waiting on calls that have no thread to run on.
+
+    Returns:
+        ThreadPoolExecutor: The pool shared by every fanned-out call in the process
+    """
+    return registry.get(
+        "provider.fan_out_executor",
+        lambda: ThreadPoolExecutor(
+            max_workers=settings.PROVIDER_IO_THREADS,
+            thread_name_prefix=FAN_OUT_THREAD_NAME,
+        ),
+    )
+
+
+async def run_in_provider_executor(func: Callable, *args, **kwargs) -> Any:
+    """Run in provider executor
+
+    Await a blocking provider call made on the provider executor. The caller's
+    context variables are carried over to the thread the call is made on.
+
+    Args:
+        func (Callable): The blocking function to call
+        *args: Positional arguments for `func`
+        **kwargs: Keyword arguments for `func`
+
+    Returns:
+        Any: The value returned by `func`
+    """
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(
+        get_provider_executor(), context.run, partial(func, *args, **kwargs)
+    )
+
+
+def map_in_provider_executor(
+    func: Callable[[Any], Any], items: Sequence[Any], max_parallel: int
+) -> list[Any]:
+    """Map in provider executor
+
+    Call `func` with each of the items on the fan-out executor, with no more than
+    `max_parallel` of the calls running at once. The caller's context variables are
+    carried over to the threads the calls are made on. Calls made from a fan-out
+    thread run one after the other on it, rather than waiting on the pool they hold
+    a thread of.
+
+    Args:
+        func (Callable[[Any], Any]): The blocking function to call
+        items (Sequence[Any]): The items to call it with
+        max_parallel (int): The maximum number of calls to run at once
+
+    Returns:
+        list[Any]: The value returned by `func` for each item, in the same order as
+            the items
+    """
+    if len(items) <= 1 or current_thread().name.startswith(FAN_OUT_THREAD_NAME):
+        return [func(item) for item in items]
+
+    executor = get_fan_out_executor()
+    results = [None] * len(items)
+    futures = {}
+
+    for index, item in enumerate(items):
+        if len(futures) >= max_parallel:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[futures.pop(future)] = future.result()
+
+        context = contextvars.copy_context()
+        futures[executor.submit(context.run, func, item)] = index
+
+    for future, index in futures.items():
+        results[index] = future.result()
+
+    return results
@@ -0,0 +1,126 @@
+import csv
+import zlib
+from typing import Iterable, Iterator, Self
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+
+OUTPUTS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv", "csv"),
+}
+
+# Rows are sent once this many bytes have built up
+BUFFER_SIZE = 64 * 1024
+
+
+class Line:
+    """Gives `csv.writer` somewhere to write that just hands back each line"""
+
+    def write(self: Self, line: str) -> str:
+        return line
+
+
+def ndjson_lines(names: list[str], rows: Iterable[tuple]) -> Iterator[str]:
+    encoder = DjangoJSONEncoder()
+    for row in rows:
+        yield encoder.encode(dict(zip(names, row))) + "\n"
+
+
+def csv_lines(names: list[str], rows: Iterable[tuple]) -> Iterator[str]:
+    writer = csv.writer(Line())
+    yield writer.writerow(names)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def buffered(lines: Iterable[str]) -> Iterator[bytes]:
+    buffer = []
+    size = 0
+
+    for line in lines:
+        data = line.encode("utf-8")
+        buffer.append(data)
+        size += len(data)
+        if size >= BUFFER_SIZE:
+            yield b"".join(buffer)
+            buffer = []
+            size = 0
+
+    if buffer:
+        yield b"".join(buffer)
+
+
+def gzipped(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+def export_rows(
+    queryset: QuerySet,
+    fields: dict[str, str],
+    output: str = "ndjson",
+    compress: bool = False,
+) -> Iterator[bytes]:
+    """Export rows
+
+    Stream the rows of the queryset, fetching `EXPORT_CHUNK_SIZE` rows from the DB
+    at a time, so that memory use stays flat however many rows there are and the
+    first bytes are ready as soon as the first rows have been fetched.
+
+    Args:
+        queryset (QuerySet): The rows to export
+        fields (dict[str, str]): The name of each column in the export and the
+            field, or lookup, it is read from
+        output (str): `ndjson` for one JSON object per line, or `csv`
+        compress (bool): Whether to gzip the export
+
+    Yields:
+        bytes: The next chunk of the export
+    """
+    rows = queryset.values_list(*fields.values()).iterator(
+        chunk_size=settings.EXPORT_CHUNK_SIZE
+    )
+    lines = (csv_lines if output == "csv" else ndjson_lines)(list(fields), rows)
+    chunks = buffered(lines)
+
+    if compress:
+        chunks = gzipped(chunks)
+    yield from chunks
+
+
+def export_response(
+    queryset: QuerySet,
+    fields: dict[str, str],
+    name: str,
+    output: str = "ndjson",
+    compress: bool = False,
+) -> StreamingHttpResponse:
+    """Export response
+
+    Args:
+        queryset (QuerySet): The rows to export
+        fields (dict[str, str]): See `export_rows`
+        name (str): The name of the file the client should save the export as,
+            without an extension
+        output (str): `ndjson` or `csv`
+        compress (bool): Whether to gzip the export
+
+    Returns:
+        StreamingHttpResponse: The export, sent as the rows are read from the DB
+    """
+    content_type, extension = OUTPUTS[output]
+    filename = f"{name}.{extension}"
+    if compress:
+        content_type = "application/gzip"
+        filename = f"{filename}.gz"
+
+    response = StreamingHttpResponse(
+        export_rows(queryset, fields, output, compress), content_type=content_type
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,71 @@
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Self
+
+from django.conf import settings
+
+
+class LocalStore:
+    """Local Store
+
+    A small SQLite database in `RUNTIME_DIR` used to share state, such as locks and
+    counters, between the worker processes running on the same host without making
+    a round trip to the main DB.
+
+    Each thread gets its own connection. Connections are not carried over into a
+    forked child process.
+    """
+
+    path: Path
+    local: threading.local
+    tables: set[str]
+
+    def __init__(self: Self, path: Path) -> None:
+        self.path = path
+        self.local = threading.local()
+        self.tables = set()
+        os.register_at_fork(after_in_child=self.reset)
+
+    def reset(self: Self) -> None:
+        self.local = threading.local()
+
+    def connection(self: Self) -> sqlite3.Connection:
+        """Connection
+
+        Returns:
+            sqlite3.Connection: The connection for the current thread, in autocommit
+                mode
+        """
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self.local.connection = connection
+        return connection
+
+    def table(self: Self, name: str, *ddl: str) -> sqlite3.Connection:
+        """Table
+
+        Get a connection, making sure the table exists first
+
+        Args:
+            name (str): The name of the table
+            *ddl (str): The `CREATE ... IF NOT EXISTS` statements for the table and
+                its indexes
+
+        Returns:
+            sqlite3.Connection: The connection for the current thread
+        """
+        connection = self.connection()
+        if name not in self.tables:
+            for statement in ddl:
+                connection.execute(statement)
+            self.tables.add(name)
+        return connection
+
+
+local_store = LocalStore(settings.RUNTIME_DIR / "decyphr.sqlite3")
@@ -0,0 +1,31 @@
+from typing import Any, Self
+
+from rest_framework.pagination import CursorPagination
+from rest_framework.request import Request
+
+
+class KeysetPagination(CursorPagination):
+    """Keyset Pagination
+
+    Pages through a list by primary key, newest first. The cursor holds the key of
+    the last row on the page, so each page is fetched with an indexed range query
+    and costs the same however deep the client pages.
+
+    Lists filtered by a creation date range are paged through by creation date
+    instead, so that the range and the page are read from the same index.
+    """
+
+    ordering = "-id"
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+    date_range_params = ("created_after", "created_before")
+    date_range_ordering = ("-created_at", "-id")
+
+    def get_ordering(
+        self: Self, request: Request, queryset: Any, view: Any
+    ) -> tuple[str, ...]:
+        if any(param in request.query_params for param in self.date_range_params):
+            return self.date_range_ordering
+        return super().get_ordering(request, queryset, view)
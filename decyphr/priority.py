@@ -0,0 +1,110 @@
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Self
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpRequest, HttpResponse
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+
+# The share of the waiting work each lane is given when both have work waiting for
+# a provider
+LANE_WEIGHTS = {INTERACTIVE: 4, BULK: 1}
+
+PRIORITY_HEADER = "X-Priority"
+API_KEY_HEADER = "X-Api-Key"
+
+# The priority class of the current request, which decides the lane its provider
+# calls queue in
+priority_class: ContextVar[str] = ContextVar("priority_class", default=INTERACTIVE)
+
+
+def check_priority_settings() -> None:
+    """Check priority settings
+
+    Raises:
+        ImproperlyConfigured if `PRIORITY_DEFAULT` or a class in
+            `PRIORITY_API_KEYS` isn't one of the lanes
+    """
+    if settings.PRIORITY_DEFAULT not in LANE_WEIGHTS:
+        raise ImproperlyConfigured(
+            f"PRIORITY_DEFAULT must be one of {', '.join(LANE_WEIGHTS)}, "
+            f"not {settings.PRIORITY_DEFAULT!r}."
+        )
+
+    for lane in settings.PRIORITY_API_KEYS.values():
+        if lane not in LANE_WEIGHTS:
+            raise ImproperlyConfigured(
+                f"PRIORITY_API_KEYS gives an API key the class {lane!r}, which "
+                f"must be one of {', '.join(LANE_WEIGHTS)}."
+            )
+
+
+def get_priority_class(request: HttpRequest) -> str:
+    """Get priority class
+
+    An API key given a class in `PRIORITY_API_KEYS` always gets that class, so that
+    bulk clients can't move themselves into the interactive lane. Other requests get
+    the class named in the `X-Priority` header, or `PRIORITY_DEFAULT`.
+
+    Args:
+        request (HttpRequest): The request
+
+    Returns:
+        str: `interactive` or `bulk`
+    """
+    api_key = request.headers.get(API_KEY_HEADER)
+    if api_key in settings.PRIORITY_API_KEYS:
+        return settings.PRIORITY_API_KEYS[api_key]
+
+    requested = request.headers.get(PRIORITY_HEADER, "").strip().lower()
+    return requested if requested in LANE_WEIGHTS else settings.PRIORITY_DEFAULT
+
+
+class PriorityMiddleware:
+    """Priority Middleware
+
+    Sets the priority class of each request for the admission control in front of
+    the providers, and echoes it back in the `X-Priority` response header. The
+    classes configured in the settings are checked when the middleware is loaded,
+    so that a misspelt class stops the server from starting rather than failing
+    every request.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    get_response: Callable
+
+    def __init__(self: Self, get_response: Callable) -> None:
+        check_priority_settings()
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(
+        self: Self, request: HttpRequest
+    ) -> HttpResponse | Awaitable[HttpResponse]:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        lane = get_priority_class(request)
+        token = priority_class.set(lane)
+        try:
+            response = self.get_response(request)
+        finally:
+            priority_class.reset(token)
+        response[PRIORITY_HEADER] = lane
+        return response
+
+    async def __acall__(self: Self, request: HttpRequest) -> HttpResponse:
+        lane = get_priority_class(request)
+        token = priority_class.set(lane)
+        try:
+            response = await self.get_response(request)
+        finally:
+            priority_class.reset(token)
+        response[PRIORITY_HEADER] = lane
+        return response
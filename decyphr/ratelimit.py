@@ -0,0 +1,285 @@
+import math
+import time
+from contextlib import contextmanager
+from threading import Lock
+from typing import Any, Callable, Iterator, Self
+
+from django.conf import settings
+
+from decyphr import deadlines, stats
+from decyphr.exceptions import DeadlineExceededException, ProviderUnavailableException
+from decyphr.localstore import LocalStore, local_store
+
+RATE_LIMITS_TABLE = """
+CREATE TABLE IF NOT EXISTS rate_limits (
+    name TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    rate REAL NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+
+# The error codes, and exception names, providers use to say that they are
+# throttling the caller
+THROTTLING_ERRORS = {
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "ProvisionedThroughputExceededException",
+    "TooManyRequests",
+    "ResourceExhausted",
+}
+
+# When a provider throttles a call the rate is halved, but never below this share of
+# the configured rate. It then recovers by this share of the configured rate each
+# second
+MIN_RATE_SHARE = 0.1
+RECOVERY_SHARE = 0.02
+
+
+def is_throttling(error: Exception) -> bool:
+    """Is throttling
+
+    Args:
+        error (Exception): The error raised by a provider SDK
+
+    Returns:
+        bool: Whether the provider refused the call because it was sent too much
+    """
+    # botocore errors carry the error code in a dict, while the Google and DeepL
+    # errors are told apart by their type, and may have a `response` of their own
+    response = getattr(error, "response", None)
+    code = response.get("Error", {}).get("Code") if isinstance(response, dict) else None
+    return code in THROTTLING_ERRORS or type(error).__name__ in THROTTLING_ERRORS
+
+
+class RateLimiter:
+    """Rate Limiter
+
+    Meters the characters sent to each provider, and region, with a token bucket
+    shared by the worker processes on a host through the local store. The bucket
+    holds up to `burst` seconds worth of characters and refills at the rate set for
+    the provider in `PROVIDER_RATE_LIMITS`.
+
+    A call that would overdraw the bucket reserves its characters and waits until the
+    bucket has refilled, so that bursts are queued rather than sent to the provider
+    to be throttled. Calls that would have to wait longer than `max_wait` are
+    refused with a `ProviderUnavailableException`.
+
+    The rate adapts to the provider: it is halved each time the provider throttles a
+    call anyway, and recovers gradually from there.
+    """
+
+    limits: dict[str, float]
+    burst: float
+    max_wait: float
+    store: LocalStore
+    lock: Lock
+    counters: dict[str, dict[str, float]]
+
+    def __init__(
+        self: Self,
+        limits: dict[str, float],
+        burst: float,
+        max_wait: float,
+        store: LocalStore = local_store,
+    ) -> None:
+        self.limits = limits
+        self.burst = burst
+        self.max_wait = max_wait
+        self.store = store
+        self.lock = Lock()
+        self.counters = {}
+
+    def count(self: Self, key: str, counter: str, amount: float = 1) -> None:
+        with self.lock:
+            counters = self.counters.setdefault(
+                key,
+                {
+                    "calls": 0,
+                    "waits": 0,
+                    "wait_time": 0.0,
+                    "rejections": 0,
+                    "throttles": 0,
+                },
+            )
+            counters[counter] = counters.get(counter, 0) + amount
+
+    def update(
+        self: Self,
+        key: str,
+        max_rate: float,
+        change: Callable[[float, float], tuple[float, float, Any]],
+    ) -> Any:
+        """Update
+
+        Read the bucket, top it up for the time since it was last updated, let
+        `change` modify it, and write it back, all in one transaction
+
+        Args:
+            key (str): The key of the bucket
+            max_rate (float): The configured rate of the bucket
+            change (Callable): Takes the tokens and rate of the bucket and returns
+                the new tokens and rate, and a value to hand back
+
+        Returns:
+            Any: The value returned by `change`
+        """
+        connection = self.store.table("rate_limits", RATE_LIMITS_TABLE)
+        capacity = max_rate * self.burst
+        now = time.time()
+
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT tokens, rate, updated_at FROM rate_limits WHERE name = ?",
+                (key,),
+            ).fetchone()
+            tokens, rate, updated_at = row if row else (capacity, max_rate, now)
+
+            elapsed = max(now - updated_at, 0)
+            rate = min(max_rate, rate + max_rate * RECOVERY_SHARE * elapsed)
+            tokens = min(capacity, tokens + rate * elapsed)
+            tokens, rate, result = change(tokens, rate)
+
+            connection.execute(
+                """
+                INSERT INTO rate_limits (name, tokens, rate, updated_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (name) DO UPDATE SET
+                    tokens = excluded.tokens,
+                    rate = excluded.rate,
+                    updated_at = excluded.updated_at
+                """,
+                (key, tokens, rate, now),
+            )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+        return result
+
+    def acquire(self: Self, key: str, max_rate: float, characters: int) -> None:
+        """Acquire
+
+        Take the characters from the bucket, waiting for it to refill if needed. A
+        call with more characters than the bucket holds waits for a full bucket.
+
+        Args:
+            key (str): The key of the bucket
+            max_rate (float): The configured rate of the bucket, in characters per
+                second
+            characters (int): The number of characters about to be sent
+
+        Raises:
+            ProviderUnavailableException if the call would have to wait longer than
+                `max_wait`
+            DeadlineExceededException if the call would have to wait past the
+                request's deadline
+        """
+        cost = min(characters, max_rate * self.burst)
+        left = deadlines.check("rate_limit")
+        max_wait = self.max_wait if left is None else min(self.max_wait, left)
+
+        def reserve(tokens: float, rate: float) -> tuple[float, float, float]:
+            wait = max(cost - tokens, 0) / rate
+            if wait > max_wait:
+                return tokens, rate, wait
+            return tokens - cost, rate, wait
+
+        wait = self.update(key, max_rate, reserve)
+        self.count(key, "calls")
+
+        if wait > max_wait:
+            self.count(key, "rejections")
+            if wait <= self.max_wait:
+                raise DeadlineExceededException("rate_limit")
+            raise ProviderUnavailableException(
+                f"The rate limit for {key} has been reached", math.ceil(wait)
+            )
+
+        if wait > 0:
+            self.count(key, "waits")
+            self.count(key, "wait_time", wait)
+            time.sleep(wait)
+
+    def throttled(self: Self, key: str, max_rate: float) -> None:
+        """Throttled
+
+        Halve the rate of the bucket and empty it, after the provider throttled a
+        call
+
+        Args:
+            key (str): The key of the bucket
+            max_rate (float): The configured rate of the bucket
+        """
+        self.update(
+            key,
+            max_rate,
+            lambda tokens, rate: (
+                min(tokens, 0),
+                max(rate / 2, max_rate * MIN_RATE_SHARE),
+                None,
+            ),
+        )
+        self.count(key, "throttles")
+
+    @contextmanager
+    def metered(
+        self: Self, name: str, characters: int, region: str | None = None
+    ) -> Iterator[None]:
+        """Metered
+
+        Wrap a call to a provider. Nothing is done for providers without a rate
+        limit.
+
+        Args:
+            name (str): The name of the provider, as used in `PROVIDER_RATE_LIMITS`,
+                e.g. `translate.amazon`
+            characters (int): The number of characters about to be sent
+            region (str): The region of the provider, which has its own limit
+
+        Raises:
+            ProviderUnavailableException if the call would have to wait too long
+        """
+        max_rate = self.limits.get(name)
+        if not max_rate:
+            yield
+            return
+
+        key = f"{name}:{region}" if region else name
+        self.acquire(key, max_rate, characters)
+
+        try:
+            yield
+        except Exception as error:
+            if is_throttling(error):
+                self.throttled(key, max_rate)
+            raise
+
+    def stats(self: Self) -> dict[str, dict[str, Any]]:
+        """Stats
+
+        Returns:
+            dict[str, dict[str, Any]]: For each rate limited provider and region, the
+                number of calls made by this process, how many had to wait and for
+                how long in total, how many were refused and how many were
+                throttled by the provider
+        """
+        with self.lock:
+            return {
+                key: {
+                    **counters,
+                    "wait_time": round(counters["wait_time"], 3),
+                }
+                for key, counters in self.counters.items()
+            }
+
+
+rate_limiter = RateLimiter(
+    limits=settings.PROVIDER_RATE_LIMITS,
+    burst=settings.RATE_LIMIT_BURST,
+    max_wait=settings.RATE_LIMIT_MAX_WAIT,
+)
+
+stats.register("rate_limits", rate_limiter.stats)
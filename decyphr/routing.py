@@ -0,0 +1,386 @@
+import contextvars
+import math
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from threading import Lock
+from typing import Any, Callable, Hashable, Iterable, Self
+
+from django.conf import settings
+
+from decyphr import deadlines, stats
+from decyphr.exceptions import DeadlineExceededException, ProviderUnavailableException
+from decyphr.executors import get_provider_executor
+
+# The stages that run out of time while waiting their turn, before the provider is
+# called, so that the deadline passing during them says nothing about the provider
+REFUSED_STAGES = ("admission", "rate_limit")
+
+
+class ProviderHealth:
+    """Provider Health
+
+    A rolling window of the latency and outcome of the most recent calls made to a
+    provider for a route (e.g. a language pair)
+    """
+
+    samples: deque[tuple[float, bool]]
+    lock: Lock
+
+    def __init__(self: Self, window: int) -> None:
+        self.samples = deque(maxlen=window)
+        self.lock = Lock()
+
+    def record(self: Self, latency: float, ok: bool) -> None:
+        with self.lock:
+            self.samples.append((latency, ok))
+
+    def percentile(self: Self, percentile: float, min_samples: int = 1) -> float | None:
+        """Percentile
+
+        Args:
+            percentile (float): The percentile to calculate, between 0 and 100
+            min_samples (int): The number of samples needed for a meaningful answer
+
+        Returns:
+            float | None: The latency of successful calls at that percentile, or
+                `None` if there aren't enough samples yet
+        """
+        with self.lock:
+            latencies = sorted(latency for latency, ok in self.samples if ok)
+
+        if not latencies or len(latencies) < min_samples:
+            return None
+        return latencies[max(math.ceil(len(latencies) * percentile / 100) - 1, 0)]
+
+    def error_rate(self: Self) -> float:
+        with self.lock:
+            if not self.samples:
+                return 0.0
+            return sum(1 for _, ok in self.samples if not ok) / len(self.samples)
+
+    def stats(self: Self) -> dict[str, Any]:
+        return {
+            "calls": len(self.samples),
+            "error_rate": round(self.error_rate(), 3),
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+        }
+
+
+class CircuitBreaker:
+    """Circuit Breaker
+
+    Stops calls being sent to a provider that keeps failing. After
+    `failure_threshold` consecutive failures the breaker opens and calls are refused
+    for `reset_timeout` seconds. A single trial call is then let through: the breaker
+    closes again if it succeeds and re-opens if it fails. A trial call that never
+    reached the provider is given back, so that the next call can be the trial.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    state: str
+    failures: int
+    opened_at: float
+    failure_threshold: int
+    reset_timeout: float
+    lock: Lock
+
+    def __init__(self: Self, failure_threshold: int, reset_timeout: float) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.lock = Lock()
+
+    def allow(self: Self) -> bool:
+        """Allow
+
+        Returns:
+            bool: Whether a call may be made. When the breaker is ready for its trial
+                call, only the first caller is allowed through
+        """
+        with self.lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and self.retry_after() == 0:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def retry_after(self: Self) -> float:
+        return max(self.opened_at + self.reset_timeout - time.monotonic(), 0)
+
+    def record_success(self: Self) -> None:
+        with self.lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def release_trial(self: Self) -> None:
+        with self.lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+
+    def record_failure(self: Self) -> None:
+        with self.lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class Router:
+    """Router
+
+    Sends each call to the preferred provider for a request and falls back to the
+    next provider when it fails or its circuit breaker is open. The latency and
+    error rate of every provider is tracked per route.
+
+    With hedging enabled, a call that has taken longer than the p95 latency of its
+    provider on that route is duplicated to the next provider, and whichever answer
+    arrives first is used.
+    """
+
+    health: dict[tuple[str, Hashable], ProviderHealth]
+    breakers: dict[tuple[str, Hashable], CircuitBreaker]
+    lock: Lock
+    hedge: bool
+    window: int
+    min_samples: int
+    failure_threshold: int
+    reset_timeout: float
+    fallbacks: int
+    hedged: int
+    hedge_wins: int
+
+    def __init__(
+        self: Self,
+        hedge: bool = False,
+        window: int = 100,
+        min_samples: int = 20,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30,
+    ) -> None:
+        self.health = {}
+        self.breakers = {}
+        self.lock = Lock()
+        self.hedge = hedge
+        self.window = window
+        self.min_samples = min_samples
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.fallbacks = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def get_health(self: Self, provider: str, route: Hashable) -> ProviderHealth:
+        with self.lock:
+            key = (provider, route)
+            if key not in self.health:
+                self.health[key] = ProviderHealth(self.window)
+            return self.health[key]
+
+    def get_breaker(self: Self, provider: str, route: Hashable) -> CircuitBreaker:
+        with self.lock:
+            key = (provider, route)
+            if key not in self.breakers:
+                self.breakers[key] = CircuitBreaker(
+                    self.failure_threshold, self.reset_timeout
+                )
+            return self.breakers[key]
+
+    def measure(
+        self: Self, provider: str, route: Hashable, func: Callable[[str], Any]
+    ) -> Any:
+        """Measure
+
+        Make the call to the provider, recording its latency and outcome. A call
+        refused before reaching the provider, by admission control or a rate limit,
+        or not started because the request's deadline had already passed, is not
+        recorded. A call that runs out of time counts as a failure.
+        """
+        health = self.get_health(provider, route)
+        breaker = self.get_breaker(provider, route)
+
+        try:
+            deadlines.check("routing")
+        except DeadlineExceededException:
+            breaker.release_trial()
+            raise
+
+        started = time.monotonic()
+        try:
+            result = func(provider)
+        except ProviderUnavailableException:
+            breaker.release_trial()
+            raise
+        except DeadlineExceededException as e:
+            if e.stage in REFUSED_STAGES:
+                breaker.release_trial()
+                raise
+            health.record(time.monotonic() - started, False)
+            breaker.record_failure()
+            raise
+        except Exception:
+            health.record(time.monotonic() - started, False)
+            breaker.record_failure()
+            raise
+
+        health.record(time.monotonic() - started, True)
+        breaker.record_success()
+        return result
+
+    def submit(
+        self: Self, provider: str, route: Hashable, func: Callable[[str], Any]
+    ) -> Future:
+        context = contextvars.copy_context()
+        return get_provider_executor().submit(
+            context.run, self.measure, provider, route, func
+        )
+
+    def call(
+        self: Self,
+        candidates: list[str],
+        route: Hashable,
+        func: Callable[[str], Any],
+    ) -> tuple[str, Any]:
+        """Call
+
+        Args:
+            candidates (list[str]): The providers that can handle the call, in order
+                of preference
+            route (Hashable): Identifies the kind of call, e.g. the language pair
+            func (Callable[[str], Any]): Makes the call to the named provider
+
+        Returns:
+            tuple[str, Any]: The provider that answered and its answer
+
+        Raises:
+            ProviderUnavailableException if the circuit breaker of every candidate is
+                open. Otherwise, the error raised by the last provider tried
+        """
+        remaining = list(candidates)
+        error = None
+
+        while remaining:
+            provider = remaining.pop(0)
+            if not self.get_breaker(provider, route).allow():
+                continue
+
+            if provider != candidates[0]:
+                with self.lock:
+                    self.fallbacks += 1
+
+            hedge_provider = self.next_closed(remaining, route) if self.hedge else None
+            threshold = self.get_health(provider, route).percentile(
+                95, self.min_samples
+            )
+
+            try:
+                if hedge_provider is None or threshold is None:
+                    return provider, self.measure(provider, route, func)
+                return self.call_hedged(
+                    provider, hedge_provider, threshold, route, func
+                )
+            except DeadlineExceededException:
+                # There is no time left to try another provider
+                raise
+            except Exception as e:
+                error = e
+
+        if error is not None:
+            raise error
+
+        retry_after = min(
+            self.get_breaker(provider, route).retry_after() for provider in candidates
+        )
+        raise ProviderUnavailableException(
+            "Every provider is currently unavailable.", math.ceil(retry_after) or 1
+        )
+
+    def next_closed(self: Self, providers: list[str], route: Hashable) -> str | None:
+        for provider in providers:
+            if self.get_breaker(provider, route).state == CircuitBreaker.CLOSED:
+                return provider
+        return None
+
+    def call_hedged(
+        self: Self,
+        provider: str,
+        hedge_provider: str,
+        threshold: float,
+        route: Hashable,
+        func: Callable[[str], Any],
+    ) -> tuple[str, Any]:
+        primary = self.submit(provider, route, func)
+        done, _ = wait([primary], timeout=threshold)
+        if done:
+            return provider, primary.result()
+
+        with self.lock:
+            self.hedged += 1
+        secondary = self.submit(hedge_provider, route, func)
+        futures = {primary: provider, secondary: hedge_provider}
+
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is secondary:
+                        with self.lock:
+                            self.hedge_wins += 1
+                    return futures[future], future.result()
+
+        return provider, primary.result()
+
+    def stats(self: Self) -> dict[str, Any]:
+        """Stats
+
+        Returns:
+            dict[str, Any]: The fallback and hedging counters, and the health and
+                circuit breaker state of each provider per route
+        """
+        with self.lock:
+            keys = list(self.health.keys())
+            counters = {
+                "fallbacks": self.fallbacks,
+                "hedged": self.hedged,
+                "hedge_wins": self.hedge_wins,
+            }
+
+        providers = {}
+        for provider, route in keys:
+            name = " ".join([provider, *map(str, route)])
+            providers[name] = self.get_health(provider, route).stats()
+            providers[name]["breaker"] = self.get_breaker(provider, route).state
+
+        return {**counters, "providers": providers}
+
+
+def order_candidates(preferred: str, providers: Iterable[str]) -> list[str]:
+    """Order candidates
+
+    Args:
+        preferred (str): The provider requested by the client or preferences
+        providers (Iterable[str]): Every provider that can handle the request
+
+    Returns:
+        list[str]: The preferred provider followed by the others
+    """
+    return [preferred, *(provider for provider in providers if provider != preferred)]
+
+
+router = Router(
+    hedge=settings.ROUTING_HEDGE,
+    window=settings.ROUTING_WINDOW,
+    min_samples=settings.ROUTING_MIN_SAMPLES,
+    failure_threshold=settings.ROUTING_FAILURE_THRESHOLD,
+    reset_timeout=settings.ROUTING_RESET_TIMEOUT,
+)
+
+stats.register("routing", router.stats)
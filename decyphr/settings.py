@@ -13,10 +13,57 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 import os
 from pathlib import Path
 
+from corsheaders.defaults import default_headers
 from environ import Env
 
 env = Env(
     DEBUG=(bool, False),
+    TRANSLATION_MEMORY_MAX_SIZE=(int, 10000),
+    TRANSLATION_MEMORY_TTL=(int, 3600),
+    PROVIDER_MAX_POOL_CONNECTIONS=(int, 50),
+    PROVIDER_IO_THREADS=(int, 200),
+    TRANSLATION_BATCH_MAX_TEXTS=(int, 1000),
+    TRANSLATION_MAX_PARALLEL_BATCHES=(int, 4),
+    TRANSLATION_SEGMENT_THRESHOLD=(int, 5000),
+    TRANSLATION_MAX_TEXT_LENGTH=(int, 100000),
+    TRANSLATION_MICRO_BATCH_WINDOW=(float, 0),
+    SINGLE_FLIGHT_CROSS_PROCESS=(bool, False),
+    SINGLE_FLIGHT_TIMEOUT=(float, 30),
+    NLP_BULK_CREATE_BATCH_SIZE=(int, 500),
+    NLP_DEDUPLICATE_VOCABULARY=(bool, False),
+    NLP_ANALYSIS_CACHE_MAX_SIZE=(int, 1000),
+    NLP_ANALYSIS_CACHE_TTL=(int, 3600),
+    NLP_BATCH_MAX_TEXTS=(int, 250),
+    NLP_MAX_PARALLEL_CALLS=(int, 4),
+    EXPORT_CHUNK_SIZE=(int, 2000),
+    TRANSLATION_IMPORT_BATCH_SIZE=(int, 5000),
+    TRANSLATION_FUZZY_THRESHOLD=(float, 0),
+    TRANSLATION_FUZZY_REFRESH_INTERVAL=(float, 5),
+    JOB_CHUNK_CHARACTERS=(int, 5000),
+    JOB_LEASE=(int, 120),
+    JOB_MAX_ATTEMPTS=(int, 3),
+    JOB_POLL_INTERVAL=(float, 1),
+    JOB_MAX_WAIT=(float, 30),
+    PROVIDER_RATE_LIMITS=(dict, {}),
+    PROVIDER_CONCURRENCY=(int, 16),
+    PROVIDER_QUEUE_SIZE=(int, 32),
+    PROVIDER_QUEUE_TIMEOUT=(float, 5),
+    PROVIDER_INTERACTIVE_RESERVE=(int, 4),
+    PRIORITY_DEFAULT=(str, "interactive"),
+    PRIORITY_API_KEYS=(dict, {}),
+    REQUEST_TIMEOUT=(float, 0),
+    REQUEST_TIMEOUTS=(dict, {}),
+    IDEMPOTENCY_KEY_TTL=(int, 86400),
+    IDEMPOTENCY_LEASE=(int, 60),
+    IDEMPOTENCY_MAX_WAIT=(float, 30),
+    RATE_LIMIT_BURST=(float, 1),
+    RATE_LIMIT_MAX_WAIT=(float, 2),
+    PROVIDER_ROUTING=(bool, False),
+    ROUTING_HEDGE=(bool, False),
+    ROUTING_WINDOW=(int, 100),
+    ROUTING_MIN_SAMPLES=(int, 20),
+    ROUTING_FAILURE_THRESHOLD=(int, 5),
+    ROUTING_RESET_TIMEOUT=(float, 30),
 )
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -52,6 +99,8 @@ INSTALLED_APPS = [
     "languages",
     "nlp",
     "preferences",
+    "jobs",
+    "idempotency",
 ]
 
 MIDDLEWARE = [
@@ -63,6 +112,8 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "decyphr.priority.PriorityMiddleware",
+    "decyphr.deadlines.DeadlineMiddleware",
 ]
 
 ROOT_URLCONF = "decyphr.urls"
@@ -138,6 +189,11 @@ STATIC_URL = "static/"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+REST_FRAMEWORK = {
+    # Answers provider outages with a 503 and passed deadlines with a 504
+    "EXCEPTION_HANDLER": "decyphr.errors.exception_handler",
+}
+
 DEEPL_API_KEY = env("DEEPL_API_KEY")
 
 AWS_REGION = env("AWS_REGION")
@@ -147,7 +203,167 @@ AWS_SECRET_ACCESS_KEY = env("AWS_SECRET_ACCESS_KEY")
 GOOGLE_CLOUD_CRED_FILE_NAME = env("GOOGLE_CLOUD_CRED_FILE_NAME")
 GOOGLE_CLOUD_SCOPES = [env("GOOGLE_CLOUD_SCOPES")]
 
+# The number of keep-alive connections each pooled provider client may hold open
+PROVIDER_MAX_POOL_CONNECTIONS = env("PROVIDER_MAX_POOL_CONNECTIONS")
+
+# The number of provider calls the async views can have in flight per process, and
+# the number of calls that batches can be split into across the process
+PROVIDER_IO_THREADS = env("PROVIDER_IO_THREADS")
+
+# Translation memory: the number of translations held in process and how long (in
+# seconds) each one is kept before it has to be looked up in the DB again
+TRANSLATION_MEMORY_MAX_SIZE = env("TRANSLATION_MEMORY_MAX_SIZE")
+TRANSLATION_MEMORY_TTL = env("TRANSLATION_MEMORY_TTL")
+
+# The maximum number of texts that can be sent to `POST /translate/batch/` at once
+TRANSLATION_BATCH_MAX_TEXTS = env("TRANSLATION_BATCH_MAX_TEXTS")
+
+# The number of batches of texts a single request can have in flight with a provider
+TRANSLATION_MAX_PARALLEL_BATCHES = env("TRANSLATION_MAX_PARALLEL_BATCHES")
+
+# Texts longer than this many characters are split into sentences which are
+# translated (and cached) separately
+TRANSLATION_SEGMENT_THRESHOLD = env("TRANSLATION_SEGMENT_THRESHOLD")
+
+# The longest text, in characters, that can be sent to `POST /translate/`. Longer
+# documents are translated as background jobs
+TRANSLATION_MAX_TEXT_LENGTH = env("TRANSLATION_MAX_TEXT_LENGTH")
+
+# How long (in milliseconds) a single-text translation waits for concurrent requests
+# for the same translator and language pair to join it in one provider call. 0
+# disables micro-batching
+TRANSLATION_MICRO_BATCH_WINDOW = env("TRANSLATION_MICRO_BATCH_WINDOW")
+
+# Where state shared between the worker processes on a host, such as locks and
+# counters, is kept
+RUNTIME_DIR = Path(env("RUNTIME_DIR", default=str(BASE_DIR / "run")))
+
+# Identical provider calls in flight at the same time are always coalesced within a
+# process. Enable this to coalesce them across the processes on a host too, waiting
+# up to `SINGLE_FLIGHT_TIMEOUT` seconds for another process's call to finish
+SINGLE_FLIGHT_CROSS_PROCESS = env("SINGLE_FLIGHT_CROSS_PROCESS")
+SINGLE_FLIGHT_TIMEOUT = env("SINGLE_FLIGHT_TIMEOUT")
+
+# Processed text pieces are written to the DB in batches of this many rows
+NLP_BULK_CREATE_BATCH_SIZE = env("NLP_BULK_CREATE_BATCH_SIZE")
+
+# Deduplicated vocabulary mode: store each distinct (text, pos_tag, language) once
+# and record where it appears as a `TextPieceOccurrence`, rather than storing every
+# text piece of every processed text
+NLP_DEDUPLICATE_VOCABULARY = env("NLP_DEDUPLICATE_VOCABULARY")
+
+# NLP analysis cache: the number of processed texts whose text pieces are held in
+# process and how long (in seconds) each one is kept before it has to be looked up
+# in the DB again
+NLP_ANALYSIS_CACHE_MAX_SIZE = env("NLP_ANALYSIS_CACHE_MAX_SIZE")
+NLP_ANALYSIS_CACHE_TTL = env("NLP_ANALYSIS_CACHE_TTL")
+
+# The maximum number of texts that can be sent to `POST /nlp/batch/` at once, and
+# the number of calls to the NLP provider a single request can have in flight
+NLP_BATCH_MAX_TEXTS = env("NLP_BATCH_MAX_TEXTS")
+NLP_MAX_PARALLEL_CALLS = env("NLP_MAX_PARALLEL_CALLS")
+
+# Where the lexicons used by the offline `local` NLP processor are kept
+NLP_LOCAL_LEXICON_DIR = Path(
+    env("NLP_LOCAL_LEXICON_DIR", default=str(BASE_DIR / "nlp" / "lexicons"))
+)
+
+# The number of rows fetched from the DB at a time when exporting translations or
+# text pieces
+EXPORT_CHUNK_SIZE = env("EXPORT_CHUNK_SIZE")
+
+# The number of translations written to the DB at a time, each batch in its own
+# transaction, when importing a translation memory
+TRANSLATION_IMPORT_BATCH_SIZE = env("TRANSLATION_IMPORT_BATCH_SIZE")
+
+# Fuzzy matching: when a text isn't in the translation memory, return the stored
+# translation of the most similar text instead of calling the translator, if the
+# texts are at least this similar (0 to 1, 0 disables fuzzy matching). Each process
+# loads the translations saved by the others every REFRESH_INTERVAL seconds
+TRANSLATION_FUZZY_THRESHOLD = env("TRANSLATION_FUZZY_THRESHOLD")
+TRANSLATION_FUZZY_REFRESH_INTERVAL = env("TRANSLATION_FUZZY_REFRESH_INTERVAL")
+
+# Background jobs: documents are split into chunks of up to CHUNK_CHARACTERS, which
+# are run one at a time by the `run_jobs` workers. A worker holds a job for LEASE
+# seconds after each chunk, after which another worker may pick it up. Failed jobs
+# are tried up to MAX_ATTEMPTS times. Workers poll for jobs, and clients can wait
+# for a job to progress for up to MAX_WAIT seconds, every POLL_INTERVAL seconds
+JOB_CHUNK_CHARACTERS = env("JOB_CHUNK_CHARACTERS")
+JOB_LEASE = env("JOB_LEASE")
+JOB_MAX_ATTEMPTS = env("JOB_MAX_ATTEMPTS")
+JOB_POLL_INTERVAL = env("JOB_POLL_INTERVAL")
+JOB_MAX_WAIT = env("JOB_MAX_WAIT")
+
+# Rate limits: the characters per second each provider may be sent from this host,
+# e.g. `PROVIDER_RATE_LIMITS=translate.amazon=1000,nlp.google=500`. The names are
+# `translate.` or `nlp.` followed by the provider, and providers without a limit
+# aren't metered. Up to BURST seconds worth of characters may be sent at once, and
+# calls wait up to MAX_WAIT seconds for the limit before being refused. Each limit
+# is shared by the processes on the host, per region, and is lowered while the
+# provider throttles calls
+PROVIDER_RATE_LIMITS = {
+    name: float(rate) for name, rate in env("PROVIDER_RATE_LIMITS").items()
+}
+RATE_LIMIT_BURST = env("RATE_LIMIT_BURST")
+RATE_LIMIT_MAX_WAIT = env("RATE_LIMIT_MAX_WAIT")
+
+# Admission control: each process lets up to CONCURRENCY requests call a provider
+# at once. Up to QUEUE_SIZE more wait for up to QUEUE_TIMEOUT seconds, and the rest
+# are refused with a 503 straight away, so that a slow provider can't tie up every
+# worker thread. A CONCURRENCY of 0 turns admission control off
+PROVIDER_CONCURRENCY = env("PROVIDER_CONCURRENCY")
+PROVIDER_QUEUE_SIZE = env("PROVIDER_QUEUE_SIZE")
+PROVIDER_QUEUE_TIMEOUT = env("PROVIDER_QUEUE_TIMEOUT")
+
+# Priority lanes: requests are `interactive` or `bulk`, as set by the `X-Priority`
+# header or, for the API keys in PRIORITY_API_KEYS (e.g. `nightly-key=bulk`), by
+# the `X-Api-Key` header, and PRIORITY_DEFAULT otherwise. Background jobs are
+# always bulk. INTERACTIVE_RESERVE of each provider's CONCURRENCY slots are kept
+# for interactive requests
+PROVIDER_INTERACTIVE_RESERVE = env("PROVIDER_INTERACTIVE_RESERVE")
+PRIORITY_DEFAULT = env("PRIORITY_DEFAULT")
+PRIORITY_API_KEYS = env("PRIORITY_API_KEYS")
+
+# Deadlines: a request must be answered within the seconds given in its
+# `X-Request-Timeout` header or, without one, the REQUEST_TIMEOUTS default for its
+# path (e.g. `/translate/=5,/nlp/=5`), or REQUEST_TIMEOUT (0 for no deadline). The
+# time left is handed to the provider SDKs as their timeout, and work that can't
+# finish in time is abandoned with a 504
+REQUEST_TIMEOUT = env("REQUEST_TIMEOUT")
+REQUEST_TIMEOUTS = {
+    prefix: float(timeout) for prefix, timeout in env("REQUEST_TIMEOUTS").items()
+}
+
+# Idempotency keys: the first response to a create request with an
+# `Idempotency-Key` header is kept for KEY_TTL seconds and returned to any retry
+# with the same key. A retry that arrives while the first request is running waits
+# for it for up to MAX_WAIT seconds. A request holds its key for LEASE seconds,
+# after which a retry may run in its place
+IDEMPOTENCY_KEY_TTL = env("IDEMPOTENCY_KEY_TTL")
+IDEMPOTENCY_LEASE = env("IDEMPOTENCY_LEASE")
+IDEMPOTENCY_MAX_WAIT = env("IDEMPOTENCY_MAX_WAIT")
+
+# Routing mode: fall back to the other providers when the requested one fails or
+# its circuit breaker is open. Latency and errors are tracked over the last
+# `ROUTING_WINDOW` calls per provider and language pair, and a breaker opens for
+# `ROUTING_RESET_TIMEOUT` seconds after `ROUTING_FAILURE_THRESHOLD` failures in a
+# row. With hedging, calls slower than the provider's p95 (once there are
+# `ROUTING_MIN_SAMPLES` samples) are duplicated to the next provider
+PROVIDER_ROUTING = env("PROVIDER_ROUTING")
+ROUTING_HEDGE = env("ROUTING_HEDGE")
+ROUTING_WINDOW = env("ROUTING_WINDOW")
+ROUTING_MIN_SAMPLES = env("ROUTING_MIN_SAMPLES")
+ROUTING_FAILURE_THRESHOLD = env("ROUTING_FAILURE_THRESHOLD")
+ROUTING_RESET_TIMEOUT = env("ROUTING_RESET_TIMEOUT")
+
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
     "http://127.0.0.1:5173",
 ]
+
+CORS_ALLOW_HEADERS = (
+    *default_headers,
+    "x-priority",
+    "x-api-key",
+    "idempotency-key",
+)
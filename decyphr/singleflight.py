@@ -0,0 +1,247 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import uuid
+from threading import Event, Lock
+from typing import Any, Callable, Self
+
+from django.conf import settings
+
+from decyphr import deadlines, stats
+from decyphr.exceptions import DeadlineExceededException
+from decyphr.localstore import LocalStore, local_store
+
+FLIGHTS_TABLE = """
+CREATE TABLE IF NOT EXISTS flights (
+    key TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    updated REAL NOT NULL,
+    done INTEGER NOT NULL DEFAULT 0,
+    result TEXT
+)
+"""
+
+FLIGHTS_INDEX = "CREATE INDEX IF NOT EXISTS flights_updated ON flights (updated)"
+
+# How often a process waiting on another process's call checks for its result
+POLL_INTERVAL = 0.01
+
+
+def identity(value: Any) -> Any:
+    return value
+
+
+class Call:
+    event: Event
+    result: Any
+    error: Exception | None
+
+    def __init__(self: Self) -> None:
+        self.event = Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Single Flight
+
+    Coalesces identical provider calls that are in flight at the same time. The first
+    caller for a key makes the call and every concurrent caller with the same key
+    waits for, and shares, its result instead of making a call of its own.
+
+    Callers are coalesced across the threads of a process. When a `LocalStore` is
+    given, callers in different processes on the same host are coalesced too, using
+    a lock table in the store: the process that claims the key makes the call and
+    publishes its result for `result_ttl` seconds, which covers the time it takes
+    the caller to persist the result to the DB. Results are published as JSON, so
+    results that aren't JSON need an `encode` and `decode` to be shared.
+    """
+
+    calls: dict[str, Call]
+    lock: Lock
+    saved: int
+    store: LocalStore | None
+    timeout: float
+    result_ttl: float
+
+    def __init__(
+        self: Self,
+        store: LocalStore | None = None,
+        timeout: float = 30,
+        result_ttl: float = 5,
+    ) -> None:
+        self.calls = {}
+        self.lock = Lock()
+        self.saved = 0
+        self.store = store
+        self.timeout = timeout
+        self.result_ttl = result_ttl
+        os.register_at_fork(after_in_child=self.reset)
+
+    def reset(self: Self) -> None:
+        self.calls = {}
+        self.lock = Lock()
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        return ":".join(str(part) for part in parts)
+
+    def do(
+        self: Self,
+        key: str,
+        func: Callable[[], Any],
+        encode: Callable[[Any], Any] = identity,
+        decode: Callable[[Any], Any] = identity,
+    ) -> Any:
+        """Do
+
+        Call `func`, unless a call with the same key is already in flight, in which
+        case wait for that call to finish and return its result.
+
+        Args:
+            key (str): Identifies calls that are interchangeable
+            func (Callable[[], Any]): Makes the call
+            encode (Callable[[Any], Any]): Turns the result into something that can
+                be published to other processes as JSON
+            decode (Callable[[Any], Any]): Turns a published result back into a
+                result
+
+        Returns:
+            Any: The result of the call
+
+        Raises:
+            Any exception raised by the call is raised to every caller sharing it,
+            except for the call running out of the time its caller had. A caller
+            with time left makes the call again instead
+        """
+        while True:
+            with self.lock:
+                call = self.calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self.calls[key] = Call()
+                else:
+                    self.saved += 1
+
+            if leader:
+                break
+
+            if not call.event.wait(deadlines.remaining()):
+                raise DeadlineExceededException("single_flight")
+            if isinstance(call.error, DeadlineExceededException):
+                deadlines.check("single_flight")
+                continue
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self.run(key, func, encode, decode)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.event.set()
+
+        return call.result
+
+    def run(
+        self: Self,
+        key: str,
+        func: Callable[[], Any],
+        encode: Callable[[Any], Any],
+        decode: Callable[[Any], Any],
+    ) -> Any:
+        if self.store is None:
+            return func()
+
+        connection = self.store.table("flights", FLIGHTS_TABLE, FLIGHTS_INDEX)
+        store_key = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        owner = uuid.uuid4().hex
+        deadline = time.monotonic() + self.timeout
+
+        while not self.claim(connection, store_key, owner):
+            row = connection.execute(
+                "SELECT done, result FROM flights WHERE key = ?", (store_key,)
+            ).fetchone()
+
+            if row is not None and row[0]:
+                with self.lock:
+                    self.saved += 1
+                return decode(json.loads(row[1]))
+
+            if time.monotonic() > deadline:
+                return func()
+
+            deadlines.check("single_flight")
+            time.sleep(POLL_INTERVAL)
+
+        try:
+            result = func()
+        except Exception:
+            connection.execute(
+                "DELETE FROM flights WHERE key = ? AND owner = ?", (store_key, owner)
+            )
+            raise
+
+        now = time.time()
+        connection.execute(
+            """
+            UPDATE flights SET done = 1, result = ?, updated = ?
+            WHERE key = ? AND owner = ?
+            """,
+            (json.dumps(encode(result)), now, store_key, owner),
+        )
+        connection.execute(
+            "DELETE FROM flights WHERE done = 1 AND updated < ?",
+            (now - self.result_ttl,),
+        )
+        return result
+
+    def claim(self: Self, connection: sqlite3.Connection, key: str, owner: str) -> bool:
+        """Claim
+
+        Try to become the process that makes the call for the key. Rows left behind
+        by finished calls older than `result_ttl`, or by calls that have been running
+        for longer than `timeout` (e.g. their process died), are replaced.
+
+        Returns:
+            bool: Whether the key was claimed
+        """
+        now = time.time()
+        cursor = connection.execute(
+            """
+            INSERT INTO flights (key, owner, updated, done) VALUES (?, ?, ?, 0)
+            ON CONFLICT (key) DO UPDATE SET
+                owner = excluded.owner,
+                updated = excluded.updated,
+                done = 0,
+                result = NULL
+            WHERE (flights.done = 1 AND flights.updated < ?)
+                OR (flights.done = 0 AND flights.updated < ?)
+            """,
+            (key, owner, now, now - self.result_ttl, now - self.timeout),
+        )
+        return cursor.rowcount == 1
+
+    def stats(self: Self) -> dict[str, int]:
+        """Stats
+
+        Returns:
+            dict[str, int]: The number of calls in flight and the number of calls
+                saved by sharing the result of another call
+        """
+        with self.lock:
+            return {"in_flight": len(self.calls), "saved": self.saved}
+
+
+single_flight = SingleFlight(
+    store=local_store if settings.SINGLE_FLIGHT_CROSS_PROCESS else None,
+    timeout=settings.SINGLE_FLIGHT_TIMEOUT,
+)
+
+stats.register("single_flight", single_flight.stats)
@@ -0,0 +1,24 @@
+from typing import Any, Callable
+
+collectors: dict[str, Callable[[], dict[str, Any]]] = {}
+
+
+def register(name: str, collector: Callable[[], dict[str, Any]]) -> None:
+    """Register
+
+    Add a set of counters to those reported by `GET /stats/`
+
+    Args:
+        name (str): The name the counters are reported under
+        collector (Callable[[], dict[str, Any]]): Returns the current counters
+    """
+    collectors[name] = collector
+
+
+def collect() -> dict[str, dict[str, Any]]:
+    """Collect
+
+    Returns:
+        dict[str, dict[str, Any]]: The current value of every registered counter
+    """
+    return {name: collector() for name, collector in collectors.items()}
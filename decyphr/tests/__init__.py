@@ -0,0 +1,19 @@
+from decyphr.tests.admission import AdmissionTestCase
+from decyphr.tests.clients import ClientRegistryTestCase
+from decyphr.tests.deadlines import DeadlineTestCase
+from decyphr.tests.executors import ExecutorsTestCase
+from decyphr.tests.priority import PriorityMiddlewareTestCase
+from decyphr.tests.ratelimit import RateLimiterTestCase
+from decyphr.tests.routing import RouterTestCase
+from decyphr.tests.singleflight import SingleFlightTestCase
+
+__all__ = [
+    AdmissionTestCase,
+    ClientRegistryTestCase,
+    DeadlineTestCase,
+    ExecutorsTestCase,
+    PriorityMiddlewareTestCase,
+    RateLimiterTestCase,
+    RouterTestCase,
+    SingleFlightTestCase,
+]
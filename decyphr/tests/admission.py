@@ -0,0 +1,132 @@
+from threading import Event, Thread
+from typing import Self
+
+from django.test import SimpleTestCase
+
+from decyphr.admission import Admission, ProviderPool
+from decyphr.exceptions import ProviderUnavailableException
+from decyphr.priority import BULK, INTERACTIVE
+
+
+class AdmissionTestCase(SimpleTestCase):
+    def test_calls_over_the_queue_are_refused(self: Self) -> None:
+        admission = Admission(concurrency=1, queue_size=1, queue_timeout=5)
+        release = Event()
+        order = []
+
+        def call(name: str) -> None:
+            with admission.admit("translate.deepl"):
+                order.append(name)
+                release.wait()
+
+        first = Thread(target=call, args=["first"])
+        first.start()
+        while admission.stats()["translate.deepl"]["active"] != 1:
+            pass
+
+        second = Thread(target=call, args=["second"])
+        second.start()
+        while admission.stats()["translate.deepl"]["queue_depth"] != 1:
+            pass
+
+        with self.assertRaises(ProviderUnavailableException) as raised:
+            with admission.admit("translate.deepl"):
+                self.fail("Admitted over the queue")
+        self.assertEqual(raised.exception.retry_after, 1)
+
+        # Other providers have their own slots
+        with admission.admit("translate.google"):
+            pass
+
+        release.set()
+        first.join()
+        second.join()
+
+        self.assertEqual(order, ["first", "second"])
+        stats = admission.stats()["translate.deepl"]
+        self.assertEqual(stats["active"], 0)
+        self.assertEqual(stats["admitted"], 2)
+        self.assertEqual(stats["rejected"], 1)
+
+    def test_calls_time_out_waiting_for_a_slot(self: Self) -> None:
+        admission = Admission(concurrency=1, queue_size=1, queue_timeout=0.01)
+
+        # The slot is held by this thread while another thread waits for it
+        with admission.admit("nlp.amazon"):
+            with self.assertRaises(ProviderUnavailableException):
+                self.admit_in_thread(admission, "nlp.amazon")
+
+        stats = admission.stats()["nlp.amazon"]
+        self.assertEqual(stats["timed_out"], 1)
+        self.assertEqual(stats["queue_depth"], 0)
+
+    def admit_in_thread(self: Self, admission: Admission, name: str) -> None:
+        errors = []
+
+        def call() -> None:
+            try:
+                with admission.admit(name):
+                    pass
+            except ProviderUnavailableException as e:
+                errors.append(e)
+
+        thread = Thread(target=call)
+        thread.start()
+        thread.join()
+        if errors:
+            raise errors[0]
+
+    def test_nested_calls_reuse_the_slot(self: Self) -> None:
+        admission = Admission(concurrency=1, queue_size=0, queue_timeout=0)
+
+        with admission.admit("translate.amazon"):
+            with admission.admit("translate.amazon"):
+                pass
+
+        self.assertEqual(admission.stats()["translate.amazon"]["admitted"], 1)
+
+    def test_admission_can_be_turned_off(self: Self) -> None:
+        admission = Admission(concurrency=0, queue_size=0, queue_timeout=0)
+
+        with admission.admit("translate.amazon"):
+            pass
+
+        self.assertEqual(admission.stats(), {})
+
+    def test_slots_are_reserved_for_interactive_calls(self: Self) -> None:
+        pool = ProviderPool("translate.deepl", limit=2, max_queue=5, reserve=1)
+
+        self.assertIsNone(pool.try_acquire(BULK))
+        waiter = pool.try_acquire(BULK)
+        self.assertIsNotNone(waiter)
+        self.assertIsNone(pool.try_acquire(INTERACTIVE))
+
+        # The bulk slot is handed to the waiting bulk call, never the reserved one
+        pool.release(INTERACTIVE)
+        self.assertFalse(waiter.event.is_set())
+        pool.release(BULK)
+        self.assertTrue(waiter.event.is_set())
+        self.assertEqual(pool.stats()["lanes"][BULK]["active"], 1)
+
+    def test_lanes_share_slots_by_weight(self: Self) -> None:
+        pool = ProviderPool("translate.deepl", limit=1, max_queue=10)
+        self.assertIsNone(pool.try_acquire(INTERACTIVE))
+
+        waiters = [pool.try_acquire(lane) for lane in [BULK, BULK, *[INTERACTIVE] * 5]]
+        order = []
+        lane = INTERACTIVE
+        for _ in waiters:
+            pool.release(lane)
+            waiter = next(
+                waiter
+                for waiter in waiters
+                if waiter.event.is_set() and waiter not in order
+            )
+            order.append(waiter)
+            lane = waiter.lane
+
+        # Interactive calls go first, but bulk calls aren't starved by them
+        self.assertEqual(
+            [waiter.lane for waiter in order],
+            [INTERACTIVE] * 4 + [BULK, INTERACTIVE, BULK],
+        )
@@ -0,0 +1,110 @@
+import os
+import time
+from typing import Self
+from unittest.mock import MagicMock, patch
+
+from deepl.http_client import HttpClient
+from django.test import SimpleTestCase
+from google.auth.transport.requests import AuthorizedSession
+
+from decyphr import deadlines
+from decyphr.clients import (
+    DeadlineHttpClient,
+    DeadlineSession,
+    get_boto3_client,
+    get_deepl_translator,
+    registry,
+)
+
+
+class ClientRegistryTestCase(SimpleTestCase):
+    def setUp(self: Self) -> None:
+        registry.reset()
+        self.addCleanup(registry.reset)
+
+    def set_deadline(self: Self, timeout: float) -> None:
+        token = deadlines.deadline.set(time.monotonic() + timeout)
+        self.addCleanup(deadlines.deadline.reset, token)
+
+    def get_translate_client(self: Self, timeout: float | None = None) -> object:
+        return get_boto3_client("translate", "eu-west-1", "key", "secret", timeout)
+
+    def test_clients_are_reused_within_a_tier(self: Self) -> None:
+        self.assertIs(self.get_translate_client(), self.get_translate_client())
+        self.assertIs(self.get_translate_client(2.2), self.get_translate_client(4.9))
+        self.assertIs(get_deepl_translator("key"), get_deepl_translator("key"))
+
+    def test_clients_are_kept_apart_across_tiers(self: Self) -> None:
+        untimed = self.get_translate_client()
+        short = self.get_translate_client(1.5)
+        long = self.get_translate_client(45)
+
+        self.assertEqual(len({id(untimed), id(short), id(long)}), 3)
+        self.assertEqual(short.meta.config.read_timeout, 1)
+        self.assertEqual(long.meta.config.read_timeout, 30)
+        self.assertIsNot(get_deepl_translator("key"), get_deepl_translator("other"))
+
+    def test_clients_are_rebuilt_after_a_reset(self: Self) -> None:
+        client = self.get_translate_client(5)
+        translator = get_deepl_translator("key")
+
+        registry.reset()
+
+        self.assertIsNot(self.get_translate_client(5), client)
+        self.assertIsNot(get_deepl_translator("key"), translator)
+
+    def test_clients_are_dropped_in_a_forked_child(self: Self) -> None:
+        self.get_translate_client()
+
+        pid = os.fork()
+        if pid == 0:
+            os._exit(0 if not registry.clients else 1)
+
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(os.waitstatus_to_exitcode(status), 0)
+        self.assertEqual(len(registry.clients), 1)
+
+    @patch.object(HttpClient, "_internal_request")
+    def test_deepl_calls_are_capped_at_the_deadline(
+        self: Self, internal_request: MagicMock
+    ) -> None:
+        client = DeadlineHttpClient()
+
+        client._internal_request("request", False, 10)
+        self.assertEqual(internal_request.call_args.args[2], 10)
+
+        self.set_deadline(2)
+        client._internal_request("request", False, 10)
+        self.assertAlmostEqual(internal_request.call_args.args[2], 2, places=1)
+
+        self.set_deadline(0.1)
+        client._internal_request("request", False, 10)
+        self.assertEqual(internal_request.call_args.args[2], deadlines.MIN_TIMEOUT)
+
+    @patch.object(HttpClient, "_should_retry", return_value=True)
+    def test_deepl_calls_are_only_retried_with_time_left(
+        self: Self, should_retry: MagicMock
+    ) -> None:
+        client = DeadlineHttpClient()
+
+        self.assertTrue(client._should_retry(None, None, 0))
+
+        self.set_deadline(0.1)
+        self.assertFalse(client._should_retry(None, None, 0))
+
+    @patch.object(AuthorizedSession, "request")
+    def test_google_calls_are_capped_at_the_deadline(
+        self: Self, request: MagicMock
+    ) -> None:
+        session = DeadlineSession(MagicMock())
+
+        session.request("POST", "https://translation.googleapis.com")
+        self.assertNotIn("timeout", request.call_args.kwargs)
+
+        self.set_deadline(3)
+        session.request("POST", "https://translation.googleapis.com")
+        self.assertAlmostEqual(request.call_args.kwargs["timeout"], 3, places=1)
+        self.assertEqual(
+            request.call_args.kwargs["max_allowed_time"],
+            request.call_args.kwargs["timeout"],
+        )
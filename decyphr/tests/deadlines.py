@@ -0,0 +1,68 @@
+import time
+from threading import Thread
+from typing import Self
+
+from django.http import HttpRequest, HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from decyphr import deadlines
+from decyphr.admission import Admission
+from decyphr.exceptions import DeadlineExceededException
+
+
+@override_settings(REQUEST_TIMEOUT=0, REQUEST_TIMEOUTS={"/translate/": 5.0})
+class DeadlineTestCase(SimpleTestCase):
+    def get_remaining(self: Self, path: str, **headers: str) -> float | None:
+        remaining = []
+
+        def view(request: HttpRequest) -> HttpResponse:
+            remaining.append(deadlines.remaining())
+            return HttpResponse()
+
+        deadlines.DeadlineMiddleware(view)(RequestFactory().get(path, headers=headers))
+        return remaining[0]
+
+    def test_deadline_is_set_by_header_or_endpoint(self: Self) -> None:
+        self.assertIsNone(self.get_remaining("/nlp/"))
+        self.assertAlmostEqual(self.get_remaining("/translate/"), 5, places=1)
+        self.assertAlmostEqual(
+            self.get_remaining("/nlp/", **{"X-Request-Timeout": "2"}), 2, places=1
+        )
+        self.assertIsNone(deadlines.deadline.get())
+
+    def test_calls_fail_once_the_deadline_has_passed(self: Self) -> None:
+        token = deadlines.deadline.set(time.monotonic() + 0.05)
+        try:
+            with deadlines.within_deadline("translate.amazon") as timeout:
+                self.assertLessEqual(timeout, 0.5)
+
+            with self.assertRaises(DeadlineExceededException) as raised:
+                with deadlines.within_deadline("translate.amazon"):
+                    time.sleep(0.1)
+                    raise TimeoutError()
+            self.assertEqual(raised.exception.stage, "translate.amazon")
+
+            with self.assertRaises(DeadlineExceededException):
+                with deadlines.within_deadline("translate.amazon"):
+                    self.fail("Called past the deadline")
+        finally:
+            deadlines.deadline.reset(token)
+
+    def test_admission_waits_no_longer_than_the_deadline(self: Self) -> None:
+        admission = Admission(concurrency=1, queue_size=1, queue_timeout=5)
+        errors = []
+
+        def call() -> None:
+            deadlines.deadline.set(time.monotonic() + 0.05)
+            try:
+                with admission.admit("nlp.google"):
+                    pass
+            except DeadlineExceededException as e:
+                errors.append(e)
+
+        with admission.admit("nlp.google"):
+            thread = Thread(target=call)
+            thread.start()
+            thread.join()
+
+        self.assertEqual(errors[0].stage, "admission")
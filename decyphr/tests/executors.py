@@ -0,0 +1,29 @@
+from typing import Self
+
+from django.test import SimpleTestCase, override_settings
+
+from decyphr.clients import registry
+from decyphr.executors import get_provider_executor, map_in_provider_executor
+
+
+def double_all(items: list[int]) -> list[int]:
+    return map_in_provider_executor(lambda item: item * 2, items, 2)
+
+
+@override_settings(PROVIDER_IO_THREADS=1)
+class ExecutorsTestCase(SimpleTestCase):
+    def setUp(self: Self) -> None:
+        registry.reset()
+        self.addCleanup(registry.reset)
+
+    def test_map_from_a_provider_thread(self: Self) -> None:
+        future = get_provider_executor().submit(double_all, [1, 2, 3])
+
+        self.assertEqual(future.result(timeout=5), [2, 4, 6])
+
+    def test_nested_maps_run_inline(self: Self) -> None:
+        future = get_provider_executor().submit(
+            map_in_provider_executor, double_all, [[1, 2], [3, 4]], 2
+        )
+
+        self.assertEqual(future.result(timeout=5), [[2, 4], [6, 8]])
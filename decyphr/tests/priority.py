@@ -0,0 +1,46 @@
+from typing import Self
+
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpRequest, HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from decyphr.priority import BULK, INTERACTIVE, PriorityMiddleware, priority_class
+
+
+@override_settings(PRIORITY_API_KEYS={"nightly": BULK}, PRIORITY_DEFAULT=INTERACTIVE)
+class PriorityMiddlewareTestCase(SimpleTestCase):
+    def get_priority_class(self: Self, **headers: str) -> str:
+        lanes = []
+
+        def view(request: HttpRequest) -> HttpResponse:
+            lanes.append(priority_class.get())
+            return HttpResponse()
+
+        response = PriorityMiddleware(view)(RequestFactory().get("/", headers=headers))
+        self.assertEqual(response["X-Priority"], lanes[0])
+        return lanes[0]
+
+    def test_priority_class_is_set_by_header(self: Self) -> None:
+        self.assertEqual(self.get_priority_class(), INTERACTIVE)
+        self.assertEqual(self.get_priority_class(**{"X-Priority": "Bulk"}), BULK)
+        self.assertEqual(
+            self.get_priority_class(**{"X-Priority": "urgent"}), INTERACTIVE
+        )
+
+    def test_api_key_overrides_header(self: Self) -> None:
+        self.assertEqual(
+            self.get_priority_class(
+                **{"X-Api-Key": "nightly", "X-Priority": "interactive"}
+            ),
+            BULK,
+        )
+        self.assertEqual(priority_class.get(), INTERACTIVE)
+
+    def test_unknown_classes_are_refused_on_load(self: Self) -> None:
+        for overrides in (
+            {"PRIORITY_DEFAULT": "interactve"},
+            {"PRIORITY_API_KEYS": {"nightly": "Bulk"}},
+        ):
+            with override_settings(**overrides):
+                with self.assertRaises(ImproperlyConfigured):
+                    PriorityMiddleware(lambda request: HttpResponse())
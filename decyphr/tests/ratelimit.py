@@ -0,0 +1,114 @@
+import tempfile
+from pathlib import Path
+from typing import Self
+from unittest.mock import patch
+
+from botocore.exceptions import ClientError
+from deepl import DeepLException, QuotaExceededException, TooManyRequestsException
+from django.test import SimpleTestCase
+from google.api_core.exceptions import (
+    InvalidArgument,
+    ResourceExhausted,
+    TooManyRequests,
+)
+
+from decyphr.exceptions import ProviderUnavailableException
+from decyphr.localstore import LocalStore
+from decyphr.ratelimit import RateLimiter, is_throttling
+
+
+class ThrottlingException(Exception):
+    pass
+
+
+class RateLimiterTestCase(SimpleTestCase):
+    def setUp(self: Self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = LocalStore(Path(self.directory.name) / "store.sqlite3")
+
+    def tearDown(self: Self) -> None:
+        self.directory.cleanup()
+
+    def make_limiter(self: Self, max_wait: float = 2) -> RateLimiter:
+        return RateLimiter(
+            limits={"translate.amazon": 100},
+            burst=1,
+            max_wait=max_wait,
+            store=self.store,
+        )
+
+    @patch("decyphr.ratelimit.time.sleep")
+    def test_calls_wait_for_the_bucket_to_refill(self: Self, sleep) -> None:
+        first_process = self.make_limiter()
+        second_process = self.make_limiter()
+
+        with first_process.metered("translate.amazon", 100, "eu-west-1"):
+            pass
+        sleep.assert_not_called()
+
+        # The bucket is shared, so the other process waits for it to refill
+        with second_process.metered("translate.amazon", 50, "eu-west-1"):
+            pass
+        self.assertAlmostEqual(sleep.call_args[0][0], 0.5, places=1)
+        self.assertEqual(
+            second_process.stats()["translate.amazon:eu-west-1"]["waits"], 1
+        )
+
+        # Each region has its own bucket
+        sleep.reset_mock()
+        with first_process.metered("translate.amazon", 100, "us-east-1"):
+            pass
+        sleep.assert_not_called()
+
+    @patch("decyphr.ratelimit.time.sleep")
+    def test_calls_are_refused_rather_than_wait_too_long(self: Self, sleep) -> None:
+        limiter = self.make_limiter(max_wait=0.5)
+
+        with limiter.metered("translate.amazon", 100):
+            pass
+        with self.assertRaises(ProviderUnavailableException) as raised:
+            with limiter.metered("translate.amazon", 100):
+                self.fail("Called over the limit")
+
+        self.assertEqual(raised.exception.retry_after, 1)
+        self.assertEqual(limiter.stats()["translate.amazon"]["rejections"], 1)
+
+    @patch("decyphr.ratelimit.time.sleep")
+    def test_rate_is_lowered_when_throttled(self: Self, sleep) -> None:
+        limiter = self.make_limiter()
+
+        with self.assertRaises(ThrottlingException):
+            with limiter.metered("translate.amazon", 10):
+                raise ThrottlingException()
+
+        # The bucket is emptied and refills at half the rate
+        with limiter.metered("translate.amazon", 50):
+            pass
+        self.assertAlmostEqual(sleep.call_args[0][0], 1, places=1)
+        self.assertEqual(limiter.stats()["translate.amazon"]["throttles"], 1)
+
+    def test_providers_without_a_limit_are_not_metered(self: Self) -> None:
+        limiter = self.make_limiter()
+
+        with limiter.metered("translate.deepl", 1_000_000):
+            pass
+
+        self.assertEqual(limiter.stats(), {})
+
+    def test_throttling_errors_are_recognised(self: Self) -> None:
+        for error in (
+            ClientError({"Error": {"Code": "ThrottlingException"}}, "TranslateText"),
+            ResourceExhausted("Quota exceeded"),
+            TooManyRequests("Slow down"),
+            TooManyRequestsException("Too many requests"),
+        ):
+            self.assertTrue(is_throttling(error), error)
+
+        for error in (
+            ClientError({"Error": {"Code": "ValidationException"}}, "TranslateText"),
+            InvalidArgument("Bad language"),
+            DeepLException("Bad request"),
+            QuotaExceededException("Quota for this billing period exceeded"),
+            ValueError(),
+        ):
+            self.assertFalse(is_throttling(error), error)
@@ -0,0 +1,114 @@
+import time
+from typing import Self
+
+from django.test import SimpleTestCase
+
+from decyphr import deadlines
+from decyphr.exceptions import (
+    DeadlineExceededException,
+    ProviderUnavailableException,
+)
+from decyphr.routing import Router, order_candidates
+
+
+class RouterTestCase(SimpleTestCase):
+    def setUp(self: Self) -> None:
+        self.router = Router(failure_threshold=2, reset_timeout=60)
+        self.route = ("translate", "en", "pt")
+
+    def test_order_candidates(self: Self) -> None:
+        self.assertEqual(
+            order_candidates("deepl", ["amazon", "deepl", "google"]),
+            ["deepl", "amazon", "google"],
+        )
+
+    def test_falls_back_when_the_preferred_provider_fails(self: Self) -> None:
+        def call(provider: str) -> str:
+            if provider == "deepl":
+                raise ValueError("Throttled")
+            return f"{provider} translation"
+
+        for _ in range(3):
+            self.assertEqual(
+                self.router.call(["deepl", "amazon"], self.route, call),
+                ("amazon", "amazon translation"),
+            )
+
+        self.assertEqual(self.router.get_breaker("deepl", self.route).state, "open")
+        self.assertEqual(self.router.stats()["fallbacks"], 3)
+
+    def test_raises_when_every_breaker_is_open(self: Self) -> None:
+        def call(provider: str) -> str:
+            raise ValueError("Throttled")
+
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                self.router.call(["deepl", "amazon"], self.route, call)
+
+        with self.assertRaises(ProviderUnavailableException) as context:
+            self.router.call(["deepl", "amazon"], self.route, call)
+        self.assertGreater(context.exception.retry_after, 0)
+
+    def test_refused_trial_call_is_given_back(self: Self) -> None:
+        router = Router(failure_threshold=1, reset_timeout=0)
+        breaker = router.get_breaker("deepl", self.route)
+
+        def fail(provider: str) -> str:
+            raise ValueError("Throttled")
+
+        def refuse(provider: str) -> str:
+            raise ProviderUnavailableException("Too many requests are waiting.", 1)
+
+        with self.assertRaises(ValueError):
+            router.call(["deepl"], self.route, fail)
+        with self.assertRaises(ProviderUnavailableException):
+            router.call(["deepl"], self.route, refuse)
+        self.assertEqual(breaker.state, "open")
+
+        self.assertEqual(
+            router.call(["deepl"], self.route, lambda provider: "Olá"),
+            ("deepl", "Olá"),
+        )
+        self.assertEqual(breaker.state, "closed")
+
+    def test_calls_that_run_out_of_time_are_failures(self: Self) -> None:
+        router = Router(failure_threshold=1, reset_timeout=0)
+        breaker = router.get_breaker("deepl", self.route)
+        health = router.get_health("deepl", self.route)
+
+        def time_out(provider: str) -> str:
+            raise DeadlineExceededException(f"translate.{provider}")
+
+        def wait_for_admission(provider: str) -> str:
+            raise DeadlineExceededException("admission")
+
+        with self.assertRaises(DeadlineExceededException):
+            router.call(["deepl"], self.route, time_out)
+        self.assertEqual(breaker.state, "open")
+
+        # The trial call timing out re-opens the breaker rather than leaving it
+        # half open
+        with self.assertRaises(DeadlineExceededException):
+            router.call(["deepl"], self.route, time_out)
+        self.assertEqual(breaker.state, "open")
+        self.assertEqual(health.error_rate(), 1.0)
+
+        with self.assertRaises(DeadlineExceededException):
+            router.call(["deepl"], self.route, wait_for_admission)
+        self.assertEqual(breaker.state, "open")
+        self.assertEqual(len(health.samples), 2)
+
+        token = deadlines.deadline.set(time.monotonic() - 1)
+        try:
+            with self.assertRaises(DeadlineExceededException):
+                router.call(["deepl"], self.route, lambda provider: "Olá")
+        finally:
+            deadlines.deadline.reset(token)
+        self.assertEqual(breaker.state, "open")
+        self.assertEqual(len(health.samples), 2)
+
+        self.assertEqual(
+            router.call(["deepl"], self.route, lambda provider: "Olá"),
+            ("deepl", "Olá"),
+        )
+        self.assertEqual(breaker.state, "closed")
@@ -0,0 +1,96 @@
+import json
+import tempfile
+import time
+from pathlib import Path
+from threading import Event, Thread
+from typing import Self
+
+from django.test import SimpleTestCase
+
+from decyphr import deadlines
+from decyphr.exceptions import DeadlineExceededException
+from decyphr.localstore import LocalStore
+from decyphr.singleflight import SingleFlight
+
+
+class SingleFlightTestCase(SimpleTestCase):
+    def test_concurrent_calls_are_coalesced(self: Self) -> None:
+        single_flight = SingleFlight()
+        started = Event()
+        release = Event()
+        calls = []
+
+        def call() -> str:
+            calls.append(1)
+            started.set()
+            release.wait()
+            return "Olá"
+
+        results = []
+        leader = Thread(target=lambda: results.append(single_flight.do("key", call)))
+        leader.start()
+        started.wait()
+
+        follower = Thread(target=lambda: results.append(single_flight.do("key", call)))
+        follower.start()
+        while not single_flight.stats()["saved"]:
+            pass
+        release.set()
+        leader.join()
+        follower.join()
+
+        self.assertEqual(results, ["Olá", "Olá"])
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(single_flight.stats(), {"in_flight": 0, "saved": 1})
+
+    def test_calls_out_of_the_leaders_time_are_made_again(self: Self) -> None:
+        single_flight = SingleFlight()
+        started = Event()
+        calls = []
+
+        def call() -> str:
+            calls.append(1)
+            if len(calls) > 1:
+                return "Olá"
+
+            started.set()
+            while not single_flight.stats()["saved"]:
+                pass
+            raise DeadlineExceededException("translate.deepl")
+
+        def request(timeout: float) -> None:
+            deadlines.deadline.set(time.monotonic() + timeout)
+            try:
+                results[timeout] = single_flight.do("key", call)
+            except DeadlineExceededException as e:
+                results[timeout] = e.stage
+
+        results = {}
+        leader = Thread(target=request, args=(0.05,))
+        leader.start()
+        started.wait()
+        follower = Thread(target=request, args=(10,))
+        follower.start()
+        leader.join()
+        follower.join()
+
+        self.assertEqual(results, {0.05: "translate.deepl", 10: "Olá"})
+        self.assertEqual(len(calls), 2)
+
+    def test_results_are_shared_through_the_local_store(self: Self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            store = LocalStore(Path(directory) / "store.sqlite3")
+            first_process = SingleFlight(store=store)
+            second_process = SingleFlight(store=store)
+
+            first_process.do("key", lambda: ("deepl", "Olá"))
+            result = second_process.do(
+                "key", lambda: self.fail("Called twice"), decode=tuple
+            )
+
+            self.assertEqual(result, ("deepl", "Olá"))
+            (published,) = (
+                store.connection().execute("SELECT result FROM flights").fetchone()
+            )
+            self.assertEqual(json.loads(published), ["deepl", "Olá"])
+            self.assertEqual(second_process.stats()["saved"], 1)
@@ -0,0 +1,33 @@
+import hashlib
+import re
+import unicodedata
+
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalise_text(text: str) -> str:
+    """Normalise text
+
+    Produce a canonical form of the text so that trivially different submissions of
+    the same content (unicode composition, runs of whitespace, leading/trailing
+    whitespace) are treated as the same content.
+
+    Args:
+        text (str): The text to normalise
+
+    Returns:
+        str: The normalised text
+    """
+    return WHITESPACE_PATTERN.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def content_hash(text: str) -> str:
+    """Content hash
+
+    Args:
+        text (str): The text to hash
+
+    Returns:
+        str: The hex encoded SHA-256 digest of the normalised text
+    """
+    return hashlib.sha256(normalise_text(text).encode("utf-8")).hexdigest()
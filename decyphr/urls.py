@@ -22,10 +22,12 @@ from drf_yasg.views import get_schema_view
 from rest_framework.permissions import AllowAny
 from rest_framework.routers import DefaultRouter
 
+from decyphr.views import StatsView
+from jobs.views import JobViewSet
 from languages.views import LanguageViewSet
-from nlp.views import NLPViewSet
+from nlp.views import AsyncNLPView, NLPViewSet
 from preferences.views import PreferencesViewSet
-from translate.views import TranslationViewSet
+from translate.views import AsyncTranslationView, TranslationViewSet
 
 schema_view = get_schema_view(
     openapi.Info(
@@ -41,6 +43,7 @@ router.register(r"translate", TranslationViewSet, basename="translate")
 router.register(r"nlp", NLPViewSet, basename="nlp")
 router.register(r"languages", LanguageViewSet, basename="languages")
 router.register(r"preferences", PreferencesViewSet, basename="preferences")
+router.register(r"jobs", JobViewSet, basename="jobs")
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -53,6 +56,9 @@ urlpatterns = [
         name="schema-swagger-ui",
     ),
     path("redoc/", schema_view.with_ui("redoc", cache_timeout=0), name="schema-redoc"),
+    path("translate/async/", AsyncTranslationView.as_view(), name="translate-async"),
+    path("nlp/async/", AsyncNLPView.as_view(), name="nlp-async"),
+    path("stats/", StatsView.as_view(), name="stats"),
 ]
 
 urlpatterns += router.urls
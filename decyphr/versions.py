@@ -0,0 +1,44 @@
+from typing import Self
+
+from decyphr.localstore import LocalStore, local_store
+
+VERSIONS_TABLE = """
+CREATE TABLE IF NOT EXISTS versions (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+)
+"""
+
+
+class VersionStamp:
+    """Version Stamp
+
+    A counter shared by the worker processes on a host, used to tell the other
+    processes that data they hold in memory has changed. Whoever changes the data
+    bumps the stamp, and each process rebuilds its copy when the stamp no longer
+    matches the one it was built at.
+    """
+
+    name: str
+    store: LocalStore
+
+    def __init__(self: Self, name: str, store: LocalStore = local_store) -> None:
+        self.name = name
+        self.store = store
+
+    def get(self: Self) -> int:
+        row = (
+            self.store.table("versions", VERSIONS_TABLE)
+            .execute("SELECT version FROM versions WHERE name = ?", (self.name,))
+            .fetchone()
+        )
+        return row[0] if row else 0
+
+    def bump(self: Self) -> None:
+        self.store.table("versions", VERSIONS_TABLE).execute(
+            """
+            INSERT INTO versions (name, version) VALUES (?, 1)
+            ON CONFLICT (name) DO UPDATE SET version = version + 1
+            """,
+            (self.name,),
+        )
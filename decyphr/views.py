@@ -0,0 +1,39 @@
+from typing import Self
+
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from decyphr import stats
+
+
+class StatsView(APIView):
+    def get(self: Self, request: Request) -> Response:
+        """Get
+
+        Reports the counters kept by the caching, coalescing and scheduling layers in
+        front of the providers, for the process handling the request
+
+        Returns:
+            Response: 200 with the current counters
+
+        Example Usage:
+            http GET http://127.0.0.1:8000/stats/
+
+        Example Response:
+            {
+                "translation_memory": {
+                    "hits": 12,
+                    "memory_hits": 9,
+                    "database_hits": 3,
+                    "misses": 4,
+                    "size": 7,
+                    "max_size": 10000
+                },
+                "single_flight": {
+                    "in_flight": 0,
+                    "saved": 3
+                }
+            }
+        """
+        return Response(stats.collect())
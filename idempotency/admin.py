@@ -0,0 +1,9 @@
+from django.contrib import admin
+
+from idempotency.models import IdempotencyKey
+
+
+@admin.register(IdempotencyKey)
+class IdempotencyKeyAdmin(admin.ModelAdmin):
+    list_display = ["key", "scope", "status", "response_status", "expires_at"]
+    list_filter = ["scope", "status"]
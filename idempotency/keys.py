@@ -0,0 +1,243 @@
+import hashlib
+import json
+import time
+from datetime import datetime, timedelta
+from functools import wraps
+from typing import Any, Callable
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from decyphr import deadlines
+from idempotency.models import DONE, PENDING, IdempotencyKey
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+MAX_KEY_LENGTH = 255
+
+# How often a retry checks whether the request holding its key has finished
+POLL_INTERVAL = 0.1
+
+# How often each process deletes the keys that have expired
+PURGE_INTERVAL = 60
+
+last_purge = 0.0
+
+
+def get_fingerprint(request_data: Any) -> str:
+    """Get fingerprint
+
+    Args:
+        request_data (Any): The data received by the endpoint
+
+    Returns:
+        str: A hash of the data, so that a key reused for a different request can
+            be told apart from a retry
+    """
+    encoded = json.dumps(request_data, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def purge_expired(now: datetime) -> None:
+    global last_purge
+
+    if time.monotonic() - last_purge < PURGE_INTERVAL:
+        return
+    last_purge = time.monotonic()
+    IdempotencyKey.objects.filter(expires_at__lte=now).delete()
+
+
+def claim(scope: str, key: str, fingerprint: str) -> tuple[IdempotencyKey, bool]:
+    """Claim
+
+    Take the key for the current request, unless another request already holds it
+    or has stored its response against it. A key that has expired is taken over.
+    The unique constraint on the key decides which of the requests racing for it
+    gets it.
+
+    Args:
+        scope (str): The endpoint the key is for, e.g. `translate`
+        key (str): The key given by the client
+        fingerprint (str): The fingerprint of the request's data
+
+    Returns:
+        tuple[IdempotencyKey, bool]: The key, and whether it was taken by the current
+            request
+    """
+    now = timezone.now()
+    purge_expired(now)
+
+    while True:
+        try:
+            with transaction.atomic():
+                record = IdempotencyKey.objects.create(
+                    scope=scope,
+                    key=key,
+                    fingerprint=fingerprint,
+                    expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_LEASE),
+                )
+            return record, True
+        except IntegrityError:
+            pass
+
+        record = IdempotencyKey.objects.filter(
+            scope=scope, key=key, expires_at__gt=now
+        ).first()
+        if record is not None:
+            return record, False
+
+        IdempotencyKey.objects.filter(
+            scope=scope, key=key, expires_at__lte=now
+        ).delete()
+
+
+def complete(record: IdempotencyKey, response: Response) -> None:
+    """Complete
+
+    Store the response against the key, for `IDEMPOTENCY_KEY_TTL` seconds. Server
+    errors are not stored, and the key is given up so that a retry runs again.
+
+    Args:
+        record (IdempotencyKey): The key, held by the current request
+        response (Response): The response to the request
+    """
+    if response.status_code >= 500:
+        release(record)
+        return
+
+    IdempotencyKey.objects.filter(id=record.id, status=PENDING).update(
+        status=DONE,
+        response_status=response.status_code,
+        response_data=response.data,
+        expires_at=timezone.now() + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL),
+    )
+
+
+def release(record: IdempotencyKey) -> None:
+    IdempotencyKey.objects.filter(id=record.id, status=PENDING).delete()
+
+
+def wait_for(record: IdempotencyKey, give_up: float) -> IdempotencyKey | None:
+    """Wait for
+
+    Wait for the request holding the key to finish
+
+    Args:
+        record (IdempotencyKey): The key, held by another request
+        give_up (float): When to stop waiting, on the monotonic clock
+
+    Returns:
+        IdempotencyKey | None: The key, with the response stored against it, or
+            still pending if the request didn't finish in time. `None` if the
+            request gave the key up, or its lease ran out, so that it can be taken
+
+    Raises:
+        DeadlineExceededException if the current request's deadline passed first
+    """
+    while record.status == PENDING:
+        deadlines.check("idempotency")
+        if time.monotonic() >= give_up:
+            return record
+
+        time.sleep(POLL_INTERVAL)
+        record = IdempotencyKey.objects.filter(
+            id=record.id, expires_at__gt=timezone.now()
+        ).first()
+        if record is None:
+            return None
+
+    return record
+
+
+def replay(record: IdempotencyKey) -> Response:
+    return Response(
+        record.response_data,
+        status=record.response_status,
+        headers={REPLAYED_HEADER: "true"},
+    )
+
+
+def idempotent(scope: str) -> Callable:
+    """Idempotent
+
+    Make a create action safe to retry. The first response to a request with an
+    `Idempotency-Key` header is stored, and a retry with the same key gets it back,
+    flagged with the `Idempotent-Replayed` header, without the action running again.
+    A retry that arrives while the first request is still running waits for it to
+    finish rather than running alongside it. Requests without the header are not
+    affected.
+
+    Args:
+        scope (str): The endpoint the keys are for, e.g. `translate`
+
+    Returns:
+        Callable: The decorator for the action
+    """
+
+    def decorator(action: Callable) -> Callable:
+        @wraps(action)
+        def wrapper(view: Any, request: Request, *args: Any, **kwargs: Any) -> Response:
+            key = request.headers.get(IDEMPOTENCY_HEADER, "").strip()
+            if not key:
+                return action(view, request, *args, **kwargs)
+
+            if len(key) > MAX_KEY_LENGTH:
+                return Response(
+                    {
+                        IDEMPOTENCY_HEADER: [
+                            f"Ensure this header has no more than {MAX_KEY_LENGTH} "
+                            "characters."
+                        ]
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            fingerprint = get_fingerprint(request.data)
+            give_up = time.monotonic() + settings.IDEMPOTENCY_MAX_WAIT
+
+            while True:
+                record, claimed = claim(scope, key, fingerprint)
+                if claimed:
+                    break
+
+                if record.fingerprint != fingerprint:
+                    return Response(
+                        {
+                            "detail": "This Idempotency-Key was used for a "
+                            "different request."
+                        },
+                        status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    )
+
+                record = wait_for(record, give_up)
+
+                if record is None:
+                    continue
+                if record.status == PENDING:
+                    return Response(
+                        {
+                            "detail": "A request with this Idempotency-Key is still "
+                            "in progress."
+                        },
+                        status=status.HTTP_409_CONFLICT,
+                        headers={"Retry-After": "1"},
+                    )
+                return replay(record)
+
+            try:
+                response = action(view, request, *args, **kwargs)
+            except BaseException:
+                release(record)
+                raise
+
+            complete(record, response)
+            return response
+
+        return wrapper
+
+    return decorator
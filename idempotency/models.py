@@ -0,0 +1,37 @@
+from typing import Self
+
+from django.db import models
+
+PENDING = "pending"
+DONE = "done"
+
+IDEMPOTENCY_STATUSES = (
+    (PENDING, "Pending"),
+    (DONE, "Done"),
+)
+
+
+class IdempotencyKey(models.Model):
+    scope = models.CharField(max_length=32)
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    status = models.CharField(
+        max_length=16, choices=IDEMPOTENCY_STATUSES, default=PENDING
+    )
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_data = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["scope", "key"], name="idempotency_key_unique"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["expires_at"], name="idempotency_expiry_idx"),
+        ]
+
+    def __str__(self: Self) -> str:
+        return f"{self.scope} {self.key} ({self.status})"
@@ -0,0 +1,136 @@
+from datetime import timedelta
+from typing import Self
+from unittest.mock import MagicMock, patch
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from decyphr.exceptions import ProviderUnavailableException
+from idempotency.keys import get_fingerprint
+from idempotency.models import DONE, IdempotencyKey
+from languages.models import Language
+from translate.memory import translation_memory
+from translate.models import Translation
+
+REQUEST_DATA = {
+    "text_to_be_translated": "Hello",
+    "source_language_code": "EN-IE",
+    "target_language_code": "PT-BR",
+    "translator": "deepl",
+}
+
+
+@patch("translate.translators.deepl.get_deepl_translator")
+class IdempotencyTestCase(TestCase):
+    def setUp(self: Self) -> None:
+        translation_memory.clear()
+        self.client = APIClient()
+        Language.language_manager.create(
+            name="Ireland English",
+            code="EN-IE",
+            short_code="EN",
+            description="Language spoken in Ireland",
+        )
+        Language.language_manager.create(
+            name="Brazilian Portuguese",
+            code="PT-BR",
+            short_code="PT",
+            description="Language spoken in Brazil",
+        )
+
+    def translate(self: Self, data: dict = REQUEST_DATA, key: str = "abc") -> object:
+        return self.client.post(
+            "/translate/", data, format="json", headers={"Idempotency-Key": key}
+        )
+
+    def test_retry_is_replayed(self: Self, get_deepl_translator: MagicMock) -> None:
+        translate_text = get_deepl_translator.return_value.translate_text
+        translate_text.return_value.text = "Olá"
+
+        first = self.translate()
+        translation_memory.clear()
+        retry = self.translate()
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertFalse(first.has_header("Idempotent-Replayed"))
+        self.assertEqual(translate_text.call_count, 1)
+        self.assertEqual(Translation.objects.count(), 1)
+
+    def test_key_reused_for_different_request(
+        self: Self, get_deepl_translator: MagicMock
+    ) -> None:
+        get_deepl_translator.return_value.translate_text.return_value.text = "Olá"
+
+        self.translate()
+        response = self.translate({**REQUEST_DATA, "text_to_be_translated": "Bye"})
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Translation.objects.count(), 1)
+
+    def test_concurrent_retry_waits_for_first_request(
+        self: Self, get_deepl_translator: MagicMock
+    ) -> None:
+        record = IdempotencyKey.objects.create(
+            scope="translate",
+            key="abc",
+            fingerprint=get_fingerprint(REQUEST_DATA),
+            expires_at=timezone.now() + timedelta(minutes=1),
+        )
+
+        def finish_first_request(seconds: float) -> None:
+            IdempotencyKey.objects.filter(id=record.id).update(
+                status=DONE, response_status=201, response_data={"id": 7}
+            )
+
+        with patch("idempotency.keys.time.sleep", side_effect=finish_first_request):
+            response = self.translate()
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json(), {"id": 7})
+        get_deepl_translator.return_value.translate_text.assert_not_called()
+
+    @override_settings(IDEMPOTENCY_MAX_WAIT=0)
+    def test_retry_while_first_request_is_running(
+        self: Self, get_deepl_translator: MagicMock
+    ) -> None:
+        IdempotencyKey.objects.create(
+            scope="translate",
+            key="abc",
+            fingerprint=get_fingerprint(REQUEST_DATA),
+            expires_at=timezone.now() + timedelta(minutes=1),
+        )
+
+        response = self.translate()
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response["Retry-After"], "1")
+        get_deepl_translator.return_value.translate_text.assert_not_called()
+
+    def test_expired_or_failed_requests_run_again(
+        self: Self, get_deepl_translator: MagicMock
+    ) -> None:
+        translate_text = get_deepl_translator.return_value.translate_text
+        translate_text.side_effect = ProviderUnavailableException("Busy.", 1)
+        IdempotencyKey.objects.create(
+            scope="translate",
+            key="abc",
+            fingerprint=get_fingerprint(REQUEST_DATA),
+            status=DONE,
+            response_status=201,
+            response_data={"id": 7},
+            expires_at=timezone.now() - timedelta(seconds=1),
+        )
+
+        response = self.translate()
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+        translate_text.side_effect = None
+        translate_text.return_value.text = "Olá"
+        response = self.translate()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(IdempotencyKey.objects.get().status, DONE)
@@ -0,0 +1,9 @@
+from django.contrib import admin
+
+from jobs.models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ["id", "kind", "status", "attempts", "created_at", "finished_at"]
+    list_filter = ["kind", "status"]
@@ -0,0 +1,8 @@
+from typing import Self
+
+
+class JobValidationException(Exception):
+    errors: dict
+
+    def __init__(self: Self, errors: dict) -> None:
+        self.errors = errors
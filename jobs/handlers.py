@@ -0,0 +1,92 @@
+from typing import Any, Protocol, Self
+
+
+class JobHandler(Protocol):
+    """Job Handler
+
+    Does the work of one kind of job. A job is split into chunks when it is
+    submitted, each chunk is then run in turn by a worker, and the results of the
+    chunks are put together once they have all been run. The chunks and their
+    results are stored on the job as JSON, so that a job picked up by another worker
+    carries on from the last chunk that was run.
+    """
+
+    def plan(self: Self, request_data: dict) -> list[Any]:
+        """Plan
+
+        Args:
+            request_data (dict): The data received by the endpoint
+
+        Returns:
+            list[Any]: The chunks of work
+
+        Raises:
+            JobValidationException if the data cannot be validated
+        """
+
+    def run_chunk(self: Self, request_data: dict, chunk: Any) -> Any:
+        """Run chunk
+
+        Args:
+            request_data (dict): The data received by the endpoint
+            chunk (Any): One of the chunks of work
+
+        Returns:
+            Any: The result of the chunk
+        """
+
+    def finish(self: Self, request_data: dict, results: list[Any]) -> Any:
+        """Finish
+
+        Args:
+            request_data (dict): The data received by the endpoint
+            results (list[Any]): The result of each chunk, in order
+
+        Returns:
+            Any: The result of the job
+        """
+
+
+handlers: dict[str, JobHandler] = {}
+
+
+def register(kind: str, handler: JobHandler) -> None:
+    """Register
+
+    Add the handler of a kind of job
+
+    Args:
+        kind (str): The kind of job, e.g. `translate`
+        handler (JobHandler): Does the work of the jobs of that kind
+    """
+    handlers[kind] = handler
+
+
+def split_document(text: str, max_characters: int) -> list[str]:
+    """Split document
+
+    Split a document into consecutive pieces of at most `max_characters`, cutting
+    at the last line break, sentence end or space in each piece where there is one.
+    Joining the pieces gives back the document.
+
+    Args:
+        text (str): The document
+        max_characters (int): The maximum length of a piece
+
+    Returns:
+        list[str]: The pieces of the document
+    """
+    pieces = []
+    start = 0
+
+    while len(text) - start > max_characters:
+        window = text[start : start + max_characters]
+        cut = max(window.rfind(end) for end in ("\n", ". ", "? ", "! "))
+        if cut <= 0:
+            cut = window.rfind(" ")
+        end = start + (cut + 1 if cut > 0 else max_characters)
+        pieces.append(text[start:end])
+        start = end
+
+    pieces.append(text[start:])
+    return pieces
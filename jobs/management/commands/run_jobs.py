@@ -0,0 +1,59 @@
+import signal
+import time
+from typing import Any, Self
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+from decyphr.priority import BULK, priority_class
+from jobs import queue
+
+
+class Command(BaseCommand):
+    help = "Run queued jobs, polling the DB for new ones until stopped"
+
+    stopping: bool = False
+
+    def add_arguments(self: Self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once there are no jobs left to run",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=settings.JOB_POLL_INTERVAL,
+            help="How many seconds to wait between polls when there are no jobs",
+        )
+
+    def stop(self: Self, *args: Any) -> None:
+        # The job being run is put down after its current chunk, and picked up by
+        # another worker once its lease runs out
+        self.stopping = True
+
+    def handle(self: Self, *args: Any, **options: Any) -> None:
+        handlers = {
+            signum: signal.signal(signum, self.stop)
+            for signum in (signal.SIGTERM, signal.SIGINT)
+        }
+        # Jobs queue for providers behind interactive requests
+        lane = priority_class.set(BULK)
+        worker = queue.make_worker_name()
+        self.stdout.write(f"Worker {worker} started")
+
+        try:
+            while not self.stopping:
+                job = queue.claim(worker)
+                if job is None:
+                    if options["once"]:
+                        return
+                    time.sleep(options["poll_interval"])
+                    continue
+
+                self.stdout.write(f"Running {job}")
+                queue.run(job, lambda: self.stopping)
+        finally:
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
+            priority_class.reset(lane)
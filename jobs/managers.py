@@ -0,0 +1,78 @@
+import time
+from typing import Self, Type
+
+from django.conf import settings
+from django.http import Http404
+
+from jobs import queue
+from jobs.exceptions import JobValidationException
+from jobs.models import DONE, FAILED, Job
+from jobs.serializers import PollDeserializer, Serializer
+
+
+class JobManager:
+    deserializer: Type[PollDeserializer]
+    serializer: Type[Serializer]
+
+    def __init__(
+        self: Self,
+        deserializer: Type[PollDeserializer],
+        serializer: Type[Serializer],
+    ) -> None:
+        self.deserializer = deserializer
+        self.serializer = serializer
+
+    def create_new_job(self: Self, kind: str, request_data: dict) -> Serializer:
+        """Create new job
+
+        Queue the work requested for a worker to pick up
+
+        Args:
+            kind (str): The kind of job
+            request_data (dict): The data received by the endpoint
+
+        Returns:
+            Serializer: The serialised `Job` instance
+        """
+        return self.serializer(queue.submit(kind, dict(request_data)))
+
+    def get_job(self: Self, pk: int, query_params: dict[str, str]) -> Serializer:
+        """Get job
+
+        Get the job, waiting up to `wait` seconds for it to finish or, if
+        `chunks_done` is given, for it to get past that many chunks
+
+        Args:
+            pk (int): The primary key of the job
+            query_params (dict[str, str]): The query params received by the endpoint
+
+        Returns:
+            Serializer: The serialised `Job` instance
+
+        Raises:
+            Http404 is raised if the job doesn't exist
+        """
+        deserializer = self.deserializer(data=query_params)
+
+        if not deserializer.is_valid():
+            raise JobValidationException(errors=deserializer.errors)
+
+        data = deserializer.validated_data
+        deadline = time.monotonic() + data.get("wait", 0)
+
+        while True:
+            try:
+                job = Job.objects.get(pk=pk)
+            except Job.DoesNotExist:
+                raise Http404
+
+            if (
+                job.status in (DONE, FAILED)
+                or job.chunks_done > data.get("chunks_done", job.chunks_done)
+                or time.monotonic() >= deadline
+            ):
+                return self.serializer(job)
+
+            time.sleep(
+                min(settings.JOB_POLL_INTERVAL, max(deadline - time.monotonic(), 0))
+            )
@@ -0,0 +1,49 @@
+from typing import Self
+
+from django.db import models
+from django.utils import timezone
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+JOB_STATUSES = (
+    (QUEUED, "Queued"),
+    (RUNNING, "Running"),
+    (DONE, "Done"),
+    (FAILED, "Failed"),
+)
+
+
+class Job(models.Model):
+    kind = models.CharField(max_length=32)
+    status = models.CharField(max_length=16, choices=JOB_STATUSES, default=QUEUED)
+    request_data = models.JSONField()
+    chunks = models.JSONField(default=list)
+    results = models.JSONField(default=list)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    worker = models.CharField(max_length=255, blank=True)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "run_after", "id"], name="job_queue_idx"),
+        ]
+
+    def __str__(self: Self) -> str:
+        return f"{self.kind} job {self.id} ({self.status})"
+
+    @property
+    def chunks_done(self: Self) -> int:
+        return len(self.results)
+
+    @property
+    def chunks_total(self: Self) -> int:
+        return len(self.chunks)
@@ -0,0 +1,190 @@
+import os
+import socket
+import uuid
+from datetime import timedelta
+from typing import Callable
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q, QuerySet
+from django.utils import timezone
+
+from decyphr.exceptions import ProviderUnavailableException
+from jobs.exceptions import JobValidationException
+from jobs.handlers import handlers
+from jobs.models import DONE, FAILED, QUEUED, RUNNING, Job
+
+
+def make_worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def submit(kind: str, request_data: dict) -> Job:
+    """Submit
+
+    Split the work into chunks and queue the job
+
+    Args:
+        kind (str): The kind of job
+        request_data (dict): The data received by the endpoint
+
+    Returns:
+        Job: The queued job
+
+    Raises:
+        JobValidationException if the data cannot be validated
+    """
+    if kind not in handlers:
+        raise JobValidationException(errors={"kind": ["Unknown kind of job."]})
+
+    chunks = handlers[kind].plan(request_data)
+    return Job.objects.create(kind=kind, request_data=request_data, chunks=chunks)
+
+
+def runnable_jobs() -> QuerySet:
+    now = timezone.now()
+    return Job.objects.filter(
+        Q(status=QUEUED, run_after__lte=now) | Q(status=RUNNING, locked_until__lt=now)
+    ).order_by("id")
+
+
+def claim(worker: str) -> Job | None:
+    """Claim
+
+    Take the oldest job that is queued, or whose worker has stopped renewing its
+    lease, so that no other worker runs it for the next `JOB_LEASE` seconds. Where
+    the DB supports it the job is locked with `SELECT ... FOR UPDATE SKIP LOCKED`.
+    Otherwise, as on SQLite, it is claimed with an UPDATE that only succeeds if the
+    job is still runnable, so that only one of the workers racing for a job gets it.
+
+    Args:
+        worker (str): The name of the worker
+
+    Returns:
+        Job | None: The claimed job, or `None` if there are no jobs to run
+    """
+    locked_until = timezone.now() + timedelta(seconds=settings.JOB_LEASE)
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            job = runnable_jobs().select_for_update(skip_locked=True).first()
+            if job is None:
+                return None
+
+            job.status = RUNNING
+            job.worker = worker
+            job.locked_until = locked_until
+            job.attempts += 1
+            job.save(
+                update_fields=[
+                    "status",
+                    "worker",
+                    "locked_until",
+                    "attempts",
+                    "updated_at",
+                ]
+            )
+            return job
+
+    for job_id in runnable_jobs().values_list("id", flat=True)[:10]:
+        claimed = (
+            runnable_jobs()
+            .filter(id=job_id)
+            .update(
+                status=RUNNING,
+                worker=worker,
+                locked_until=locked_until,
+                attempts=F("attempts") + 1,
+                updated_at=timezone.now(),
+            )
+        )
+        if claimed:
+            return Job.objects.get(id=job_id)
+
+    return None
+
+
+def save_progress(job: Job, **fields: object) -> bool:
+    """Save progress
+
+    Store the fields of a running job and renew its lease, as long as the job still
+    belongs to this worker
+
+    Args:
+        job (Job): The job, claimed by this worker
+        **fields (object): The fields to store
+
+    Returns:
+        bool: Whether the job still belongs to this worker
+    """
+    if fields.get("status", RUNNING) == RUNNING:
+        fields["locked_until"] = timezone.now() + timedelta(seconds=settings.JOB_LEASE)
+
+    return bool(
+        Job.objects.filter(id=job.id, worker=job.worker, status=RUNNING).update(
+            updated_at=timezone.now(), **fields
+        )
+    )
+
+
+def run(job: Job, stopping: Callable[[], bool] = lambda: False) -> None:
+    """Run
+
+    Run the chunks of a claimed job that haven't been run yet, storing the result of
+    each one as it finishes, then put the results together. A job that fails is
+    queued again with an exponential backoff, or once the provider is available
+    again, until it has been tried `JOB_MAX_ATTEMPTS` times.
+
+    Args:
+        job (Job): The job, claimed by this worker
+        stopping (Callable[[], bool]): Whether the worker is stopping, in which case
+            the job is queued again after the chunk being run
+    """
+    handler = handlers[job.kind]
+
+    try:
+        for chunk in job.chunks[job.chunks_done :]:
+            job.results.append(handler.run_chunk(job.request_data, chunk))
+            if not save_progress(job, results=job.results):
+                return
+
+            if stopping() and job.chunks_done < job.chunks_total:
+                save_progress(
+                    job,
+                    status=QUEUED,
+                    locked_until=None,
+                    attempts=F("attempts") - 1,
+                )
+                return
+
+        save_progress(
+            job,
+            status=DONE,
+            result=handler.finish(job.request_data, job.results),
+            error="",
+            locked_until=None,
+            finished_at=timezone.now(),
+        )
+    except Exception as error:
+        if job.attempts >= settings.JOB_MAX_ATTEMPTS:
+            save_progress(
+                job,
+                status=FAILED,
+                error=str(error),
+                locked_until=None,
+                finished_at=timezone.now(),
+            )
+            return
+
+        retry_after = (
+            error.retry_after
+            if isinstance(error, ProviderUnavailableException)
+            else 2**job.attempts
+        )
+        save_progress(
+            job,
+            status=QUEUED,
+            error=str(error),
+            locked_until=None,
+            run_after=timezone.now() + timedelta(seconds=retry_after),
+        )
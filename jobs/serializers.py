@@ -0,0 +1,36 @@
+from django.conf import settings
+from rest_framework.serializers import (
+    FloatField,
+    IntegerField,
+    ModelSerializer,
+    ReadOnlyField,
+)
+from rest_framework.serializers import Serializer as DRFSerializer
+
+from jobs.models import Job
+
+
+class PollDeserializer(DRFSerializer):
+    wait = FloatField(required=False, min_value=0, max_value=settings.JOB_MAX_WAIT)
+    chunks_done = IntegerField(required=False, min_value=0)
+
+
+class Serializer(ModelSerializer):
+    chunks_done = ReadOnlyField()
+    chunks_total = ReadOnlyField()
+
+    class Meta:
+        model = Job
+        fields = [
+            "id",
+            "kind",
+            "status",
+            "chunks_done",
+            "chunks_total",
+            "result",
+            "error",
+            "attempts",
+            "created_at",
+            "updated_at",
+            "finished_at",
+        ]
@@ -0,0 +1,160 @@
+from datetime import timedelta
+from typing import Self
+from unittest.mock import MagicMock, patch
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from jobs import queue
+from jobs.handlers import split_document
+from jobs.models import DONE, FAILED, QUEUED, Job
+from languages.models import Language
+from translate.memory import translation_memory
+from translate.models import Translation
+
+DOCUMENT = "Good morning. How are you?\nI am fine. Thank you very much."
+
+
+@override_settings(JOB_CHUNK_CHARACTERS=30)
+class JobTestCase(TestCase):
+    def setUp(self: Self) -> None:
+        translation_memory.clear()
+        self.client = APIClient()
+        Language.language_manager.create(
+            name="Ireland English",
+            code="EN-IE",
+            short_code="EN",
+            description="Language spoken in Ireland",
+        )
+        Language.language_manager.create(
+            name="Brazilian Portuguese",
+            code="PT-BR",
+            short_code="PT",
+            description="Language spoken in Brazil",
+        )
+
+    def submit_translation(self: Self) -> dict:
+        response = self.client.post(
+            "/translate/jobs/",
+            {
+                "text_to_be_translated": DOCUMENT,
+                "source_language_code": "en",
+                "target_language_code": "pt",
+                "translator": "deepl",
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 202)
+        return response.json()
+
+    def test_split_document(self: Self) -> None:
+        pieces = split_document(DOCUMENT, 30)
+
+        self.assertEqual("".join(pieces), DOCUMENT)
+        self.assertEqual(pieces[0], "Good morning. How are you?\n")
+        self.assertTrue(all(len(piece) <= 30 for piece in pieces))
+
+    @patch("translate.managers.get_translator")
+    def test_translation_job(self: Self, mock_get_translator) -> None:
+        translator = MagicMock(spec=["get_translated_text"])
+        translator.get_translated_text.side_effect = lambda text, *args: text.upper()
+        mock_get_translator.return_value = translator
+
+        job = self.submit_translation()
+        self.assertEqual(job["status"], QUEUED)
+        self.assertEqual(job["chunks_total"], 3)
+
+        call_command("run_jobs", once=True, stdout=MagicMock())
+
+        response = self.client.get(f"/jobs/{job['id']}/", {"wait": 1})
+        job = response.json()
+        self.assertEqual(job["status"], DONE)
+        self.assertEqual(job["chunks_done"], 3)
+        self.assertEqual(job["result"]["translated_text"], DOCUMENT.upper())
+        self.assertTrue(
+            Translation.objects.filter(
+                source_text=DOCUMENT, translated_text=DOCUMENT.upper()
+            ).exists()
+        )
+
+    def test_nlp_job(self: Self) -> None:
+        response = self.client.post(
+            "/nlp/jobs/",
+            {
+                "text_to_be_processed": DOCUMENT,
+                "language_code": "en",
+                "processor": "local",
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 202)
+
+        call_command("run_jobs", once=True, stdout=MagicMock())
+
+        job = Job.objects.get(id=response.json()["id"])
+        self.assertEqual(job.status, DONE)
+        self.assertEqual(
+            [text_piece["text"] for text_piece in job.result][:4],
+            ["Good", "morning", ".", "How"],
+        )
+
+    def test_invalid_job_is_rejected(self: Self) -> None:
+        response = self.client.post(
+            "/translate/jobs/",
+            {
+                "text_to_be_translated": DOCUMENT,
+                "source_language_code": "en",
+                "target_language_code": "xx",
+                "translator": "deepl",
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Job.objects.exists())
+
+    def test_a_job_is_only_claimed_once(self: Self) -> None:
+        job = self.submit_translation()
+
+        self.assertEqual(queue.claim("first").id, job["id"])
+        self.assertIsNone(queue.claim("second"))
+
+        Job.objects.filter(id=job["id"]).update(
+            locked_until=timezone.now() - timedelta(seconds=1)
+        )
+        claimed = queue.claim("second")
+        self.assertEqual(claimed.worker, "second")
+        self.assertEqual(claimed.attempts, 2)
+
+    @override_settings(JOB_MAX_ATTEMPTS=2)
+    @patch("translate.managers.get_translator")
+    def test_failed_jobs_are_retried(self: Self, mock_get_translator) -> None:
+        translator = MagicMock(spec=["get_translated_text"])
+        translator.get_translated_text.side_effect = Exception("Throttled")
+        mock_get_translator.return_value = translator
+        job = self.submit_translation()
+
+        queue.run(queue.claim("worker"))
+        retried = Job.objects.get(id=job["id"])
+        self.assertEqual(retried.status, QUEUED)
+        self.assertGreater(retried.run_after, timezone.now())
+
+        Job.objects.filter(id=job["id"]).update(run_after=timezone.now())
+        queue.run(queue.claim("worker"))
+        failed = Job.objects.get(id=job["id"])
+        self.assertEqual(failed.status, FAILED)
+        self.assertEqual(failed.error, "Throttled")
+
+    def test_progress_is_kept_when_a_worker_stops(self: Self) -> None:
+        job = self.submit_translation()
+        claimed = queue.claim("worker")
+
+        with patch("translate.jobs.TranslationJobHandler.run_chunk", return_value="x"):
+            queue.run(claimed, stopping=lambda: True)
+
+        stopped = Job.objects.get(id=job["id"])
+        self.assertEqual(stopped.status, QUEUED)
+        self.assertEqual(stopped.chunks_done, 1)
+        self.assertEqual(stopped.attempts, 0)
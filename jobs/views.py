@@ -0,0 +1,92 @@
+from typing import Self
+
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.viewsets import ViewSet
+
+from jobs.exceptions import JobValidationException
+from jobs.managers import JobManager
+from jobs.serializers import PollDeserializer, Serializer
+
+
+class JobViewSet(ViewSet):
+    deserializer_class = PollDeserializer
+    serializer_class = Serializer
+    manager = JobManager
+
+    def retrieve(self: Self, request: Request, pk: int) -> Response:
+        """Retrieve
+
+        Reports the progress of a job and, once it is done, its result
+
+        Args:
+            pk (int): The primary key of the job
+            request.query_params (dict[str, str]):
+                wait (float): Wait up to this many seconds, at most `JOB_MAX_WAIT`,
+                    for the job to finish before responding
+                chunks_done (int): Respond as soon as the job has got past this many
+                    chunks, rather than waiting for it to finish
+
+        Returns:
+            Response: 200 with the job
+            Response: 400 if the query params cannot be validated
+            Response: 404 if the job doesn't exist
+
+        Example Usage:
+            http GET "http://127.0.0.1:8000/jobs/3/?wait=20&chunks_done=1"
+
+        Example Response:
+            {
+                "id": 3,
+                "kind": "translate",
+                "status": "running",
+                "chunks_done": 2,
+                "chunks_total": 5,
+                "result": null,
+                "error": "",
+                "attempts": 1,
+                "created_at": "2026-10-17T09:12:00Z",
+                "updated_at": "2026-10-17T09:12:04Z",
+                "finished_at": null
+            }
+        """
+        manager = self.manager(
+            deserializer=self.deserializer_class,
+            serializer=self.serializer_class,
+        )
+
+        try:
+            job = manager.get_job(pk, request.query_params)
+        except JobValidationException as e:
+            return Response(e.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(job.data)
+
+
+def submit_job(kind: str, request: Request) -> Response:
+    """Submit job
+
+    Queue a job for the data received by an endpoint and respond straight away with
+    the job, which the client polls at `/jobs/<id>/` for its progress and result
+
+    Args:
+        kind (str): The kind of job
+        request (Request): The request received by the endpoint
+
+    Returns:
+        Response: 202 with the queued job
+        Response: 400 if the data cannot be validated
+    """
+    manager = JobManager(deserializer=PollDeserializer, serializer=Serializer)
+
+    try:
+        job = manager.create_new_job(kind, request.data)
+    except JobValidationException as e:
+        return Response(e.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(
+        job.data,
+        status=status.HTTP_202_ACCEPTED,
+        headers={"Location": f"/jobs/{job.data['id']}/"},
+    )
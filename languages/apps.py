@@ -1,6 +1,11 @@
+from typing import Self
+
 from django.apps import AppConfig
 
 
 class LanguagesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "languages"
+
+    def ready(self: Self) -> None:
+        from languages import registry  # noqa: F401
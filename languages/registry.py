@@ -0,0 +1,142 @@
+import time
+from threading import Lock
+from types import MappingProxyType
+from typing import Any, Mapping, Self
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from decyphr import stats
+from decyphr.versions import VersionStamp
+from languages.models import Language
+
+# How often, in seconds, the registry checks at most whether another process has
+# changed the languages, so that resolving a code doesn't read the version stamp
+# every time
+STAMP_CHECK_INTERVAL = 0.5
+
+
+class LanguageIndex:
+    by_code: Mapping[str, Language]
+    by_short_code: Mapping[str, Language]
+    version: int
+
+    def __init__(self: Self, languages: list[Language], version: int) -> None:
+        by_code, by_short_code = {}, {}
+        for language in languages:
+            by_code.setdefault(language.code.lower(), language)
+            by_short_code.setdefault(language.short_code.lower(), language)
+
+        self.by_code = MappingProxyType(by_code)
+        self.by_short_code = MappingProxyType(by_short_code)
+        self.version = version
+
+
+class LanguageRegistry:
+    """Language Registry
+
+    An in-memory, read only index of the `Language` table by lowercased `code` and
+    `short_code`, so that resolving a language code doesn't query the DB. The index
+    is built on first use and rebuilt after a language is saved or deleted in this
+    process, or within `check_interval` seconds of one being saved or deleted in any
+    other process on the host.
+    """
+
+    index: LanguageIndex | None
+    lock: Lock
+    version: VersionStamp
+    check_interval: float
+    checked_at: float
+    builds: int
+
+    def __init__(
+        self: Self, version: VersionStamp, check_interval: float = STAMP_CHECK_INTERVAL
+    ) -> None:
+        self.index = None
+        self.lock = Lock()
+        self.version = version
+        self.check_interval = check_interval
+        self.checked_at = 0.0
+        self.builds = 0
+
+    def current_index(self: Self) -> LanguageIndex | None:
+        index = self.index
+        if index is None:
+            return None
+
+        now = time.monotonic()
+        if now - self.checked_at < self.check_interval:
+            return index
+        if index.version != self.version.get():
+            return None
+        self.checked_at = now
+        return index
+
+    def build(self: Self) -> LanguageIndex:
+        with self.lock:
+            index = self.current_index()
+            if index is None:
+                version = self.version.get()
+                index = self.index = LanguageIndex(
+                    list(Language.language_manager.order_by("id")), version
+                )
+                self.checked_at = time.monotonic()
+                self.builds += 1
+            return index
+
+    def lookup(self: Self, index: LanguageIndex, code: str) -> Language | None:
+        code = code.lower()
+        return index.by_code.get(code) or index.by_short_code.get(code)
+
+    def get(self: Self, code: str) -> Language | None:
+        """Get
+
+        In-memory equivalent of `LanguageModelManager.get_by_long_code_or_short_code`
+
+        Args:
+            code (str): The code or short code of the language
+
+        Returns:
+            Language | None: The language with that code, or the first language with
+                that short code
+        """
+        return self.lookup(self.current_index() or self.build(), code)
+
+    async def aget(self: Self, code: str) -> Language | None:
+        """Get
+
+        Async equivalent of `get`
+        """
+        index = self.current_index() or await sync_to_async(self.build)()
+        return self.lookup(index, code)
+
+    def invalidate(self: Self, **kwargs: Any) -> None:
+        """Invalidate
+
+        Drop the index of this process, and tell the other processes to drop theirs
+        both now and once the change has been committed, so that no process is left
+        with an index built before the change was visible to it
+        """
+        self.index = None
+        self.version.bump()
+        transaction.on_commit(self.version.bump)
+
+    def stats(self: Self) -> dict[str, int]:
+        index = self.index
+        return {
+            "builds": self.builds,
+            "languages": len(index.by_code) if index else 0,
+        }
+
+
+language_registry = LanguageRegistry(VersionStamp("languages"))
+
+post_save.connect(
+    language_registry.invalidate, sender=Language, dispatch_uid="language_registry"
+)
+post_delete.connect(
+    language_registry.invalidate, sender=Language, dispatch_uid="language_registry"
+)
+
+stats.register("language_registry", language_registry.stats)
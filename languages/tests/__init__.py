@@ -1,3 +1,4 @@
 from languages.tests.models import ModelManagerTestCase
+from languages.tests.registry import LanguageRegistryTestCase
 
-__all__ = [ModelManagerTestCase]
+__all__ = [LanguageRegistryTestCase, ModelManagerTestCase]
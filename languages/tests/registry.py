@@ -0,0 +1,66 @@
+import tempfile
+from pathlib import Path
+from typing import Self
+
+from django.test import TestCase
+
+from decyphr.localstore import LocalStore
+from decyphr.versions import VersionStamp
+from languages.models import Language
+from languages.registry import LanguageRegistry, language_registry
+
+
+class LanguageRegistryTestCase(TestCase):
+    def setUp(self: Self) -> None:
+        self.language = Language.language_manager.create(
+            name="Brazilian Portuguese",
+            code="PT-BR",
+            short_code="PT",
+            description="Language spoken in Brazil",
+        )
+
+    def test_get(self: Self) -> None:
+        self.assertEqual(language_registry.get("pt-br"), self.language)
+        with self.assertNumQueries(0):
+            self.assertEqual(language_registry.get("PT"), self.language)
+            self.assertIsNone(language_registry.get("xx"))
+
+    def test_rebuilt_after_save(self: Self) -> None:
+        language_registry.get("pt")
+        self.language.code = "PT-PT"
+        self.language.save()
+
+        self.assertEqual(language_registry.get("pt-pt"), self.language)
+        self.assertIsNone(language_registry.get("pt-br"))
+
+    def test_rebuilt_after_change_in_another_process(self: Self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            store = LocalStore(Path(directory) / "test.sqlite3")
+            registry = LanguageRegistry(
+                VersionStamp("languages", store), check_interval=0
+            )
+            other_process = VersionStamp("languages", store)
+            registry.get("pt")
+
+            Language.language_manager.filter(pk=self.language.pk).update(code="PT-PT")
+            self.assertIsNotNone(registry.get("pt-br"))
+
+            other_process.bump()
+            self.assertIsNone(registry.get("pt-br"))
+            self.assertEqual(registry.get("pt-pt"), self.language)
+
+    def test_version_stamp_checked_at_most_every_interval(self: Self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            store = LocalStore(Path(directory) / "test.sqlite3")
+            registry = LanguageRegistry(
+                VersionStamp("languages", store), check_interval=60
+            )
+            other_process = VersionStamp("languages", store)
+            registry.get("pt")
+
+            Language.language_manager.filter(pk=self.language.pk).update(code="PT-PT")
+            other_process.bump()
+            self.assertIsNotNone(registry.get("pt-br"))
+
+            registry.checked_at -= 60
+            self.assertIsNone(registry.get("pt-br"))
@@ -1,5 +1,27 @@
+from typing import Self
+
 from django.contrib import admin
+from django.db.models import QuerySet
+from django.http import HttpRequest
+
+from nlp.cache import analysis_cache
+from nlp.models import Analysis, TextPiece, TextPieceOccurrence
+
+
+@admin.register(Analysis)
+class AnalysisAdmin(admin.ModelAdmin):
+    list_display = ["source_hash", "processor", "language", "created_at"]
+    list_filter = ["processor", "language"]
+    actions = ["invalidate_processors"]
+
+    @admin.action(description="Invalidate every analysis of the selected processors")
+    def invalidate_processors(
+        self: Self, request: HttpRequest, queryset: QuerySet
+    ) -> None:
+        for processor in set(queryset.values_list("processor", flat=True)):
+            deleted = analysis_cache.invalidate(processor)
+            self.message_user(request, f"Invalidated {deleted} {processor} analyses")
 
-from nlp.models import TextPiece
 
 admin.site.register(TextPiece)
+admin.site.register(TextPieceOccurrence)
@@ -1,6 +1,11 @@
+from typing import Self
+
 from django.apps import AppConfig
 
 
 class NlpConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "nlp"
+
+    def ready(self: Self) -> None:
+        from nlp import jobs  # noqa: F401
@@ -0,0 +1,339 @@
+# type: ignore
+import time
+from threading import Lock
+from typing import Self
+
+from cachetools import TTLCache
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, QuerySet
+
+from decyphr import stats
+from decyphr.localstore import LocalStore, local_store
+from decyphr.versions import VersionStamp
+from languages.models import Language
+from languages.registry import STAMP_CHECK_INTERVAL
+from nlp.models import Analysis, TextPiece
+from preferences.models import SUPPORTED_NLP_PROCESSORS
+
+
+class AnalysisCache:
+    """Analysis Cache
+
+    Sits in front of the NLP processors so that a text which has already been
+    processed is answered with the text pieces stored the first time round. Lookups
+    are made against a size bounded, TTL expiring LRU held in process and, on a miss,
+    against the stored `Analysis` of the text using a single indexed query.
+
+    Entries are keyed per processor and language, by the normalised content hash of
+    the text. Each processor has a version stamp, bumped when its analyses are
+    invalidated, so that every process on the host drops its entries for the
+    processor within `check_interval` seconds.
+    """
+
+    cache: TTLCache
+    lock: Lock
+    version_store: LocalStore
+    stamps: dict[str, VersionStamp]
+    versions: dict[str, int]
+    check_interval: float
+    checked_at: dict[str, float]
+    memory_hits: int
+    database_hits: int
+    misses: int
+
+    def __init__(
+        self: Self,
+        max_size: int,
+        ttl: int,
+        store: LocalStore = local_store,
+        check_interval: float = STAMP_CHECK_INTERVAL,
+    ) -> None:
+        self.cache = TTLCache(maxsize=max_size, ttl=ttl)
+        self.lock = Lock()
+        self.version_store = store
+        self.stamps = {}
+        self.versions = {}
+        self.check_interval = check_interval
+        self.checked_at = {}
+        self.memory_hits = 0
+        self.database_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(processor: str, language: Language, source_hash: str) -> tuple:
+        """Make key
+
+        Args:
+            processor (str): The name of the processor
+            language (Language): The language of the text
+            source_hash (str): The content hash of the text
+
+        Returns:
+            tuple: The key used to store the analysis in the cache
+        """
+        return (processor, language.id, source_hash)
+
+    def lookup(self: Self, key: tuple) -> list[TextPiece] | None:
+        """Lookup
+
+        Find the text pieces of a previous analysis of the text, first in the
+        in-process cache and then in the DB. Analyses found in the DB are added to
+        the cache.
+
+        Args:
+            key (tuple): The key made with `make_key`
+
+        Returns:
+            list[TextPiece] | None: The text pieces, in order, or `None` if the text
+                has not been processed before
+        """
+        text_pieces = self.lookup_cache(key)
+        if text_pieces is not None:
+            return text_pieces
+
+        text_pieces = list(self.database_query([key]))
+        if not text_pieces and not self.analysis_query([key]).exists():
+            text_pieces = None
+        return self.record_database_result(key, text_pieces)
+
+    async def alookup(self: Self, key: tuple) -> list[TextPiece] | None:
+        """Lookup
+
+        Async equivalent of `lookup`
+        """
+        text_pieces = self.lookup_cache(key)
+        if text_pieces is not None:
+            return text_pieces
+
+        text_pieces = [text_piece async for text_piece in self.database_query([key])]
+        if not text_pieces and not await self.analysis_query([key]).aexists():
+            text_pieces = None
+        return self.record_database_result(key, text_pieces)
+
+    def get_stamp(self: Self, processor: str) -> VersionStamp:
+        if processor not in self.stamps:
+            self.stamps[processor] = VersionStamp(
+                f"nlp_analyses.{processor}", self.version_store
+            )
+        return self.stamps[processor]
+
+    def drop(self: Self, processor: str | None) -> None:
+        # Called with the lock held
+        for key in list(self.cache.keys()):
+            if processor is None or key[0] == processor:
+                self.cache.pop(key, None)
+
+    def sync(self: Self, processor: str) -> None:
+        # Called with the lock held. Drops the processor's entries if its analyses
+        # have been invalidated since they were cached
+        now = time.monotonic()
+        if now - self.checked_at.get(processor, 0.0) < self.check_interval:
+            return
+        self.checked_at[processor] = now
+
+        version = self.get_stamp(processor).get()
+        if self.versions.get(processor, version) != version:
+            self.drop(processor)
+        self.versions[processor] = version
+
+    def lookup_cache(self: Self, key: tuple) -> list[TextPiece] | None:
+        with self.lock:
+            self.sync(key[0])
+            text_pieces = self.cache.get(key)
+            if text_pieces is not None:
+                self.memory_hits += 1
+            return text_pieces
+
+    def database_query(self: Self, keys: list[tuple]) -> QuerySet:
+        """Database query
+
+        Args:
+            keys (list[tuple]): The keys made with `make_key`, which must share a
+                processor and language
+
+        Returns:
+            QuerySet: The text pieces of the stored analyses of the keys, in order
+                and annotated with the `source_hash` of their text. Text pieces are
+                linked to their analysis directly, or through their occurrences in
+                deduplicated vocabulary mode
+        """
+        processor, language_id, _ = keys[0]
+        source_hashes = {source_hash for _, _, source_hash in keys}
+
+        text_pieces = TextPiece.objects.filter(
+            analysis__source_hash__in=source_hashes,
+            analysis__processor=processor,
+            analysis__language_id=language_id,
+        ).annotate(source_hash=F("analysis__source_hash"), position=F("id"))
+        occurrences = TextPiece.objects.filter(
+            occurrences__analysis__source_hash__in=source_hashes,
+            occurrences__analysis__processor=processor,
+            occurrences__analysis__language_id=language_id,
+        ).annotate(
+            source_hash=F("occurrences__analysis__source_hash"),
+            position=F("occurrences__position"),
+        )
+        return text_pieces.union(occurrences, all=True).order_by(
+            "source_hash", "position"
+        )
+
+    def analysis_query(self: Self, keys: list[tuple]) -> QuerySet:
+        processor, language_id, _ = keys[0]
+        return Analysis.objects.filter(
+            source_hash__in={source_hash for _, _, source_hash in keys},
+            processor=processor,
+            language_id=language_id,
+        )
+
+    def record_database_result(
+        self: Self, key: tuple, text_pieces: list[TextPiece] | None
+    ) -> list[TextPiece] | None:
+        with self.lock:
+            if text_pieces is None:
+                self.misses += 1
+                return None
+
+            self.database_hits += 1
+            self.cache[key] = text_pieces
+        return text_pieces
+
+    def lookup_many(self: Self, keys: list[tuple]) -> dict[tuple, list[TextPiece]]:
+        """Lookup many
+
+        Batch equivalent of `lookup`, for keys that share a processor and language.
+        Keys missing from the in-process cache are looked up in the DB with a single
+        query.
+
+        Args:
+            keys (list[tuple]): The keys made with `make_key`
+
+        Returns:
+            dict[tuple, list[TextPiece]]: The text pieces of each key that has been
+                processed before
+        """
+        found = {}
+
+        with self.lock:
+            for processor in {key[0] for key in keys}:
+                self.sync(processor)
+            for key in keys:
+                text_pieces = self.cache.get(key)
+                if text_pieces is not None:
+                    found[key] = text_pieces
+            self.memory_hits += len(found)
+
+        missing = [key for key in keys if key not in found]
+        if not missing:
+            return found
+
+        processor, language_id, _ = missing[0]
+        text_pieces = list(self.database_query(missing))
+        found_hashes = {text_piece.source_hash for text_piece in text_pieces}
+        # Texts that were broken down into no text pieces at all have an analysis
+        # with no text pieces
+        unfound = [key for key in missing if key[2] not in found_hashes]
+        empty = (
+            self.analysis_query(unfound).values_list("source_hash", flat=True)
+            if unfound
+            else []
+        )
+
+        with self.lock:
+            for text_piece in text_pieces:
+                key = (processor, language_id, text_piece.source_hash)
+                found.setdefault(key, []).append(text_piece)
+            for source_hash in empty:
+                found[(processor, language_id, source_hash)] = []
+            for key in missing:
+                if key in found:
+                    self.cache[key] = found[key]
+                    self.database_hits += 1
+                else:
+                    self.misses += 1
+
+        return found
+
+    def store(self: Self, key: tuple, text_pieces: list[TextPiece]) -> None:
+        """Store
+
+        Add the text pieces of a freshly processed text to the in-process cache.
+        Persisting the analysis is left to the caller.
+
+        Args:
+            key (tuple): The key made with `make_key`
+            text_pieces (list[TextPiece]): The stored text pieces, in order
+        """
+        with self.lock:
+            self.sync(key[0])
+            self.cache[key] = text_pieces
+
+    def invalidate(self: Self, processor: str | None = None) -> int:
+        """Invalidate
+
+        Delete the stored analyses of a processor, so that texts are sent to the
+        processor again, and drop them from the in-process cache. The text pieces
+        themselves are kept. The processor's version stamp is bumped both now and
+        once the deletion has been committed, so that the other processes drop their
+        cached entries too.
+
+        Args:
+            processor (str): The name of the processor, or `None` for every processor
+
+        Returns:
+            int: The number of analyses deleted
+        """
+        analyses = Analysis.objects.all()
+        if processor is not None:
+            analyses = analyses.filter(processor=processor)
+        _, deleted = analyses.delete()
+
+        with self.lock:
+            self.drop(processor)
+
+        names = (
+            [name for name, _ in SUPPORTED_NLP_PROCESSORS]
+            if processor is None
+            else [processor]
+        )
+        for name in names:
+            stamp = self.get_stamp(name)
+            stamp.bump()
+            transaction.on_commit(stamp.bump)
+
+        return deleted.get(Analysis._meta.label, 0)
+
+    def clear(self: Self) -> None:
+        """Clear
+
+        Empty the in-process cache and reset the counters
+        """
+        with self.lock:
+            self.cache.clear()
+            self.memory_hits = 0
+            self.database_hits = 0
+            self.misses = 0
+
+    def stats(self: Self) -> dict[str, int]:
+        """Stats
+
+        Returns:
+            dict[str, int]: The hit/miss counters and the current size of the cache
+        """
+        with self.lock:
+            return {
+                "hits": self.memory_hits + self.database_hits,
+                "memory_hits": self.memory_hits,
+                "database_hits": self.database_hits,
+                "misses": self.misses,
+                "size": len(self.cache),
+                "max_size": int(self.cache.maxsize),
+            }
+
+
+analysis_cache = AnalysisCache(
+    max_size=settings.NLP_ANALYSIS_CACHE_MAX_SIZE,
+    ttl=settings.NLP_ANALYSIS_CACHE_TTL,
+)
+
+stats.register("nlp_analysis_cache", analysis_cache.stats)
@@ -2,7 +2,8 @@ from dataclasses import dataclass
 from typing import Self
 
 from languages.models import Language
-from preferences.models import Preferences
+from languages.registry import language_registry
+from preferences.snapshot import PreferencesSnapshot
 
 
 @dataclass
@@ -11,6 +12,19 @@ class TextPiece:
     pos_tag: str
     language: Language
 
+    def to_dict(self: Self) -> dict[str, str]:
+        return {
+            "text_item": self.text_item,
+            "pos_tag": self.pos_tag,
+            "language": self.language.code,
+        }
+
+    @classmethod
+    def from_dict(cls: type[Self], data: dict[str, str]) -> Self:
+        return cls(
+            data["text_item"], data["pos_tag"], language_registry.get(data["language"])
+        )
+
 
 @dataclass(init=False)
 class ProcessorParams:
@@ -20,7 +34,7 @@ class ProcessorParams:
 
     def __init__(
         self: Self,
-        preferences: Preferences,
+        preferences: PreferencesSnapshot,
         text: str,
         language_code: str | None,
         processor: str | None,
@@ -29,8 +43,51 @@ class ProcessorParams:
         self.processor = processor if processor else preferences.processor
 
         if language_code:
-            self.language = Language.language_manager.get_by_long_code_or_short_code(
-                language_code,
-            )
+            self.language = language_registry.get(language_code)
+        else:
+            self.language = preferences.target_lang
+
+    @classmethod
+    async def acreate(
+        cls: type[Self],
+        preferences: PreferencesSnapshot,
+        text: str,
+        language_code: str | None,
+        processor: str | None,
+    ) -> Self:
+        """Create
+
+        Async equivalent of the constructor, for use by the async views
+        """
+        params = cls.__new__(cls)
+        params.text = text
+        params.processor = processor if processor else preferences.processor
+
+        if language_code:
+            params.language = await language_registry.aget(language_code)
+        else:
+            params.language = preferences.target_lang
+
+        return params
+
+
+@dataclass(init=False)
+class BatchProcessorParams:
+    processor: str
+    language: Language
+    texts: list[str]
+
+    def __init__(
+        self: Self,
+        preferences: PreferencesSnapshot,
+        texts: list[str],
+        language_code: str | None,
+        processor: str | None,
+    ) -> None:
+        self.texts = texts
+        self.processor = processor if processor else preferences.processor
+
+        if language_code:
+            self.language = language_registry.get(language_code)
         else:
             self.language = preferences.target_lang
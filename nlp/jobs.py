@@ -0,0 +1,58 @@
+from typing import Self
+
+from django.conf import settings
+
+from jobs.exceptions import JobValidationException
+from jobs.handlers import register, split_document
+from nlp.entities import ProcessorParams
+from nlp.managers import NLPManager
+from nlp.serializers import Deserializer, Serializer
+from preferences.snapshot import preferences_cache
+
+
+class NLPJobHandler:
+    """NLP Job Handler
+
+    Processes a document in the background, `JOB_CHUNK_CHARACTERS` at a time. Each
+    chunk is processed, and stored, as a text of its own, and the result is the text
+    pieces of every chunk in order.
+    """
+
+    manager: NLPManager
+
+    def __init__(self: Self) -> None:
+        self.manager = NLPManager(Deserializer, Serializer)
+
+    def get_params(self: Self, request_data: dict, text: str) -> ProcessorParams:
+        return ProcessorParams(
+            preferences=preferences_cache.get(),
+            text=text,
+            language_code=request_data.get("language_code", None),
+            processor=request_data.get("processor", None),
+        )
+
+    def plan(self: Self, request_data: dict) -> list[str]:
+        deserializer = Deserializer(data=request_data)
+
+        if not deserializer.is_valid():
+            raise JobValidationException(errors=deserializer.errors)
+
+        params = self.get_params(
+            deserializer.data, deserializer.data["text_to_be_processed"]
+        )
+        if params.language is None:
+            raise JobValidationException(
+                errors={"language_code": ["Unknown language code."]}
+            )
+
+        return split_document(params.text, settings.JOB_CHUNK_CHARACTERS)
+
+    def run_chunk(self: Self, request_data: dict, chunk: str) -> list[dict]:
+        text_pieces = self.manager._process(self.get_params(request_data, chunk))
+        return list(Serializer(text_pieces, many=True).data)
+
+    def finish(self: Self, request_data: dict, results: list[list[dict]]) -> list:
+        return [text_piece for text_pieces in results for text_piece in text_pieces]
+
+
+register("nlp", NLPJobHandler())
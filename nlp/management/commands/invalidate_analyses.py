@@ -0,0 +1,21 @@
+from typing import Any, Self
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from nlp.cache import analysis_cache
+from preferences.models import SUPPORTED_NLP_PROCESSORS
+
+
+class Command(BaseCommand):
+    help = "Delete the cached NLP analyses of a processor, or of every processor"
+
+    def add_arguments(self: Self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--processor",
+            choices=[processor for processor, _ in SUPPORTED_NLP_PROCESSORS],
+            help="Only invalidate the analyses made by this processor",
+        )
+
+    def handle(self: Self, *args: Any, **options: Any) -> None:
+        deleted = analysis_cache.invalidate(options["processor"])
+        self.stdout.write(f"Invalidated {deleted} analyses")
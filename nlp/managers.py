@@ -1,12 +1,29 @@
 # type: ignore
+from functools import partial
 from typing import Self, Type
 
-from nlp.entities import ProcessorParams, TextPiece
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+
+from decyphr.admission import admission
+from decyphr.errors import error_item
+from decyphr.export import export_response
+from decyphr.routing import order_candidates, router
+from decyphr.singleflight import single_flight
+from decyphr.text import content_hash
+from languages.registry import language_registry
+from nlp.cache import analysis_cache
+from nlp.entities import BatchProcessorParams, ProcessorParams, TextPiece
 from nlp.exceptions import NLPValidationException
+from nlp.models import Analysis
 from nlp.models import TextPiece as TextPieceModel
-from nlp.processors import get_processor
-from nlp.serializers import Deserializer, Serializer
-from preferences.models import Preferences
+from nlp.models import TextPieceOccurrence
+from nlp.processors import get_processor, process_in_batches, processors
+from nlp.serializers import EXPORT_FIELDS, Deserializer, Serializer
+from preferences.snapshot import preferences_cache
 
 
 class NLPManager:
@@ -22,36 +39,291 @@ class NLPManager:
         self.serializer = serializer
 
     def _create_db_instances(
-        self: Self, processed_data: list[TextPiece]
+        self: Self, key: tuple, processed_data: list[TextPiece]
     ) -> list[TextPieceModel]:
         """Create DB Instances
 
-        Iterate over the data provided and store each item in the DB and return a list
-        of the DB instances
+        Store the processed data in the DB as an `Analysis` of the text, in batches
+        of `NLP_BULK_CREATE_BATCH_SIZE` inside a single transaction, and return a
+        list of the DB instances. If the same text was stored by another request in
+        the meantime, its text pieces are returned instead.
 
         Args:
-            list[TextPiece]: The processed data
+            key (tuple): The analysis cache key of the text that was processed
+            processed_data (list[TextPiece]): The processed data
 
         Returns:
-            list[TextPieceModel]: The DB instances
+            list[TextPieceModel]: The DB instances, in the same order as the
+                processed data
         """
-        text_pieces = []
-        for processed_text_piece in processed_data:
-            text_piece = TextPieceModel(
-                text=processed_text_piece.text_item,
-                pos_tag=processed_text_piece.pos_tag,
-                language=processed_text_piece.language,
+        processor, language_id, source_hash = key
+
+        with transaction.atomic():
+            analysis, created = Analysis.objects.get_or_create(
+                source_hash=source_hash, processor=processor, language_id=language_id
+            )
+            if not created:
+                return list(analysis_cache.database_query([key]))
+
+            text_pieces = self._create_text_pieces(
+                processed_data, [analysis] * len(processed_data)
             )
-            text_piece.save()
-            text_pieces.append(text_piece)
+            self._create_occurrences([(analysis, text_pieces)])
+
+        analysis_cache.store(key, text_pieces)
         return text_pieces
 
+    def _create_many_db_instances(
+        self: Self, processed: dict[tuple, list[TextPiece]]
+    ) -> dict[tuple, list[TextPieceModel]]:
+        """Create many DB instances
+
+        Batch equivalent of `_create_db_instances`. The analyses, text pieces and
+        occurrences of all of the texts are each created with bulk queries inside a
+        single transaction. If any of the texts was stored by another request in the
+        meantime, each text is stored separately instead.
+
+        Args:
+            processed (dict[tuple, list[TextPiece]]): The processed data of each
+                text, by analysis cache key
+
+        Returns:
+            dict[tuple, list[TextPieceModel]]: The DB instances of each text
+        """
+        try:
+            with transaction.atomic():
+                analyses = Analysis.objects.bulk_create(
+                    [
+                        Analysis(
+                            source_hash=source_hash,
+                            processor=processor,
+                            language_id=language_id,
+                        )
+                        for processor, language_id, source_hash in processed
+                    ]
+                )
+                text_pieces = iter(
+                    self._create_text_pieces(
+                        [piece for pieces in processed.values() for piece in pieces],
+                        [
+                            analysis
+                            for analysis, pieces in zip(analyses, processed.values())
+                            for _ in pieces
+                        ],
+                    )
+                )
+                results = {
+                    key: [next(text_pieces) for _ in pieces]
+                    for key, pieces in processed.items()
+                }
+                self._create_occurrences(list(zip(analyses, results.values())))
+        except IntegrityError:
+            return {
+                key: self._create_db_instances(key, processed_data)
+                for key, processed_data in processed.items()
+            }
+
+        for key, text_pieces in results.items():
+            analysis_cache.store(key, text_pieces)
+        return results
+
+    def _create_text_pieces(
+        self: Self, processed_data: list[TextPiece], analyses: list[Analysis]
+    ) -> list[TextPieceModel]:
+        """Create text pieces
+
+        Args:
+            processed_data (list[TextPiece]): The processed data
+            analyses (list[Analysis]): The analysis each text piece was found by
+
+        Returns:
+            list[TextPieceModel]: The DB instances, in the same order as the
+                processed data. Outside of deduplicated vocabulary mode each one is
+                new and linked to its analysis
+        """
+        if settings.NLP_DEDUPLICATE_VOCABULARY:
+            return self._create_vocabulary_instances(processed_data)
+
+        return TextPieceModel.objects.bulk_create(
+            [
+                TextPieceModel(
+                    text=processed_text_piece.text_item,
+                    pos_tag=processed_text_piece.pos_tag,
+                    language=processed_text_piece.language,
+                    analysis=analysis,
+                )
+                for processed_text_piece, analysis in zip(processed_data, analyses)
+            ],
+            batch_size=settings.NLP_BULK_CREATE_BATCH_SIZE,
+        )
+
+    def _create_occurrences(
+        self: Self, analyses: list[tuple[Analysis, list[TextPieceModel]]]
+    ) -> None:
+        # Only text pieces shared between texts need an occurrence to record where
+        # they appear. Other text pieces are linked to their analysis directly
+        if not settings.NLP_DEDUPLICATE_VOCABULARY:
+            return
+
+        TextPieceOccurrence.objects.bulk_create(
+            [
+                TextPieceOccurrence(
+                    analysis=analysis, text_piece=text_piece, position=position
+                )
+                for analysis, text_pieces in analyses
+                for position, text_piece in enumerate(text_pieces)
+            ],
+            batch_size=settings.NLP_BULK_CREATE_BATCH_SIZE,
+        )
+
+    def _create_vocabulary_instances(
+        self: Self, processed_data: list[TextPiece]
+    ) -> list[TextPieceModel]:
+        """Create vocabulary instances
+
+        Deduplicated vocabulary mode: each distinct (text, pos_tag, language) is
+        stored once, and reused by every text it appears in
+
+        Args:
+            processed_data (list[TextPiece]): The processed data
+
+        Returns:
+            list[TextPieceModel]: The DB instances, in the same order as the
+                processed data
+        """
+        batch_size = settings.NLP_BULK_CREATE_BATCH_SIZE
+        keys = [
+            (piece.text_item, piece.pos_tag, piece.language.id)
+            for piece in processed_data
+        ]
+        texts = list({text for text, _, _ in keys})
+        vocabulary = {}
+
+        for start in range(0, len(texts), batch_size):
+            for text_piece in TextPieceModel.objects.filter(
+                text__in=texts[start : start + batch_size],
+                language_id__in={language_id for _, _, language_id in keys},
+            ).order_by("-id"):
+                vocabulary[
+                    (text_piece.text, text_piece.pos_tag, text_piece.language_id)
+                ] = text_piece
+
+        new_text_pieces = {}
+        for key, piece in zip(keys, processed_data):
+            if key not in vocabulary and key not in new_text_pieces:
+                new_text_pieces[key] = TextPieceModel(
+                    text=piece.text_item,
+                    pos_tag=piece.pos_tag,
+                    language=piece.language,
+                )
+
+        TextPieceModel.objects.bulk_create(
+            new_text_pieces.values(), batch_size=batch_size
+        )
+        vocabulary.update(new_text_pieces)
+
+        return [vocabulary[key] for key in keys]
+
+    def _call_processor(self: Self, params: ProcessorParams) -> list[TextPiece]:
+        """Call processor
+
+        Process the text with the processor requested or, in routing mode, with the
+        first healthy processor
+
+        Args:
+            params (ProcessorParams): The data needed to determine the process to be
+                used, along with the text and the language
+
+        Returns:
+            list[TextPiece]: The processed data
+        """
+        if not settings.PROVIDER_ROUTING:
+            return self._call_provider(params, params.processor)
+
+        _, processed_text_pieces = router.call(
+            order_candidates(params.processor, processors),
+            ("nlp", params.language.code),
+            partial(self._call_provider, params),
+        )
+        return processed_text_pieces
+
+    def _call_provider(
+        self: Self, params: ProcessorParams, processor: str
+    ) -> list[TextPiece]:
+        """Call provider
+
+        Args:
+            params (ProcessorParams): The text and the language
+            processor (str): The name of the processor to use
+
+        Returns:
+            list[TextPiece]: The processed data
+
+        Raises:
+            ProviderUnavailableException if the processor has too many calls in
+                flight
+        """
+        with admission.admit(f"nlp.{processor}"):
+            return get_processor(processor).process(params.text, params.language)
+
     def _process(self: Self, params: ProcessorParams) -> list[TextPieceModel]:
         """Process
 
         Get the processor and use the text and language info to the process the data.
         Once the data has been processed, store it in the DB and return it the instances
 
+        Texts that have been processed before are answered from the analysis cache,
+        and concurrent requests to process the same text share a single call to the
+        processor.
+
+        Args:
+            params (ProcessorParams): The data needed to determine the process to be
+                used, along with the text and the language
+
+        Returns:
+            list[TextPieceModel]
+        """
+        key = analysis_cache.make_key(
+            params.processor, params.language, content_hash(params.text)
+        )
+        text_pieces = analysis_cache.lookup(key)
+        if text_pieces is not None:
+            return text_pieces
+
+        return self._process_new(params, key)
+
+    def _process_new(
+        self: Self, params: ProcessorParams, key: tuple
+    ) -> list[TextPieceModel]:
+        """Process new
+
+        The part of `_process` for texts that aren't in the analysis cache, which is
+        shared with `_aprocess`
+
+        Args:
+            params (ProcessorParams): The data needed to determine the process to be
+                used, along with the text and the language
+            key (tuple): The analysis cache key of the text
+
+        Returns:
+            list[TextPieceModel]
+        """
+        processed_text_pieces = single_flight.do(
+            single_flight.make_key("nlp", *key),
+            partial(self._call_processor, params),
+            encode=lambda text_pieces: [piece.to_dict() for piece in text_pieces],
+            decode=lambda data: [TextPiece.from_dict(piece) for piece in data],
+        )
+
+        return self._create_db_instances(key=key, processed_data=processed_text_pieces)
+
+    async def _aprocess(self: Self, params: ProcessorParams) -> list[TextPieceModel]:
+        """Process
+
+        Async equivalent of `_process`. The analysis cache is checked on the event
+        loop, and texts that aren't in it go through the same pipeline as on the
+        sync path, so that they are routed and shared in the same way
+
         Args:
             params (ProcessorParams): The data needed to determine the process to be
                 used, along with the text and the language
@@ -59,11 +331,136 @@ class NLPManager:
         Returns:
             list[TextPieceModel]
         """
-        processed_text_pieces = get_processor(params.processor).process(
-            params.text, params.language
+        key = analysis_cache.make_key(
+            params.processor, params.language, content_hash(params.text)
         )
+        text_pieces = await analysis_cache.alookup(key)
+        if text_pieces is not None:
+            return text_pieces
+
+        return await sync_to_async(self._process_new)(params, key)
+
+    def _process_batch(
+        self: Self, params: BatchProcessorParams
+    ) -> list[list[TextPieceModel] | Exception]:
+        """Process batch
+
+        Batch equivalent of `_process`. Texts that haven't been processed before are
+        sent to the processor in as few calls as it allows, and stored together.
+
+        Args:
+            params (BatchProcessorParams): The data needed to determine the process
+                to be used, along with the texts and the language
+
+        Returns:
+            list[list[TextPieceModel] | Exception]: The DB instances, or the error
+                raised while processing the text, for each of the texts in the order
+                they were provided
+        """
+        keys = {
+            text: analysis_cache.make_key(
+                params.processor, params.language, content_hash(text)
+            )
+            for text in params.texts
+        }
+        results = analysis_cache.lookup_many(list(set(keys.values())))
+
+        missing = {}
+        for text, key in keys.items():
+            if key not in results:
+                missing.setdefault(key, text)
+
+        processed, errors = {}, {}
+        processed_texts = []
+        if missing:
+            processed_texts = process_in_batches(
+                get_processor(params.processor),
+                list(missing.values()),
+                params.language,
+                admission_name=f"nlp.{params.processor}",
+            )
+
+        for key, processed_data in zip(missing, processed_texts):
+            if isinstance(processed_data, Exception):
+                errors[key] = processed_data
+            else:
+                processed[key] = processed_data
+
+        if processed:
+            results.update(self._create_many_db_instances(processed))
+
+        return [
+            results[keys[text]] if keys[text] in results else errors[keys[text]]
+            for text in params.texts
+        ]
+
+    def filter_text_pieces(
+        self: Self, queryset: QuerySet, query_params: dict[str, str]
+    ) -> QuerySet:
+        """Filter text pieces
+
+        Narrow down the text pieces listed by the endpoint using the query params
+
+        Args:
+            queryset (QuerySet): The text pieces to filter
+            query_params (dict[str, str]): The query params received by the endpoint
+
+        Returns:
+            QuerySet: The filtered text pieces
+        """
+        deserializer = self.deserializer(data=query_params)
+
+        if not deserializer.is_valid():
+            raise NLPValidationException(errors=deserializer.errors)
+
+        return self._filter(queryset, deserializer.validated_data)
+
+    def _filter(self: Self, queryset: QuerySet, data: dict) -> QuerySet:
+        filters = {}
+
+        if "language_code" in data:
+            filters["language"] = language_registry.get(data["language_code"])
+            if filters["language"] is None:
+                raise NLPValidationException(
+                    errors={"language_code": ["Unknown language code."]}
+                )
+
+        if "pos_tag" in data:
+            filters["pos_tag"] = data["pos_tag"].upper()
+        if "created_after" in data:
+            filters["created_at__gte"] = data["created_after"]
+        if "created_before" in data:
+            filters["created_at__lt"] = data["created_before"]
+
+        return queryset.filter(**filters)
+
+    def export_text_pieces(
+        self: Self, queryset: QuerySet, query_params: dict[str, str]
+    ) -> StreamingHttpResponse:
+        """Export text pieces
 
-        return self._create_db_instances(processed_data=processed_text_pieces)
+        Stream the text pieces matching the filters in the query params
+
+        Args:
+            queryset (QuerySet): The text pieces to export
+            query_params (dict[str, str]): The query params received by the endpoint
+
+        Returns:
+            StreamingHttpResponse: The export
+        """
+        deserializer = self.deserializer(data=query_params)
+
+        if not deserializer.is_valid():
+            raise NLPValidationException(errors=deserializer.errors)
+
+        data = deserializer.validated_data
+        return export_response(
+            self._filter(queryset, data).order_by("id"),
+            EXPORT_FIELDS,
+            "text_pieces",
+            output=data["output"],
+            compress="compress" in data,
+        )
 
     def create_new_processed_text(
         self: Self, request_data: dict[str, str]
@@ -85,10 +482,91 @@ class NLPManager:
             raise NLPValidationException(errors=deserializer.errors)
 
         processor_params = ProcessorParams(
-            preferences=Preferences.objects.all().first(),
+            preferences=preferences_cache.get(),
             text=deserializer.data["text_to_be_processed"],
             language_code=deserializer.data.get("language_code", None),
             processor=deserializer.data.get("processor", None),
         )
 
+        if processor_params.language is None:
+            raise NLPValidationException(
+                errors={"language_code": ["Unknown language code."]}
+            )
+
         return self.serializer(self._process(processor_params), many=True)
+
+    def create_new_processed_texts(self: Self, request_data: dict) -> list[dict]:
+        """Create new processed texts
+
+        Batch equivalent of `create_new_processed_text`. Processes each of the texts
+        received by the endpoint and stores all of the new text pieces in the DB in
+        a single transaction.
+
+        Args:
+            request_data (dict): The data received by the endpoint
+
+        Returns:
+            list[dict]: For each text, in the order they were provided, either the
+                serialised `TextPiece` instances or the error that prevented it from
+                being processed
+        """
+        deserializer = self.deserializer(data=request_data)
+
+        if not deserializer.is_valid():
+            raise NLPValidationException(errors=deserializer.errors)
+
+        params = BatchProcessorParams(
+            preferences=preferences_cache.get(),
+            texts=deserializer.data["texts_to_be_processed"],
+            language_code=deserializer.data.get("language_code", None),
+            processor=deserializer.data.get("processor", None),
+        )
+
+        if params.language is None:
+            raise NLPValidationException(
+                errors={"language_code": ["Unknown language code."]}
+            )
+
+        return [
+            {"index": index, **error_item(result)}
+            if isinstance(result, Exception)
+            else {
+                "index": index,
+                "text_pieces": self.serializer(result, many=True).data,
+            }
+            for index, result in enumerate(self._process_batch(params))
+        ]
+
+    async def acreate_new_processed_text(
+        self: Self, request_data: dict[str, str]
+    ) -> Serializer:
+        """Create new processed text
+
+        Async equivalent of `create_new_processed_text`, used by the async views. All
+        of the DB access goes through the async queryset API and the provider call
+        does not block the event loop.
+
+        Args:
+            request_data (dict[str, str]): The body of the POST request
+
+        returns:
+            Serializer: The serialized `TextPiece` data
+        """
+        deserializer = self.deserializer(data=request_data)
+
+        if not deserializer.is_valid():
+            raise NLPValidationException(errors=deserializer.errors)
+
+        processor_params = await ProcessorParams.acreate(
+            preferences=await preferences_cache.aget(),
+            text=deserializer.data["text_to_be_processed"],
+            language_code=deserializer.data.get("language_code", None),
+            processor=deserializer.data.get("processor", None),
+        )
+
+        if processor_params.language is None:
+            raise NLPValidationException(
+                errors={"language_code": ["Unknown language code."]}
+            )
+
+        return self.serializer(await self._aprocess(processor_params), many=True)
@@ -0,0 +1,50 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("nlp", "0002_textpiece_language"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="textpiece",
+            index=models.Index(
+                fields=["text", "pos_tag", "language"],
+                name="text_piece_vocabulary_idx",
+            ),
+        ),
+        migrations.CreateModel(
+            name="TextPieceOccurrence",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("source_hash", models.CharField(max_length=64)),
+                ("position", models.PositiveIntegerField()),
+                (
+                    "text_piece",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="occurrences",
+                        to="nlp.textpiece",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["source_hash", "position"],
+                        name="text_piece_occurrence_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,81 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def delete_occurrences(apps, schema_editor):
+    """Occurrences recorded before analyses existed can't be tied to one"""
+    apps.get_model("nlp", "TextPieceOccurrence").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("languages", "0002_alter_language_managers"),
+        ("nlp", "0003_text_piece_vocabulary"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Analysis",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("source_hash", models.CharField(max_length=64)),
+                (
+                    "processor",
+                    models.CharField(
+                        choices=[("amazon", "Amazon"), ("google", "Google")],
+                        max_length=255,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "language",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="analyses",
+                        to="languages.language",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "analyses",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("source_hash", "processor", "language"),
+                        name="unique_analysis",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(delete_occurrences, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name="textpieceoccurrence",
+            name="text_piece_occurrence_idx",
+        ),
+        migrations.RemoveField(
+            model_name="textpieceoccurrence",
+            name="source_hash",
+        ),
+        migrations.AddField(
+            model_name="textpieceoccurrence",
+            name="analysis",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="occurrences",
+                to="nlp.analysis",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="textpieceoccurrence",
+            index=models.Index(
+                fields=["analysis", "position"], name="text_piece_occurrence_idx"
+            ),
+        ),
+    ]
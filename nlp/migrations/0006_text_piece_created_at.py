@@ -0,0 +1,34 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("languages", "0002_alter_language_managers"),
+        ("nlp", "0005_alter_analysis_processor"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="textpiece",
+            name="created_at",
+            field=models.DateTimeField(
+                auto_now_add=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name="textpiece",
+            index=models.Index(
+                fields=["language", "id"], name="text_piece_language_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="textpiece",
+            index=models.Index(fields=["pos_tag", "id"], name="text_piece_pos_tag_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="textpiece",
+            index=models.Index(fields=["created_at"], name="text_piece_created_at_idx"),
+        ),
+    ]
@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("nlp", "0006_text_piece_created_at"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="textpiece",
+            name="text_piece_created_at_idx",
+        ),
+        migrations.AddIndex(
+            model_name="textpiece",
+            index=models.Index(
+                fields=["created_at", "id"], name="text_piece_created_at_idx"
+            ),
+        ),
+    ]
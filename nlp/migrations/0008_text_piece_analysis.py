@@ -0,0 +1,22 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("nlp", "0007_text_piece_created_at_id"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="textpiece",
+            name="analysis",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="text_pieces",
+                to="nlp.analysis",
+            ),
+        ),
+    ]
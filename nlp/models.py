@@ -1,6 +1,7 @@
 from django.db import models
 
 from languages.models import Language
+from preferences.models import SUPPORTED_NLP_PROCESSORS
 
 
 class TextPiece(models.Model):
@@ -9,3 +10,74 @@ class TextPiece(models.Model):
     language = models.ForeignKey(
         Language, on_delete=models.CASCADE, related_name="language"
     )
+    created_at = models.DateTimeField(auto_now_add=True)
+    # The analysis of the text the piece was found in. Only set outside of
+    # deduplicated vocabulary mode, where a text piece belongs to a single text and
+    # needs no occurrence to record it
+    analysis = models.ForeignKey(
+        "Analysis",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="text_pieces",
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["text", "pos_tag", "language"], name="text_piece_vocabulary_idx"
+            ),
+            models.Index(fields=["language", "id"], name="text_piece_language_idx"),
+            models.Index(fields=["pos_tag", "id"], name="text_piece_pos_tag_idx"),
+            models.Index(fields=["created_at", "id"], name="text_piece_created_at_idx"),
+        ]
+
+
+class Analysis(models.Model):
+    """Analysis
+
+    A text that has been processed, identified by the normalised content hash of the
+    text, the processor and the language. The text pieces it was broken down into
+    are linked to it, or in deduplicated vocabulary mode are its occurrences, so
+    that processing the same text again can be answered from the DB.
+    """
+
+    source_hash = models.CharField(max_length=64)
+    processor = models.CharField(max_length=255, choices=SUPPORTED_NLP_PROCESSORS)
+    language = models.ForeignKey(
+        Language, on_delete=models.CASCADE, related_name="analyses"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name_plural = "analyses"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["source_hash", "processor", "language"],
+                name="unique_analysis",
+            )
+        ]
+
+
+class TextPieceOccurrence(models.Model):
+    """Text Piece Occurrence
+
+    Records where a text piece appears in an analysed text. In deduplicated
+    vocabulary mode each distinct text piece is stored once and shared by the
+    occurrences of every text it appears in.
+    """
+
+    analysis = models.ForeignKey(
+        Analysis, on_delete=models.CASCADE, related_name="occurrences"
+    )
+    text_piece = models.ForeignKey(
+        TextPiece, on_delete=models.CASCADE, related_name="occurrences"
+    )
+    position = models.PositiveIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["analysis", "position"], name="text_piece_occurrence_idx"
+            )
+        ]
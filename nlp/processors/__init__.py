@@ -1,7 +1,15 @@
+from functools import partial
+
 from django.conf import settings
 
+from decyphr.admission import admission
+from decyphr.deadlines import raise_exceeded
+from decyphr.executors import map_in_provider_executor
+from languages.models import Language
+from nlp.entities import TextPiece
 from nlp.processors.amazon import AmazonNLP
 from nlp.processors.google import GoogleNLP
+from nlp.processors.local import LocalNLP
 from nlp.processors.protocol import NLPProtocol
 
 processors = {
@@ -9,8 +17,96 @@ processors = {
         settings.AWS_SECRET_KEY_ID, settings.AWS_SECRET_ACCESS_KEY, settings.AWS_REGION
     ),
     "google": GoogleNLP(),
+    "local": LocalNLP(settings.NLP_LOCAL_LEXICON_DIR),
 }
 
 
 def get_processor(name: str) -> NLPProtocol:
     return processors[name]
+
+
+def process_text(
+    processor: NLPProtocol,
+    language: Language,
+    text: str,
+    admission_name: str | None = None,
+) -> list[TextPiece] | Exception:
+    try:
+        with admission.maybe_admit(admission_name):
+            return processor.process(text, language)
+    except Exception as e:
+        return e
+
+
+def process_chunk(
+    processor: NLPProtocol,
+    language: Language,
+    chunk: list[str],
+    admission_name: str | None = None,
+) -> list[list[TextPiece] | Exception]:
+    try:
+        with admission.maybe_admit(admission_name):
+            return processor.process_many(chunk, language)
+    except Exception as e:
+        return [e] * len(chunk)
+
+
+def process_in_batches(
+    processor: NLPProtocol,
+    texts: list[str],
+    language: Language,
+    admission_name: str | None = None,
+) -> list[list[TextPiece] | Exception]:
+    """Process in batches
+
+    Process the texts using the provider's multi-document API in chunks of
+    `max_batch_size` where it has one, and falling back to one call per text for
+    providers that don't. Up to `NLP_MAX_PARALLEL_CALLS` of the calls are made in
+    parallel, each of which is admitted separately when `admission_name` is given,
+    so that they count towards the provider's concurrency.
+
+    A failed call does not fail the whole list. The exception raised is returned in
+    place of the processed data of each text that was part of the failed call,
+    unless the call ran out of time before the request's deadline.
+
+    Args:
+        processor (NLPProtocol): The processor to use
+        texts (list[str]): The texts to process
+        language (Language): The language of the texts
+        admission_name (str): The name the calls are admitted under, e.g.
+            `nlp.amazon`
+
+    Returns:
+        list[list[TextPiece] | Exception]: The processed data, in the same order as
+            `texts`
+
+    Raises:
+        DeadlineExceededException if the request's deadline passed
+    """
+    max_parallel = settings.NLP_MAX_PARALLEL_CALLS
+
+    if not hasattr(processor, "process_many"):
+        results = map_in_provider_executor(
+            partial(process_text, processor, language, admission_name=admission_name),
+            texts,
+            max_parallel,
+        )
+    else:
+        chunks = [
+            texts[start : start + processor.max_batch_size]
+            for start in range(0, len(texts), processor.max_batch_size)
+        ]
+        results = [
+            result
+            for chunk_results in map_in_provider_executor(
+                partial(
+                    process_chunk, processor, language, admission_name=admission_name
+                ),
+                chunks,
+                max_parallel,
+            )
+            for result in chunk_results
+        ]
+
+    raise_exceeded(results)
+    return results
@@ -1,7 +1,9 @@
 from typing import Any, Self
 
-from boto3 import client
-
+from decyphr.clients import get_boto3_client
+from decyphr.deadlines import within_deadline
+from decyphr.executors import run_in_provider_executor
+from decyphr.ratelimit import rate_limiter
 from languages.models import Language
 from nlp.entities import TextPiece
 
@@ -10,6 +12,7 @@ class AmazonNLP:
     api_key: str
     secret_key: str | None
     region: str
+    max_batch_size: int = 25
 
     def __init__(
         self: Self, aws_access_key_id: str, aws_secret_access_key: str, aws_region: str
@@ -18,6 +21,11 @@ class AmazonNLP:
         self.secret_key = aws_secret_access_key
         self.region = aws_region
 
+    def initialise_client(self: Self, timeout: float | None = None):
+        return get_boto3_client(
+            "comprehend", self.region, self.api_key, self.secret_key, timeout
+        )
+
     def parse_text(
         self: Self, response: dict[str, Any], language: Language
     ) -> list[TextPiece]:
@@ -31,13 +39,31 @@ class AmazonNLP:
         ]
 
     def process(self: Self, text: str, language: Language) -> list[TextPiece]:
-        comprehend = client(
-            "comprehend",
-            region_name=self.region,
-            aws_access_key_id=self.api_key,
-            aws_secret_access_key=self.secret_key,
-        )
-        return self.parse_text(
-            comprehend.detect_syntax(Text=text, LanguageCode=language.short_code),
-            language,
-        )
+        with rate_limiter.metered("nlp.amazon", len(text), self.region):
+            with within_deadline("nlp.amazon") as timeout:
+                response = self.initialise_client(timeout).detect_syntax(
+                    Text=text, LanguageCode=language.short_code
+                )
+        return self.parse_text(response, language)
+
+    async def aprocess(self: Self, text: str, language: Language) -> list[TextPiece]:
+        return await run_in_provider_executor(self.process, text, language)
+
+    def process_many(
+        self: Self, texts: list[str], language: Language
+    ) -> list[list[TextPiece] | Exception]:
+        with rate_limiter.metered("nlp.amazon", sum(map(len, texts)), self.region):
+            with within_deadline("nlp.amazon") as timeout:
+                response = self.initialise_client(timeout).batch_detect_syntax(
+                    TextList=texts, LanguageCode=language.short_code
+                )
+        results = [None] * len(texts)
+
+        for result in response["ResultList"]:
+            results[result["Index"]] = self.parse_text(result, language)
+        for error in response["ErrorList"]:
+            results[error["Index"]] = Exception(
+                f"{error['ErrorCode']}: {error['ErrorMessage']}"
+            )
+
+        return results
@@ -1,10 +1,12 @@
 # type: ignore
 from typing import Self
 
-from django.conf import settings
 from google.cloud.language import Document, LanguageServiceClient
-from google.oauth2 import service_account
 
+from decyphr.clients import get_google_credentials, registry
+from decyphr.deadlines import RETRY_BUDGET, within_deadline
+from decyphr.executors import run_in_provider_executor
+from decyphr.ratelimit import rate_limiter
 from languages.models import Language
 from nlp.entities import TextPiece
 
@@ -20,13 +22,19 @@ class GoogleNLP:
         self.secret_key = secret_key
 
     def initialise_client(self: Self):
-        return LanguageServiceClient(
-            credentials=service_account.Credentials.from_service_account_file(
-                filename=settings.GOOGLE_CLOUD_CRED_FILE_NAME,
-                scopes=settings.GOOGLE_CLOUD_SCOPES,
-            )
+        return registry.get(
+            "google.language",
+            lambda: LanguageServiceClient(credentials=get_google_credentials()),
         )
 
+    def call_options(self: Self, timeout: float | None) -> dict:
+        # Without a deadline the client's default timeout and retries are used
+        if timeout is None:
+            return {}
+        if timeout < RETRY_BUDGET:
+            return {"timeout": timeout, "retry": None}
+        return {"timeout": timeout}
+
     def parse_response(
         self: Self, response: dict[str, str], language: Language
     ) -> list[TextPiece]:
@@ -40,9 +48,13 @@ class GoogleNLP:
         ]
 
     def process(self: Self, text: str, language: Language) -> list[TextPiece]:
-        return self.parse_response(
-            self.initialise_client().analyze_syntax(
-                document=Document(content=text, type_=Document.Type.PLAIN_TEXT)
-            ),
-            language,
-        )
+        with rate_limiter.metered("nlp.google", len(text)):
+            with within_deadline("nlp.google") as timeout:
+                response = self.initialise_client().analyze_syntax(
+                    document=Document(content=text, type_=Document.Type.PLAIN_TEXT),
+                    **self.call_options(timeout),
+                )
+        return self.parse_response(response, language)
+
+    async def aprocess(self: Self, text: str, language: Language) -> list[TextPiece]:
+        return await run_in_provider_executor(self.process, text, language)
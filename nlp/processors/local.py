@@ -0,0 +1,113 @@
+import json
+import re
+import unicodedata
+from pathlib import Path
+from threading import Lock
+from typing import Self
+
+from decyphr.executors import run_in_provider_executor
+from languages.models import Language
+from nlp.entities import TextPiece
+
+TOKEN_PATTERN = re.compile(r"\d+(?:[.,]\d+)*|\w+(?:[-']\w+)*|'\w+|[^\w\s]")
+
+SENTENCE_END = {".", "!", "?", "…"}
+
+
+class Lexicon:
+    words: dict[str, str]
+    suffixes: dict[str, str]
+    suffix_lengths: list[int]
+
+    def __init__(self: Self, words: dict[str, str], suffixes: dict[str, str]) -> None:
+        self.words = words
+        self.suffixes = suffixes
+        self.suffix_lengths = sorted({len(suffix) for suffix in suffixes}, reverse=True)
+
+    def suffix_tag(self: Self, word: str) -> str | None:
+        for length in self.suffix_lengths:
+            if len(word) > length + 1 and word[-length:] in self.suffixes:
+                return self.suffixes[word[-length:]]
+        return None
+
+
+class LocalNLP:
+    """Local NLP
+
+    An offline part of speech tagger that doesn't need any credentials or network
+    access. Each word is looked up in the lexicon of the language, a JSON file named
+    after the short code of the language (e.g. `pt.json`), then tagged by the
+    longest matching suffix in the lexicon, and by a few language independent rules.
+    Lexicons are loaded on first use and kept for the life of the process.
+
+    Tags are the Universal POS tags used by the other processors. Languages without
+    a lexicon are tagged by the language independent rules only.
+    """
+
+    lexicon_dir: Path
+    lexicons: dict[str, Lexicon]
+    lock: Lock
+    max_batch_size: int = 1000
+
+    def __init__(self: Self, lexicon_dir: Path) -> None:
+        self.lexicon_dir = lexicon_dir
+        self.lexicons = {}
+        self.lock = Lock()
+
+    def get_lexicon(self: Self, language: Language) -> Lexicon:
+        code = language.short_code.lower()
+
+        with self.lock:
+            if code not in self.lexicons:
+                path = self.lexicon_dir / f"{code}.json"
+                data = (
+                    json.loads(path.read_text(encoding="utf-8"))
+                    if path.exists()
+                    else {}
+                )
+                self.lexicons[code] = Lexicon(
+                    data.get("words", {}), data.get("suffixes", {})
+                )
+            return self.lexicons[code]
+
+    def tag(self: Self, token: str, sentence_start: bool, lexicon: Lexicon) -> str:
+        if token[0].isdigit():
+            return "NUM"
+
+        if len(token) == 1 and not token.isalnum():
+            category = unicodedata.category(token)
+            return "SYM" if category.startswith("S") else "PUNCT"
+
+        word = token.lower()
+        if word in lexicon.words:
+            return lexicon.words[word]
+
+        if token[0].isupper() and not sentence_start:
+            return "PROPN"
+
+        return lexicon.suffix_tag(word) or "NOUN"
+
+    def process(self: Self, text: str, language: Language) -> list[TextPiece]:
+        lexicon = self.get_lexicon(language)
+        text_pieces = []
+        sentence_start = True
+
+        for token in TOKEN_PATTERN.findall(text):
+            text_pieces.append(
+                TextPiece(
+                    text_item=token,
+                    pos_tag=self.tag(token, sentence_start, lexicon),
+                    language=language,
+                )
+            )
+            sentence_start = token in SENTENCE_END
+
+        return text_pieces
+
+    async def aprocess(self: Self, text: str, language: Language) -> list[TextPiece]:
+        return await run_in_provider_executor(self.process, text, language)
+
+    def process_many(
+        self: Self, texts: list[str], language: Language
+    ) -> list[list[TextPiece]]:
+        return [self.process(text, language) for text in texts]
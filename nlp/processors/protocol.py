@@ -4,4 +4,29 @@ from languages.models import Language
 
 
 class NLPProtocol(Protocol):
+    max_batch_size: int
+
     def process(self: Self, text: str, language: Language) -> Any: ...
+
+    async def aprocess(self: Self, text: str, language: Language) -> Any: ...
+
+    def process_many(
+        self: Self, texts: list[str], language: Language
+    ) -> list[Any | Exception]:
+        """Process many
+
+        Process up to `max_batch_size` texts in a single call to the provider and
+        return the result for each, or the error the provider reported for it, in the
+        same order as the texts.
+
+        This is optional. Providers without a multi-document API can leave it out
+        and `nlp.processors.process_in_batches` will fall back to calling `process`
+        for each text.
+
+        Args:
+            texts (list[str]): The texts to process
+            language (Language): The language of the texts
+
+        Returns:
+            list[Any | Exception]: The processed data for each text
+        """
@@ -1,4 +1,11 @@
-from rest_framework.serializers import CharField, ModelSerializer
+from django.conf import settings
+from rest_framework.serializers import (
+    CharField,
+    ChoiceField,
+    DateTimeField,
+    ListField,
+    ModelSerializer,
+)
 from rest_framework.serializers import Serializer as DRFSerializer
 
 from nlp.models import TextPiece
@@ -10,6 +17,38 @@ class Deserializer(DRFSerializer):
     processor = CharField(required=False)
 
 
+class BatchDeserializer(DRFSerializer):
+    texts_to_be_processed = ListField(
+        child=CharField(),
+        allow_empty=False,
+        max_length=settings.NLP_BATCH_MAX_TEXTS,
+    )
+    language_code = CharField(required=False)
+    processor = CharField(required=False)
+
+
+class ListFilterDeserializer(DRFSerializer):
+    language_code = CharField(required=False)
+    pos_tag = CharField(required=False)
+    created_after = DateTimeField(required=False)
+    created_before = DateTimeField(required=False)
+
+
+class ExportDeserializer(ListFilterDeserializer):
+    output = ChoiceField(choices=["ndjson", "csv"], default="ndjson")
+    compress = ChoiceField(choices=["gzip"], required=False)
+
+
+# The columns of an export and the field each one is read from
+EXPORT_FIELDS = {
+    "id": "id",
+    "text": "text",
+    "pos_tag": "pos_tag",
+    "language": "language__code",
+    "created_at": "created_at",
+}
+
+
 class Serializer(ModelSerializer):
     class Meta:
         model = TextPiece
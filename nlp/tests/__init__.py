@@ -0,0 +1,5 @@
+from nlp.tests.batch import BatchNLPTestCase
+from nlp.tests.managers import NLPManagerTestCase
+from nlp.tests.processors import LocalNLPTestCase
+
+__all__ = [BatchNLPTestCase, LocalNLPTestCase, NLPManagerTestCase]
@@ -0,0 +1,102 @@
+from typing import Self
+from unittest.mock import MagicMock, patch
+
+from django.test import TestCase
+
+from decyphr.exceptions import ProviderUnavailableException
+from languages.models import Language
+from nlp.cache import analysis_cache
+from nlp.entities import TextPiece
+from nlp.managers import NLPManager
+from nlp.models import Analysis
+from nlp.models import TextPiece as TextPieceModel
+from nlp.processors import AmazonNLP, process_in_batches
+from nlp.serializers import BatchDeserializer, Serializer
+
+
+class BatchNLPTestCase(TestCase):
+    def setUp(self: Self) -> None:
+        analysis_cache.clear()
+        self.language = Language.language_manager.create(
+            name="Brazilian Portuguese",
+            code="PT-BR",
+            short_code="PT",
+            description="Language spoken in Brazil",
+        )
+        self.manager = NLPManager(BatchDeserializer, Serializer)
+
+    def tokens(self: Self, text: str) -> list[TextPiece]:
+        return [TextPiece(word, "NOUN", self.language) for word in text.split()]
+
+    def test_process_in_batches(self: Self) -> None:
+        processor = AmazonNLP("key", "secret", "eu-west-1")
+        client = MagicMock()
+        client.batch_detect_syntax.side_effect = lambda TextList, LanguageCode: {
+            "ResultList": [
+                {
+                    "Index": index,
+                    "SyntaxTokens": [{"Text": text, "PartOfSpeech": {"Tag": "NOUN"}}],
+                }
+                for index, text in enumerate(TextList)
+                if text != "bad"
+            ],
+            "ErrorList": [
+                {"Index": index, "ErrorCode": "INVALID", "ErrorMessage": "Bad text"}
+                for index, text in enumerate(TextList)
+                if text == "bad"
+            ],
+        }
+
+        texts = [f"text {index}" for index in range(30)]
+        texts[27] = "bad"
+        with patch.object(processor, "initialise_client", return_value=client):
+            results = process_in_batches(processor, texts, self.language)
+
+        self.assertEqual(client.batch_detect_syntax.call_count, 2)
+        self.assertEqual(results[0][0].text_item, "text 0")
+        self.assertEqual(results[29][0].text_item, "text 29")
+        self.assertEqual(str(results[27]), "INVALID: Bad text")
+
+    @patch("nlp.managers.process_in_batches")
+    def test_create_new_processed_texts(self: Self, mock_process_in_batches) -> None:
+        mock_process_in_batches.side_effect = (
+            lambda processor, texts, language, **kwargs: [
+                ProviderUnavailableException("Too many requests are waiting.", 1)
+                if text == "Boa noite"
+                else self.tokens(text)
+                for text in texts
+            ]
+        )
+
+        results = self.manager.create_new_processed_texts(
+            {
+                "texts_to_be_processed": ["Bom dia", "Boa noite", "Olá", "Bom dia"],
+                "language_code": "pt",
+                "processor": "amazon",
+            }
+        )
+
+        self.assertEqual(
+            mock_process_in_batches.call_args.args[1], ["Bom dia", "Boa noite", "Olá"]
+        )
+        self.assertEqual(
+            [text_piece["text"] for text_piece in results[0]["text_pieces"]],
+            ["Bom", "dia"],
+        )
+        self.assertEqual(
+            results[1],
+            {"index": 1, "error": "Too many requests are waiting.", "retry_after": 1},
+        )
+        self.assertEqual(results[3]["text_pieces"], results[0]["text_pieces"])
+        self.assertEqual(Analysis.objects.count(), 2)
+        self.assertEqual(TextPieceModel.objects.count(), 3)
+
+        results = self.manager.create_new_processed_texts(
+            {
+                "texts_to_be_processed": ["Olá", "Boa noite"],
+                "language_code": "pt",
+                "processor": "amazon",
+            }
+        )
+        self.assertEqual(mock_process_in_batches.call_args.args[1], ["Boa noite"])
+        self.assertEqual(results[0]["text_pieces"][0]["text"], "Olá")
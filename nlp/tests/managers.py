@@ -0,0 +1,198 @@
+import tempfile
+from pathlib import Path
+from typing import Self
+from unittest.mock import MagicMock, patch
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from decyphr.localstore import LocalStore
+from decyphr.routing import Router
+from decyphr.text import content_hash
+from languages.models import Language
+from nlp.cache import AnalysisCache, analysis_cache
+from nlp.entities import ProcessorParams, TextPiece
+from nlp.managers import NLPManager
+from nlp.models import Analysis
+from nlp.models import TextPiece as TextPieceModel
+from nlp.models import TextPieceOccurrence
+from nlp.serializers import Deserializer, Serializer
+
+
+class NLPManagerTestCase(TestCase):
+    def setUp(self: Self) -> None:
+        analysis_cache.clear()
+        self.language = Language.language_manager.create(
+            name="Brazilian Portuguese",
+            code="PT-BR",
+            short_code="PT",
+            description="Language spoken in Brazil",
+        )
+        self.manager = NLPManager(Deserializer, Serializer)
+        self.processed_data = [
+            TextPiece("Olá", "INTJ", self.language),
+            TextPiece(",", "PUNCT", self.language),
+            TextPiece("olá", "INTJ", self.language),
+            TextPiece("Olá", "INTJ", self.language),
+        ]
+
+    def params(self: Self, text: str) -> ProcessorParams:
+        return ProcessorParams(
+            preferences=None, text=text, language_code="pt", processor="amazon"
+        )
+
+    def key(self: Self, text: str) -> tuple:
+        return analysis_cache.make_key("amazon", self.language, content_hash(text))
+
+    @override_settings(NLP_BULK_CREATE_BATCH_SIZE=2)
+    def test_create_db_instances(self: Self) -> None:
+        with CaptureQueriesContext(connection) as context:
+            text_pieces = self.manager._create_db_instances(
+                self.key("Olá, olá Olá"), self.processed_data
+            )
+
+        inserts = [
+            query
+            for query in context.captured_queries
+            if query["sql"].startswith('INSERT INTO "nlp_textpiece"')
+        ]
+        self.assertEqual(len(inserts), 2)
+        self.assertEqual(
+            [text_piece.text for text_piece in text_pieces], ["Olá", ",", "olá", "Olá"]
+        )
+        self.assertTrue(all(text_piece.pk for text_piece in text_pieces))
+        self.assertEqual(TextPieceModel.objects.count(), 4)
+        self.assertFalse(TextPieceOccurrence.objects.exists())
+
+        analysis_cache.clear()
+        self.assertEqual(analysis_cache.lookup(self.key("Olá, olá Olá")), text_pieces)
+
+    def test_text_pieces_round_trip_as_plain_data(self: Self) -> None:
+        text_piece = TextPiece("Olá", "INTJ", self.language)
+
+        data = text_piece.to_dict()
+
+        self.assertEqual(
+            data, {"text_item": "Olá", "pos_tag": "INTJ", "language": "PT-BR"}
+        )
+        self.assertEqual(TextPiece.from_dict(data), text_piece)
+
+    @override_settings(NLP_DEDUPLICATE_VOCABULARY=True)
+    def test_create_vocabulary_instances(self: Self) -> None:
+        self.manager._create_db_instances(self.key("Olá, olá Olá"), self.processed_data)
+        text_pieces = self.manager._create_db_instances(
+            self.key("Olá, olá Olá!"), self.processed_data
+        )
+
+        self.assertEqual(
+            [text_piece.text for text_piece in text_pieces], ["Olá", ",", "olá", "Olá"]
+        )
+        self.assertEqual(text_pieces[0].pk, text_pieces[3].pk)
+        self.assertEqual(TextPieceModel.objects.count(), 3)
+        self.assertEqual(TextPieceOccurrence.objects.count(), 8)
+
+    @patch("nlp.managers.get_processor")
+    def test_analysis_cache(self: Self, mock_get_processor) -> None:
+        mock_get_processor.return_value.process.return_value = self.processed_data
+
+        first = self.manager._process(self.params("Olá, olá Olá"))
+        analysis_cache.clear()
+        params = self.params(" Olá,  olá Olá ")
+        with self.assertNumQueries(1):
+            second = self.manager._process(params)
+        third = self.manager._process(self.params("Olá, olá Olá"))
+
+        mock_get_processor.return_value.process.assert_called_once()
+        self.assertEqual(first, second)
+        self.assertEqual(first, third)
+        self.assertEqual(analysis_cache.stats()["memory_hits"], 1)
+
+        self.assertEqual(analysis_cache.invalidate("amazon"), 1)
+        self.assertFalse(Analysis.objects.exists())
+        self.manager._process(self.params("Olá, olá Olá"))
+        self.assertEqual(mock_get_processor.return_value.process.call_count, 2)
+
+    def test_analysis_cache_invalidated_by_another_process(self: Self) -> None:
+        key = self.key("Olá")
+        with tempfile.TemporaryDirectory() as directory:
+            store = LocalStore(Path(directory) / "test.sqlite3")
+            cache = AnalysisCache(max_size=10, ttl=60, store=store, check_interval=0)
+            other_process = AnalysisCache(max_size=10, ttl=60, store=store)
+            cache.store(key, [])
+            self.assertEqual(cache.lookup_cache(key), [])
+
+            other_process.invalidate("google")
+            self.assertEqual(cache.lookup_cache(key), [])
+
+            other_process.invalidate("amazon")
+            self.assertIsNone(cache.lookup_cache(key))
+
+    def test_version_stamp_checked_at_most_every_interval(self: Self) -> None:
+        key = self.key("Olá")
+        cache = AnalysisCache(max_size=10, ttl=60)
+        cache.store(key, [])
+
+        with patch("nlp.cache.VersionStamp.get", return_value=0) as get:
+            for _ in range(3):
+                self.assertEqual(cache.lookup_cache(key), [])
+
+        get.assert_not_called()
+
+    def test_empty_analyses_are_hits(self: Self) -> None:
+        key = self.key("...")
+        self.manager._create_db_instances(key, [])
+        analysis_cache.clear()
+
+        self.assertEqual(analysis_cache.lookup(key), [])
+        analysis_cache.clear()
+        self.assertEqual(analysis_cache.lookup_many([key]), {key: []})
+        self.assertEqual(analysis_cache.lookup_cache(key), [])
+        self.assertEqual(analysis_cache.stats()["misses"], 0)
+
+    @patch("nlp.managers.get_processor")
+    async def test_async_view(self: Self, mock_get_processor) -> None:
+        mock_get_processor.return_value.process.return_value = self.processed_data
+        data = {
+            "text_to_be_processed": "Olá, olá Olá",
+            "language_code": "pt",
+            "processor": "amazon",
+        }
+
+        for _ in range(2):
+            response = await self.async_client.post(
+                "/nlp/async/", data, content_type="application/json"
+            )
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual(
+                [text_piece["text"] for text_piece in response.json()],
+                ["Olá", ",", "olá", "Olá"],
+            )
+
+        mock_get_processor.return_value.process.assert_called_once()
+        self.assertEqual(await Analysis.objects.acount(), 1)
+
+    @override_settings(PROVIDER_ROUTING=True)
+    @patch("nlp.managers.router", Router())
+    @patch("nlp.managers.get_processor")
+    async def test_async_view_is_routed(self: Self, mock_get_processor) -> None:
+        failing, working = MagicMock(), MagicMock()
+        failing.process.side_effect = ValueError("Throttled")
+        working.process.return_value = self.processed_data
+        mock_get_processor.side_effect = lambda name: (
+            failing if name == "amazon" else working
+        )
+
+        response = await self.async_client.post(
+            "/nlp/async/",
+            {
+                "text_to_be_processed": "Olá",
+                "language_code": "pt",
+                "processor": "amazon",
+            },
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, 201)
+        failing.process.assert_called_once()
+        working.process.assert_called_once()
@@ -0,0 +1,77 @@
+from threading import current_thread
+from typing import Self
+from unittest.mock import patch
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from languages.models import Language
+from nlp.processors import LocalNLP
+
+
+class LocalNLPTestCase(SimpleTestCase):
+    def setUp(self: Self) -> None:
+        self.processor = LocalNLP(settings.NLP_LOCAL_LEXICON_DIR)
+
+    def tag(self: Self, text: str, short_code: str) -> list[tuple[str, str]]:
+        return [
+            (text_piece.text_item, text_piece.pos_tag)
+            for text_piece in self.processor.process(
+                text, Language(code=short_code, short_code=short_code)
+            )
+        ]
+
+    def test_process(self: Self) -> None:
+        self.assertEqual(
+            self.tag("Olá, aí! Como você está hoje?", "PT"),
+            [
+                ("Olá", "INTJ"),
+                (",", "PUNCT"),
+                ("aí", "ADV"),
+                ("!", "PUNCT"),
+                ("Como", "ADV"),
+                ("você", "PRON"),
+                ("está", "AUX"),
+                ("hoje", "ADV"),
+                ("?", "PUNCT"),
+            ],
+        )
+
+    def test_rules(self: Self) -> None:
+        self.assertEqual(
+            self.tag("She quickly visited Dublin in 2024 for €30.", "EN"),
+            [
+                ("She", "PRON"),
+                ("quickly", "ADV"),
+                ("visited", "VERB"),
+                ("Dublin", "PROPN"),
+                ("in", "ADP"),
+                ("2024", "NUM"),
+                ("for", "ADP"),
+                ("€", "SYM"),
+                ("30", "NUM"),
+                (".", "PUNCT"),
+            ],
+        )
+
+    def test_language_without_lexicon(self: Self) -> None:
+        self.assertEqual(
+            self.tag("Hallo, Welt", "XX"),
+            [("Hallo", "NOUN"), (",", "PUNCT"), ("Welt", "PROPN")],
+        )
+
+    async def test_aprocess_runs_off_the_event_loop(self: Self) -> None:
+        threads = []
+        process = self.processor.process
+
+        def record_thread(text: str, language: Language) -> list:
+            threads.append(current_thread())
+            return process(text, language)
+
+        with patch.object(self.processor, "process", side_effect=record_thread):
+            text_pieces = await self.processor.aprocess(
+                "Olá", Language(code="PT", short_code="PT")
+            )
+
+        self.assertEqual(text_pieces[0].pos_tag, "INTJ")
+        self.assertNotEqual(threads, [current_thread()])
@@ -1,22 +1,42 @@
 # type: ignore
+import json
 from typing import Self
 
-from django.http import Http404
+from django.http import Http404, HttpRequest, JsonResponse, StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 from rest_framework import status
+from rest_framework.decorators import action
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
+from decyphr.errors import json_error_response
+from decyphr.exceptions import DeadlineExceededException, ProviderUnavailableException
+from decyphr.pagination import KeysetPagination
+from idempotency.keys import idempotent
+from jobs.views import submit_job
 from nlp.exceptions import NLPValidationException
 from nlp.managers import NLPManager
 from nlp.models import TextPiece
-from nlp.serializers import Deserializer, Serializer
+from nlp.serializers import (
+    BatchDeserializer,
+    Deserializer,
+    ExportDeserializer,
+    ListFilterDeserializer,
+    Serializer,
+)
 
 
 class NLPViewSet(ModelViewSet):
     queryset = TextPiece.objects.all()
     deserializer_class = Deserializer
+    batch_deserializer_class = BatchDeserializer
+    list_filter_deserializer_class = ListFilterDeserializer
+    export_deserializer_class = ExportDeserializer
     serializer_class = Serializer
+    pagination_class = KeysetPagination
     manager = NLPManager
 
     def _get_object(self: Self, pk: int) -> TextPiece:
@@ -61,6 +81,7 @@ class NLPViewSet(ModelViewSet):
         """
         return Response(self.serializer_class(self._get_object(pk)).data)
 
+    @idempotent("nlp")
     def create(self: Self, request: Request) -> Response:
         """Create
 
@@ -68,6 +89,18 @@ class NLPViewSet(ModelViewSet):
         processed and will return a breakdown of the text and the corresponding part of
         speech tags
 
+        Requests are `interactive` unless the `X-Priority: bulk` header, or an API
+        key in `PRIORITY_API_KEYS`, says otherwise. Bulk requests queue behind
+        interactive ones for the provider
+
+        The `X-Request-Timeout` header sets how many seconds the client will wait,
+        overriding the default for the endpoint. Work that can't finish in time is
+        abandoned
+
+        Requests with an `Idempotency-Key` header are safe to retry: a retry with the
+        same key gets the first response back, flagged with the
+        `Idempotent-Replayed` header, rather than processing the text again
+
         Args:
             request.data (dict[str, str]):
                 text_to_be_processed (str): The text to be processed
@@ -77,6 +110,11 @@ class NLPViewSet(ModelViewSet):
         Returns:
             Response: 201 if the request completes successfully
             Response: 400 if the data cannot be validated
+            Response: 503 if no processor is available right now
+            Response: 504 if the request's deadline passed, naming the stage
+            Response: 409 if a request with the same `Idempotency-Key` is still
+                running
+            Response: 422 if the `Idempotency-Key` was used for a different request
 
         Example Usage:
             echo '{
@@ -148,57 +186,214 @@ class NLPViewSet(ModelViewSet):
 
         return Response(text_pieces.data, status=status.HTTP_201_CREATED)
 
-    def list(self: Self, request: Request) -> Response:
-        """List
+    @action(detail=False, methods=["post"])
+    def batch(self: Self, request: Request) -> Response:
+        """Batch
 
-        Gets a full list of all TextPieces in the DB
+        Accepts a list of texts and the associated language code. Each of the texts
+        will be processed, using as few calls to the NLP provider as possible, and
+        the breakdown of each text is returned in the same order as the texts were
+        provided
+
+        Args:
+            request.data (dict):
+                texts_to_be_processed (list[str]): The texts to be processed
+                language_code (str): The ISO representation of the language of the
+                    texts
+                processor (str): The name of the processor to be used
 
         Returns:
-            Response: 200 with all TextPiece records if successful
+            Response: 201 if every text was processed successfully
+            Response: 207 if some of the texts could not be processed
+            Response: 400 if the data cannot be validated
+            Response: 503 if the processor is busy
+            Response: 504 if the request's deadline passed, naming the stage
 
         Example Usage:
-            http GET http://127.0.0.1:8000/nlp/
+            echo '{
+                "texts_to_be_processed": ["Olá, aí!", "Como você está hoje?"],
+                "language_code": "pt",
+                "processor": "amazon"
+            }' |  \
+            http POST http://127.0.0.1:8000/nlp/batch/ \
+            Content-Type:application/json
 
         Example Response:
             [
                 {
-                    "id": 1,
-                    "text": "Olá",
-                    "pos_tag": "VERB"
-                },
-                {
-                    "id": 2,
-                    "text": ",",
-                    "pos_tag": "PUNCT"
+                    "index": 0,
+                    "text_pieces": [
+                        {
+                            "id": 28,
+                            "text": "Olá",
+                            "pos_tag": "VERB"
+                        },
+                        {
+                            "id": 29,
+                            "text": ",",
+                            "pos_tag": "PUNCT"
+                        },
+                        {
+                            "id": 30,
+                            "text": "aí",
+                            "pos_tag": "ADV"
+                        },
+                        {
+                            "id": 31,
+                            "text": "!",
+                            "pos_tag": "PUNCT"
+                        }
+                    ]
                 },
                 {
-                    "id": 3,
-                    "text": "aí",
-                    "pos_tag": "ADV"
-                },
-                {
-                    "id": 4,
-                    "text": "!",
-                    "pos_tag": "PUNCT"
-                },
-                {
-                    "id": 5,
-                    "text": "Como",
-                    "pos_tag": "ADV"
-                },
-                {
-                    "id": 6,
-                    "text": "você",
-                    "pos_tag": "PRON"
-                },
-                {
-                    "id": 7,
-                    "text": "está",
-                    "pos_tag": "VERB"
-                },
+                    "index": 1,
+                    "error": "ThrottlingException: Rate exceeded"
+                }
             ]
         """
-        return Response(self.get_serializer(self.queryset, many=True).data)
+        manager = self.manager(
+            deserializer=self.batch_deserializer_class,
+            serializer=self.serializer_class,
+        )
+
+        try:
+            results = manager.create_new_processed_texts(request_data=request.data)
+        except NLPValidationException as e:
+            return Response(e.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        if any("error" in result for result in results):
+            return Response(results, status=status.HTTP_207_MULTI_STATUS)
+        return Response(results, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=["post"])
+    def jobs(self: Self, request: Request) -> Response:
+        """Jobs
+
+        Accepts the same data as `create`, for documents too long to be processed
+        within a request. The document is processed in the background by the
+        `run_jobs` workers, and the job is returned straight away so that the client
+        can poll `/jobs/<id>/` for its progress and, once it is done, the text pieces
+
+        Returns:
+            Response: 202 with the queued job
+            Response: 400 if the data cannot be validated
+
+        Example Usage:
+            echo '{
+                "text_to_be_processed": "Olá, aí! ...",
+                "language_code": "pt"
+            }' |  \
+            http POST http://127.0.0.1:8000/nlp/jobs/ \
+            Content-Type:application/json
+
+        Example Response:
+            {
+                "id": 4,
+                "kind": "nlp",
+                "status": "queued",
+                "chunks_done": 0,
+                "chunks_total": 3,
+                ...
+            }
+        """
+        return submit_job("nlp", request)
+
+    def list(self: Self, request: Request) -> Response:
+        """List
+
+        Gets a page of the TextPieces in the DB, newest first. Follow the `next` link
+        to get the next page.
+
+        Args:
+            request.query_params (dict[str, str]):
+                language_code (str): Only list text pieces in this language
+                pos_tag (str): Only list text pieces with this part of speech tag
+                created_after (str): Only list text pieces created at or after this
+                    ISO 8601 date/time
+                created_before (str): Only list text pieces created before this
+                    ISO 8601 date/time
+                page_size (int): The number of text pieces per page, up to 1000
+                cursor (str): The position of the page, taken from a `next` or
+                    `previous` link
+
+        Returns:
+            Response: 200 with a page of TextPiece records if successful
+            Response: 400 if the filters cannot be validated
+
+        Example Usage:
+            http GET "http://127.0.0.1:8000/nlp/?language_code=pt&pos_tag=ADV"
+
+        Example Response:
+            {
+                "next": "http://127.0.0.1:8000/nlp/?cursor=cD0z&language_code=pt&pos_tag=ADV",
+                "previous": null,
+                "results": [
+                    {
+                        "id": 35,
+                        "text": "hoje",
+                        "pos_tag": "ADV",
+                        "created_at": "2024-04-12T10:00:00Z",
+                        "language": 2
+                    },
+                    {
+                        "id": 32,
+                        "text": "Como",
+                        "pos_tag": "ADV",
+                        "created_at": "2024-04-12T10:00:00Z",
+                        "language": 2
+                    }
+                ]
+            }
+        """
+        manager = self.manager(
+            deserializer=self.list_filter_deserializer_class,
+            serializer=self.serializer_class,
+        )
+
+        try:
+            queryset = manager.filter_text_pieces(self.queryset, request.query_params)
+        except NLPValidationException as e:
+            return Response(e.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+    @action(detail=False, methods=["get"])
+    def export(self: Self, request: Request) -> StreamingHttpResponse | Response:
+        """Export
+
+        Streams every TextPiece matching the filters, oldest first, as the rows are
+        read from the DB. Use this rather than paging through the list to pull the
+        whole table.
+
+        Args:
+            request.query_params (dict[str, str]):
+                output (str): `ndjson` (the default) for one JSON object per line,
+                    or `csv`
+                compress (str): `gzip` to compress the export
+                language_code, pos_tag, created_after, created_before: See `list`
+
+        Returns:
+            StreamingHttpResponse: 200 with the export
+            Response: 400 if the query params cannot be validated
+
+        Example Usage:
+            http --download GET "http://127.0.0.1:8000/nlp/export/?output=csv"
+
+        Example Response:
+            id,text,pos_tag,language,created_at
+            28,Olá,VERB,PT-BR,2024-04-12 10:00:00+00:00
+            29,",",PUNCT,PT-BR,2024-04-12 10:00:00+00:00
+        """
+        manager = self.manager(
+            deserializer=self.export_deserializer_class,
+            serializer=self.serializer_class,
+        )
+
+        try:
+            return manager.export_text_pieces(self.queryset, request.query_params)
+        except NLPValidationException as e:
+            return Response(e.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def delete(self: Self, request: Request, pk: int) -> Response:
         """Delete
@@ -216,3 +411,55 @@ class NLPViewSet(ModelViewSet):
         """
         self._get_object(pk).delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncNLPView(View):
+    deserializer_class = Deserializer
+    serializer_class = Serializer
+    manager = NLPManager
+
+    async def post(self: Self, request: HttpRequest) -> JsonResponse:
+        """Post
+
+        Async equivalent of `NLPViewSet.create`. When served over ASGI the request
+        does not hold a thread while waiting on the NLP provider.
+
+        Args:
+            request.body (dict[str, str]): See `NLPViewSet.create`
+
+        Returns:
+            JsonResponse: 201 if the request completes successfully
+            JsonResponse: 400 if the data cannot be validated
+            JsonResponse: 503 if the processor is busy
+            JsonResponse: 504 if the request's deadline passed, naming the stage
+
+        Example Usage:
+            echo '{
+                "text_to_be_processed": "Olá, aí! Como você está hoje?",
+                "language_code": "pt",
+                "processor": "amazon"
+            }' |  \
+            http POST http://127.0.0.1:8000/nlp/async/ \
+            Content-Type:application/json
+        """
+        try:
+            request_data = json.loads(request.body)
+        except ValueError:
+            return JsonResponse({"detail": "JSON parse error"}, status=400)
+
+        manager = self.manager(
+            deserializer=self.deserializer_class,
+            serializer=self.serializer_class,
+        )
+
+        try:
+            text_pieces = await manager.acreate_new_processed_text(
+                request_data=request_data
+            )
+        except NLPValidationException as e:
+            return JsonResponse(e.errors, status=400)
+        except (ProviderUnavailableException, DeadlineExceededException) as e:
+            return json_error_response(e)
+
+        return JsonResponse(text_pieces.data, status=201, safe=False)
@@ -1,6 +1,11 @@
+from typing import Self
+
 from django.apps import AppConfig
 
 
 class PreferencesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "preferences"
+
+    def ready(self: Self) -> None:
+        from preferences import snapshot  # noqa: F401
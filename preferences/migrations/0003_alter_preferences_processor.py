@@ -0,0 +1,24 @@
+# Generated by Django 5.0.3 on 2026-10-17 19:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("preferences", "0002_alter_preferences_translator"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="preferences",
+            name="processor",
+            field=models.CharField(
+                choices=[
+                    ("amazon", "Amazon"),
+                    ("google", "Google"),
+                    ("local", "Local"),
+                ],
+                max_length=255,
+            ),
+        ),
+    ]
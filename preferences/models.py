@@ -11,6 +11,7 @@ SUPPORTED_TRANSLATORS = (
 SUPPORTED_NLP_PROCESSORS = (
     ("amazon", "Amazon"),
     ("google", "Google"),
+    ("local", "Local"),
 )
 
 
@@ -0,0 +1,104 @@
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Self
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from decyphr.versions import VersionStamp
+from languages.models import Language
+from preferences.models import Preferences
+
+
+@dataclass(frozen=True)
+class PreferencesSnapshot:
+    translator: str
+    processor: str
+    source_lang: Language
+    target_lang: Language
+
+
+class PreferencesCache:
+    """Preferences Cache
+
+    Holds an immutable snapshot of the preferences, with their languages, so that
+    requests don't query the DB for them. The snapshot is loaded on first use and
+    reloaded after the preferences, or a language, are saved or deleted in this
+    process or in any other process on the host.
+    """
+
+    snapshot: PreferencesSnapshot | None
+    version: int | None
+    lock: Lock
+    stamp: VersionStamp
+
+    def __init__(self: Self, stamp: VersionStamp) -> None:
+        self.snapshot = None
+        self.version = None
+        self.lock = Lock()
+        self.stamp = stamp
+
+    def is_current(self: Self) -> bool:
+        return self.version is not None and self.version == self.stamp.get()
+
+    def load(self: Self) -> PreferencesSnapshot | None:
+        with self.lock:
+            if not self.is_current():
+                version = self.stamp.get()
+                preferences = Preferences.objects.select_related(
+                    "source_lang", "target_lang"
+                ).first()
+                self.snapshot = (
+                    PreferencesSnapshot(
+                        translator=preferences.translator,
+                        processor=preferences.processor,
+                        source_lang=preferences.source_lang,
+                        target_lang=preferences.target_lang,
+                    )
+                    if preferences
+                    else None
+                )
+                self.version = version
+            return self.snapshot
+
+    def get(self: Self) -> PreferencesSnapshot | None:
+        """Get
+
+        Returns:
+            PreferencesSnapshot | None: The current preferences, or `None` if they
+                haven't been set up
+        """
+        if self.is_current():
+            return self.snapshot
+        return self.load()
+
+    async def aget(self: Self) -> PreferencesSnapshot | None:
+        """Get
+
+        Async equivalent of `get`
+        """
+        if self.is_current():
+            return self.snapshot
+        return await sync_to_async(self.load)()
+
+    def invalidate(self: Self, **kwargs: Any) -> None:
+        """Invalidate
+
+        Drop the snapshot of this process, and tell the other processes to drop
+        theirs both now and once the change has been committed
+        """
+        self.version = None
+        self.stamp.bump()
+        transaction.on_commit(self.stamp.bump)
+
+
+preferences_cache = PreferencesCache(VersionStamp("preferences"))
+
+for sender in (Preferences, Language):
+    post_save.connect(
+        preferences_cache.invalidate, sender=sender, dispatch_uid="preferences_cache"
+    )
+    post_delete.connect(
+        preferences_cache.invalidate, sender=sender, dispatch_uid="preferences_cache"
+    )
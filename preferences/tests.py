@@ -0,0 +1,37 @@
+from typing import Self
+
+from django.test import TestCase
+
+from languages.models import Language
+from preferences.models import Preferences
+from preferences.snapshot import preferences_cache
+
+
+class PreferencesCacheTestCase(TestCase):
+    def setUp(self: Self) -> None:
+        self.language = Language.language_manager.create(
+            name="Brazilian Portuguese",
+            code="PT-BR",
+            short_code="PT",
+            description="Language spoken in Brazil",
+        )
+        self.preferences = Preferences.objects.create(
+            translator="deepl",
+            processor="amazon",
+            source_lang=self.language,
+            target_lang=self.language,
+        )
+
+    def test_get(self: Self) -> None:
+        self.assertEqual(preferences_cache.get().translator, "deepl")
+        with self.assertNumQueries(0):
+            snapshot = preferences_cache.get()
+            self.assertEqual(snapshot.target_lang, self.language)
+            self.assertEqual(snapshot.processor, "amazon")
+
+    def test_reloaded_after_save(self: Self) -> None:
+        preferences_cache.get()
+        self.preferences.translator = "google"
+        self.preferences.save()
+
+        self.assertEqual(preferences_cache.get().translator, "google")
@@ -1,5 +1,80 @@
-from django.contrib import admin
+from pathlib import Path
+from typing import Self
+from xml.etree.ElementTree import ParseError
+
+from django import forms
+from django.conf import settings
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.core.files.uploadedfile import UploadedFile
+from django.http import HttpRequest, HttpResponse, HttpResponseRedirect
+from django.template.response import TemplateResponse
+from django.urls import URLPattern, path, reverse
+
+from preferences.models import SUPPORTED_TRANSLATORS
+from translate.importer import FORMATS, TranslationImporter, read_units
 
 from .models import Translation
 
-admin.site.register(Translation)
+
+class ImportForm(forms.Form):
+    file = forms.FileField(help_text="A TMX, TSV or CSV translation memory")
+    translator = forms.ChoiceField(
+        choices=SUPPORTED_TRANSLATORS,
+        help_text="The translator to store rows that don't name one under",
+    )
+
+    def clean_file(self: Self) -> UploadedFile:
+        file = self.cleaned_data["file"]
+        if Path(file.name).suffix.lstrip(".").lower() not in FORMATS:
+            raise forms.ValidationError("Upload a .tmx, .tsv or .csv file")
+        return file
+
+
+@admin.register(Translation)
+class TranslationAdmin(admin.ModelAdmin):
+    change_list_template = "admin/translate/translation/change_list.html"
+
+    def get_urls(self: Self) -> list[URLPattern]:
+        return [
+            path(
+                "import/",
+                self.admin_site.admin_view(self.import_view),
+                name="translate_translation_import",
+            ),
+            *super().get_urls(),
+        ]
+
+    def import_view(self: Self, request: HttpRequest) -> HttpResponse:
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+
+        form = ImportForm(request.POST or None, request.FILES or None)
+        if request.method == "POST" and form.is_valid():
+            file = form.cleaned_data["file"]
+            importer = TranslationImporter(
+                form.cleaned_data["translator"],
+                settings.TRANSLATION_IMPORT_BATCH_SIZE,
+            )
+            try:
+                report = importer.run(
+                    read_units(file, Path(file.name).suffix.lstrip(".").lower())
+                )
+            except (ValueError, ParseError) as error:
+                self.message_user(request, str(error), messages.ERROR)
+            else:
+                self.message_user(request, str(report), messages.SUCCESS)
+                return HttpResponseRedirect(
+                    reverse("admin:translate_translation_changelist")
+                )
+
+        return TemplateResponse(
+            request,
+            "admin/translate/translation/import.html",
+            {
+                **self.admin_site.each_context(request),
+                "opts": self.model._meta,
+                "title": "Import translations",
+                "form": form,
+            },
+        )
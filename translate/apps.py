@@ -1,6 +1,11 @@
+from typing import Self
+
 from django.apps import AppConfig
 
 
 class TranslateConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "translate"
+
+    def ready(self: Self) -> None:
+        from translate import fuzzy, jobs  # noqa: F401
@@ -0,0 +1,210 @@
+import time
+from threading import Event, Lock
+from typing import Any, Hashable, Self
+
+from django.conf import settings
+
+from decyphr import deadlines, stats
+from decyphr.exceptions import DeadlineExceededException
+from languages.models import Language
+from translate.translators import translate_chunk
+from translate.translators.protocol import TranslatorProtocol
+
+
+class Batch:
+    translator: TranslatorProtocol
+    target_lang: Language
+    source_lang: Language | None
+    admission_name: str | None
+    texts: list[str]
+    queued_at: list[float]
+    characters: int
+    results: list[str | Exception]
+    full: Event
+    done: Event
+
+    def __init__(
+        self: Self,
+        translator: TranslatorProtocol,
+        target_lang: Language,
+        source_lang: Language | None,
+        admission_name: str | None = None,
+    ) -> None:
+        self.translator = translator
+        self.target_lang = target_lang
+        self.source_lang = source_lang
+        self.admission_name = admission_name
+        self.texts = []
+        self.queued_at = []
+        self.characters = 0
+        self.results = []
+        self.full = Event()
+        self.done = Event()
+
+    def fits(self: Self, text: str) -> bool:
+        return not self.texts or (
+            len(self.texts) < self.translator.max_batch_size
+            and self.characters + len(text) <= self.translator.max_batch_characters
+        )
+
+    def is_full(self: Self) -> bool:
+        return (
+            len(self.texts) >= self.translator.max_batch_size
+            or self.characters >= self.translator.max_batch_characters
+        )
+
+    def add(self: Self, text: str) -> int:
+        self.texts.append(text)
+        self.queued_at.append(time.monotonic())
+        self.characters += len(text)
+        return len(self.texts) - 1
+
+
+class MicroBatcher:
+    """Micro Batcher
+
+    Merges single-text translations requested concurrently for the same translator
+    and language pair into one call to the provider's multi-text API. The first
+    request to arrive opens a batch and waits up to `window` seconds, or until the
+    batch reaches the provider's batch limits, for other requests to join it. It
+    then makes the call and hands each waiting request its own translation. Only
+    that call is admitted, so a batch holds a single slot for its provider.
+    """
+
+    batches: dict[Hashable, Batch]
+    lock: Lock
+    window: float
+    calls: int
+    texts: int
+    max_batch_size: int
+    queue_delay: float
+    max_queue_delay: float
+
+    def __init__(self: Self, window: float) -> None:
+        self.batches = {}
+        self.lock = Lock()
+        self.window = window
+        self.calls = 0
+        self.texts = 0
+        self.max_batch_size = 0
+        self.queue_delay = 0.0
+        self.max_queue_delay = 0.0
+
+    def translate(
+        self: Self,
+        translator_name: str,
+        translator: TranslatorProtocol,
+        text: str,
+        target_lang: Language,
+        source_lang: Language | None = None,
+        admission_name: str | None = None,
+    ) -> str:
+        """Translate
+
+        Args:
+            translator_name (str): The name of the translator
+            translator (TranslatorProtocol): The translator, which must implement
+                `get_translated_texts`
+            text (str): The text to translate
+            target_lang (Language): The language to translate to
+            source_lang (Language): The language to translate from
+            admission_name (str): The name the provider call is admitted under,
+                e.g. `translate.deepl`
+
+        Returns:
+            str: The translated text
+
+        Raises:
+            The error raised by the provider call the text was part of, unless it
+            ran out of the time the request that made it had and this request has
+            time left, in which case the text is translated again
+        """
+        key = (translator_name, source_lang.id if source_lang else None, target_lang.id)
+
+        while True:
+            with self.lock:
+                batch = self.batches.get(key)
+                if batch is not None and not batch.fits(text):
+                    del self.batches[key]
+                    batch.full.set()
+                    batch = None
+
+                leader = batch is None
+                if leader:
+                    batch = self.batches[key] = Batch(
+                        translator, target_lang, source_lang, admission_name
+                    )
+                index = batch.add(text)
+                # A batch at the provider's limits goes straight away rather than
+                # waiting out the window for texts that can't join it
+                if batch.is_full():
+                    del self.batches[key]
+                    batch.full.set()
+
+            if leader:
+                batch.full.wait(self.window)
+                with self.lock:
+                    if self.batches.get(key) is batch:
+                        del self.batches[key]
+                self.flush(batch)
+            elif not batch.done.wait(deadlines.remaining()):
+                raise DeadlineExceededException("micro_batch")
+
+            result = batch.results[index]
+            # The call ran out of the leader's time, which may not be up for this
+            # request, so it gets another batch of its own
+            if not leader and isinstance(result, DeadlineExceededException):
+                deadlines.check("micro_batch")
+                continue
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+    def flush(self: Self, batch: Batch) -> None:
+        started = time.monotonic()
+        delays = [started - queued_at for queued_at in batch.queued_at]
+
+        with self.lock:
+            self.calls += 1
+            self.texts += len(batch.texts)
+            self.max_batch_size = max(self.max_batch_size, len(batch.texts))
+            self.queue_delay += sum(delays)
+            self.max_queue_delay = max(self.max_queue_delay, *delays)
+
+        try:
+            batch.results = translate_chunk(
+                batch.translator,
+                batch.target_lang,
+                batch.source_lang,
+                batch.texts,
+                admission_name=batch.admission_name,
+            )
+        finally:
+            batch.done.set()
+
+    def stats(self: Self) -> dict[str, Any]:
+        """Stats
+
+        Returns:
+            dict[str, Any]: The number of provider calls made, the number of texts
+                they translated, the batch sizes and the queueing delay added, in
+                milliseconds
+        """
+        with self.lock:
+            return {
+                "calls": self.calls,
+                "texts": self.texts,
+                "mean_batch_size": round(self.texts / self.calls, 2)
+                if self.calls
+                else 0,
+                "max_batch_size": self.max_batch_size,
+                "mean_queue_delay_ms": round(self.queue_delay / self.texts * 1000, 2)
+                if self.texts
+                else 0,
+                "max_queue_delay_ms": round(self.max_queue_delay * 1000, 2),
+            }
+
+
+micro_batcher = MicroBatcher(window=settings.TRANSLATION_MICRO_BATCH_WINDOW / 1000)
+
+stats.register("micro_batching", micro_batcher.stats)
@@ -2,7 +2,9 @@ from dataclasses import dataclass
 from typing import Self
 
 from languages.models import Language
-from preferences.models import Preferences
+from languages.registry import language_registry
+from preferences.snapshot import PreferencesSnapshot
+from translate.fuzzy import FuzzyMatch
 
 
 @dataclass(init=False)
@@ -11,32 +13,90 @@ class TranslatorParams:
     source_language: Language
     target_language: Language
     text: str
+    segment: bool
+    fuzzy_match: FuzzyMatch | None
 
     def __init__(
         self: Self,
-        preferences: Preferences,
+        preferences: PreferencesSnapshot,
         text: str,
         translator: str | None,
         source_language_code: str | None,
         target_language_code: str | None,
+        segment: bool = False,
     ) -> None:
         self.text = text
+        self.segment = segment
+        self.fuzzy_match = None
         self.translator = translator if translator else preferences.translator
 
         if source_language_code:
-            self.source_language = (
-                Language.language_manager.get_by_long_code_or_short_code(
-                    source_language_code,
-                )
-            )
+            self.source_language = language_registry.get(source_language_code)
         else:
             self.source_language = preferences.source_lang
 
         if target_language_code:
-            self.target_language = (
-                Language.language_manager.get_by_long_code_or_short_code(
-                    target_language_code,
-                )
-            )
+            self.target_language = language_registry.get(target_language_code)
+        else:
+            self.target_language = preferences.target_lang
+
+    @classmethod
+    async def acreate(
+        cls: type[Self],
+        preferences: PreferencesSnapshot,
+        text: str,
+        translator: str | None,
+        source_language_code: str | None,
+        target_language_code: str | None,
+        segment: bool = False,
+    ) -> Self:
+        """Create
+
+        Async equivalent of the constructor, for use by the async views
+        """
+        params = cls.__new__(cls)
+        params.text = text
+        params.segment = segment
+        params.fuzzy_match = None
+        params.translator = translator if translator else preferences.translator
+
+        if source_language_code:
+            params.source_language = await language_registry.aget(source_language_code)
+        else:
+            params.source_language = preferences.source_lang
+
+        if target_language_code:
+            params.target_language = await language_registry.aget(target_language_code)
+        else:
+            params.target_language = preferences.target_lang
+
+        return params
+
+
+@dataclass(init=False)
+class BatchTranslatorParams:
+    translator: str
+    source_language: Language
+    target_language: Language
+    texts: list[str]
+
+    def __init__(
+        self: Self,
+        preferences: PreferencesSnapshot,
+        texts: list[str],
+        translator: str | None,
+        source_language_code: str | None,
+        target_language_code: str | None,
+    ) -> None:
+        self.texts = texts
+        self.translator = translator if translator else preferences.translator
+
+        if source_language_code:
+            self.source_language = language_registry.get(source_language_code)
+        else:
+            self.source_language = preferences.source_lang
+
+        if target_language_code:
+            self.target_language = language_registry.get(target_language_code)
         else:
             self.target_language = preferences.target_lang
@@ -0,0 +1,353 @@
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass
+from functools import partial
+from hashlib import blake2b
+from threading import Lock
+from typing import Any, Self
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from decyphr import stats
+from decyphr.text import normalise_text
+from languages.models import Language
+from translate.models import Translation
+
+SHINGLE_SIZE = 3
+
+# The signature of a text is made of BANDS * ROWS min hashes. Texts that agree on
+# every hash of at least one band are compared. With 10 bands of 3 rows, texts with
+# a similarity of 0.7 are compared 98% of the time, and texts with a similarity of
+# 0.3 only 24% of the time
+BANDS = 10
+ROWS = 3
+
+# Each min hash is taken over the hashes of the shingles XORed with a random mask,
+# which is far cheaper than a universal hash in Python
+PERMUTATIONS = [random.Random(seed).getrandbits(64) for seed in range(BANDS * ROWS)]
+
+# Longer texts are left to the exact translation memory and segmentation
+MAX_TEXT_LENGTH = 1000
+
+# At most this many candidates are compared for a lookup
+MAX_CANDIDATES = 10
+
+# Once a bucket holds this many texts, which are all alike, further texts aren't
+# added to it, so that lookups stay fast for texts made from the same template
+MAX_BUCKET_SIZE = 64
+
+
+@dataclass
+class FuzzyMatch:
+    translation_id: int
+    source_text: str
+    translated_text: str
+    similarity: float
+
+
+def shingles(text: str) -> frozenset[str]:
+    """Shingles
+
+    Args:
+        text (str): The text
+
+    Returns:
+        frozenset[str]: The character trigrams of the normalised, case folded text
+    """
+    text = f" {normalise_text(text).casefold()} "
+    if len(text) <= SHINGLE_SIZE:
+        return frozenset([text])
+    return frozenset(
+        text[index : index + SHINGLE_SIZE]
+        for index in range(len(text) - SHINGLE_SIZE + 1)
+    )
+
+
+def similarity(left: frozenset[str], right: frozenset[str]) -> float:
+    """Similarity
+
+    Args:
+        left (frozenset[str]): The shingles of a text
+        right (frozenset[str]): The shingles of another text
+
+    Returns:
+        float: The Jaccard similarity of the shingles, from 0 to 1
+    """
+    return len(left & right) / len(left | right)
+
+
+def band_keys(text_shingles: frozenset[str]) -> list[int]:
+    # Python's own string hash differs from process to process, which would make
+    # lookups hit or miss depending on the process
+    hashes = [
+        int.from_bytes(blake2b(shingle.encode(), digest_size=8).digest())
+        for shingle in text_shingles
+    ]
+    signature = [min(map(mask.__xor__, hashes)) for mask in PERMUTATIONS]
+    return [
+        hash((band, *signature[band * ROWS : (band + 1) * ROWS]))
+        for band in range(BANDS)
+    ]
+
+
+class FuzzyIndex:
+    """Fuzzy Index
+
+    A MinHash LSH index of the translations of one translator and language pair.
+    `last_id` is the highest id loaded from the DB, and is only moved on by a
+    refresh, so that translations added in process don't hide lower ids written
+    elsewhere that haven't been loaded yet
+    """
+
+    entries: dict[int, tuple[str, str]]
+    buckets: dict[int, list[int]]
+    last_id: int
+    refreshed_at: float
+
+    def __init__(self: Self) -> None:
+        self.entries = {}
+        self.buckets = {}
+        self.last_id = 0
+        self.refreshed_at = 0.0
+
+    def add(
+        self: Self, translation_id: int, source_text: str, translated_text: str
+    ) -> None:
+        if translation_id in self.entries or len(source_text) > MAX_TEXT_LENGTH:
+            return
+
+        self.entries[translation_id] = (source_text, translated_text)
+        for key in band_keys(shingles(source_text)):
+            bucket = self.buckets.setdefault(key, [])
+            if len(bucket) < MAX_BUCKET_SIZE:
+                bucket.append(translation_id)
+
+    def remove(self: Self, translation_id: int) -> None:
+        # The id is left in its buckets and skipped when it comes up as a candidate
+        self.entries.pop(translation_id, None)
+
+    def match(self: Self, text: str, threshold: float) -> FuzzyMatch | None:
+        text_shingles = shingles(text)
+        counts = Counter()
+        for key in band_keys(text_shingles):
+            counts.update(self.buckets.get(key, ()))
+
+        best = None
+        for translation_id, _ in counts.most_common(MAX_CANDIDATES):
+            entry = self.entries.get(translation_id)
+            if entry is None:
+                continue
+
+            score = similarity(text_shingles, shingles(entry[0]))
+            if score >= threshold and (best is None or score > best.similarity):
+                best = FuzzyMatch(translation_id, entry[0], entry[1], score)
+
+        return best
+
+
+class FuzzyMatcher:
+    """Fuzzy Matcher
+
+    Finds the stored translation whose source text is most similar to a text, for
+    texts that are not in the translation memory but differ from a stored text only
+    by punctuation, casing or a word or two. Similarity is the Jaccard similarity of
+    the character trigrams of the texts, and candidates are found with a MinHash LSH
+    index, so a lookup only compares the text to a handful of stored texts.
+
+    An index is held in process for each translator and language pair. It is built
+    from the DB on first use, then kept up to date as translations are saved or
+    upserted in this process, and by loading the translations saved by other
+    processes at most every `refresh_interval` seconds. `bulk_create` sends no
+    `post_save` signal, so the managers' upserts hand their translations to
+    `update` themselves.
+    """
+
+    indexes: dict[tuple, FuzzyIndex]
+    lock: Lock
+    refresh_interval: float
+    builds: int
+    hits: int
+    misses: int
+    lookup_time: float
+
+    def __init__(self: Self, refresh_interval: float) -> None:
+        self.indexes = {}
+        self.lock = Lock()
+        self.refresh_interval = refresh_interval
+        self.builds = 0
+        self.hits = 0
+        self.misses = 0
+        self.lookup_time = 0.0
+
+    @staticmethod
+    def make_key(
+        translator: str, target_lang: Language, source_lang: Language | None
+    ) -> tuple:
+        return (translator, source_lang.id if source_lang else None, target_lang.id)
+
+    def get_index(self: Self, key: tuple) -> FuzzyIndex:
+        now = time.monotonic()
+        with self.lock:
+            index = self.indexes.get(key)
+            if index is None:
+                index = self.indexes[key] = FuzzyIndex()
+                self.builds += 1
+
+            refresh = now - index.refreshed_at >= self.refresh_interval
+            if refresh:
+                index.refreshed_at = now
+                last_id = index.last_id
+
+        if refresh:
+            # Loaded outside of the lock, so that lookups against the other indexes
+            # aren't held up while an index is being built
+            rows = self.load(key, last_id)
+            with self.lock:
+                for row in rows:
+                    index.add(*row)
+                if rows:
+                    index.last_id = max(index.last_id, rows[-1][0])
+        return index
+
+    def load(self: Self, key: tuple, last_id: int) -> list[tuple[int, str, str]]:
+        translator, source_language_id, target_language_id = key
+        return list(
+            Translation.objects.filter(
+                translator=translator,
+                source_language_id=source_language_id,
+                target_language_id=target_language_id,
+                id__gt=last_id,
+            )
+            .order_by("id")
+            .values_list("id", "source_text", "translated_text")
+            .iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+        )
+
+    def match(
+        self: Self,
+        translator: str,
+        text: str,
+        target_lang: Language,
+        source_lang: Language | None,
+        threshold: float,
+    ) -> FuzzyMatch | None:
+        """Match
+
+        Args:
+            translator (str): The name of the translator
+            text (str): The source text
+            target_lang (Language): The language being translated to
+            source_lang (Language): The language being translated from
+            threshold (float): The minimum similarity of a match, from 0 to 1
+
+        Returns:
+            FuzzyMatch | None: The stored translation with the most similar source
+                text, or `None` if none are at least `threshold` similar
+        """
+        if len(text) > MAX_TEXT_LENGTH:
+            return None
+
+        index = self.get_index(self.make_key(translator, target_lang, source_lang))
+
+        started = time.perf_counter()
+        with self.lock:
+            match = index.match(text, threshold)
+            self.lookup_time += time.perf_counter() - started
+            if match is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return match
+
+    def add(self: Self, instance: Translation, created: bool, **kwargs: Any) -> None:
+        """Add
+
+        Add a saved translation to the index of its translator and language pair,
+        once it has been committed. Nothing is done if that index hasn't been built,
+        as the translation will be loaded when it is.
+        """
+        transaction.on_commit(partial(self.add_committed, instance, created))
+
+    def add_committed(self: Self, instance: Translation, created: bool) -> None:
+        with self.lock:
+            index = self.indexes.get(self.instance_key(instance))
+            if index is not None:
+                if not created:
+                    index.remove(instance.id)
+                index.add(instance.id, instance.source_text, instance.translated_text)
+
+    def update(self: Self, translations: list[Translation]) -> None:
+        """Update
+
+        Re-index translations written with `bulk_create`, which may have replaced
+        the translated text of a stored translation, once they have been committed
+
+        Args:
+            translations (list[Translation]): The stored translations
+        """
+        transaction.on_commit(partial(self.update_committed, translations))
+
+    def update_committed(self: Self, translations: list[Translation]) -> None:
+        for translation in translations:
+            self.add_committed(translation, created=False)
+
+    def remove(self: Self, instance: Translation, **kwargs: Any) -> None:
+        with self.lock:
+            index = self.indexes.get(self.instance_key(instance))
+            if index is not None:
+                index.remove(instance.id)
+
+    @staticmethod
+    def instance_key(instance: Translation) -> tuple:
+        return (
+            instance.translator,
+            instance.source_language_id,
+            instance.target_language_id,
+        )
+
+    def clear(self: Self) -> None:
+        """Clear
+
+        Drop every index and reset the counters
+        """
+        with self.lock:
+            self.indexes.clear()
+            self.builds = 0
+            self.hits = 0
+            self.misses = 0
+            self.lookup_time = 0.0
+
+    def stats(self: Self) -> dict[str, Any]:
+        """Stats
+
+        Returns:
+            dict[str, Any]: The number of indexes built and texts indexed, the hit/miss
+                counters and the mean lookup time, in microseconds
+        """
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "indexes": len(self.indexes),
+                "builds": self.builds,
+                "entries": sum(len(index.entries) for index in self.indexes.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "mean_lookup_us": round(self.lookup_time / lookups * 1_000_000, 2)
+                if lookups
+                else 0,
+            }
+
+
+fuzzy_matcher = FuzzyMatcher(
+    refresh_interval=settings.TRANSLATION_FUZZY_REFRESH_INTERVAL
+)
+
+post_save.connect(fuzzy_matcher.add, sender=Translation, dispatch_uid="fuzzy_matcher")
+post_delete.connect(
+    fuzzy_matcher.remove, sender=Translation, dispatch_uid="fuzzy_matcher"
+)
+
+stats.register("fuzzy_matching", fuzzy_matcher.stats)
@@ -0,0 +1,260 @@
+import csv
+import io
+import time
+import xml.etree.ElementTree as ElementTree
+from dataclasses import dataclass
+from itertools import islice
+from typing import IO, Iterable, Iterator, Self
+
+from django.db import transaction
+
+from decyphr.text import content_hash
+from languages.models import Language
+from languages.registry import language_registry
+from preferences.models import SUPPORTED_TRANSLATORS
+from translate.models import Translation
+
+TRANSLATORS = {name for name, _ in SUPPORTED_TRANSLATORS}
+
+# The formats a translation memory can be imported from, with the column delimiter
+# of the delimited ones
+FORMATS = {"tmx": None, "tsv": "\t", "csv": ","}
+
+XML_LANG = "{http://www.w3.org/XML/1998/namespace}lang"
+
+# The columns a CSV or TSV translation memory must have
+REQUIRED_COLUMNS = {
+    "source_language",
+    "source_text",
+    "target_language",
+    "translated_text",
+}
+
+
+@dataclass
+class TranslationUnit:
+    source_language: str
+    source_text: str
+    target_language: str
+    translated_text: str
+    translator: str = ""
+
+
+@dataclass
+class ImportReport:
+    read: int = 0
+    imported: int = 0
+    duplicates: int = 0
+    unknown_language: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self: Self) -> float:
+        return self.read / self.seconds if self.seconds else 0.0
+
+    def __str__(self: Self) -> str:
+        return (
+            f"Read {self.read} translation units in {self.seconds:.1f}s "
+            f"({self.rows_per_second:.0f}/s): {self.imported} imported, "
+            f"{self.duplicates} duplicates skipped, {self.unknown_language} skipped "
+            "for an unknown language"
+        )
+
+
+def read_tmx(file: IO[bytes]) -> Iterator[TranslationUnit]:
+    """Read TMX
+
+    Parse a TMX file a translation unit at a time, so that large files are not
+    held in memory. Each unit gives one translation from its source language, the
+    `srclang` of the unit or of the header, to each of its other languages.
+
+    Args:
+        file (IO[bytes]): The TMX file
+
+    Yields:
+        TranslationUnit: The next translation
+    """
+    source_language = None
+
+    for event, element in ElementTree.iterparse(file, events=("start", "end")):
+        if event == "start":
+            if element.tag == "header":
+                source_language = element.get("srclang")
+            continue
+
+        if element.tag != "tu":
+            continue
+
+        unit_source_language = element.get("srclang", source_language)
+        segments = {
+            tuv.get(XML_LANG, tuv.get("lang", "")): "".join(tuv.find("seg").itertext())
+            for tuv in element.iter("tuv")
+            if tuv.find("seg") is not None
+        }
+        source_text = segments.pop(unit_source_language, None)
+
+        if source_text:
+            for target_language, translated_text in segments.items():
+                yield TranslationUnit(
+                    unit_source_language,
+                    source_text,
+                    target_language,
+                    translated_text,
+                )
+        element.clear()
+
+
+def read_delimited(file: IO[str], delimiter: str) -> Iterator[TranslationUnit]:
+    """Read delimited
+
+    Parse a CSV or TSV file with a header row naming the `source_language`,
+    `source_text`, `target_language` and `translated_text` columns, and optionally
+    the `translator` column. These are the columns of a CSV export.
+
+    Args:
+        file (IO[str]): The CSV or TSV file
+        delimiter (str): The column delimiter
+
+    Yields:
+        TranslationUnit: The next translation
+
+    Raises:
+        ValueError if any of the columns are missing
+    """
+    reader = csv.DictReader(file, delimiter=delimiter)
+    missing = REQUIRED_COLUMNS - set(reader.fieldnames or [])
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(sorted(missing))}")
+
+    for row in reader:
+        yield TranslationUnit(
+            row["source_language"],
+            row["source_text"],
+            row["target_language"],
+            row["translated_text"],
+            row.get("translator") or "",
+        )
+
+
+def read_units(file: IO[bytes], format: str) -> Iterator[TranslationUnit]:
+    """Read units
+
+    Args:
+        file (IO[bytes]): The translation memory, opened in binary mode
+        format (str): `tmx`, `tsv` or `csv`
+
+    Yields:
+        TranslationUnit: The next translation
+    """
+    if format == "tmx":
+        yield from read_tmx(file)
+        return
+
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    yield from read_delimited(text, FORMATS[format])
+
+
+class TranslationImporter:
+    """Translation Importer
+
+    Imports translation memories into the `Translation` table, so that the texts in
+    them are served from the translation memory instead of by a provider. Rows are
+    written with `bulk_create` in batches, each in its own transaction. Rows that
+    are already in the table, by content hash, language pair and translator, are
+    skipped.
+
+    Rows are stored under the translator they name, if it is a supported
+    translator, or under the translator the importer was given otherwise, as the
+    translation memory is looked up per translator.
+    """
+
+    translator: str
+    batch_size: int
+    languages: dict[str, Language | None]
+
+    def __init__(self: Self, translator: str, batch_size: int) -> None:
+        self.translator = translator
+        self.batch_size = batch_size
+        self.languages = {}
+
+    def get_language(self: Self, code: str) -> Language | None:
+        if code not in self.languages:
+            self.languages[code] = language_registry.get(code)
+        return self.languages[code]
+
+    def run(self: Self, units: Iterable[TranslationUnit]) -> ImportReport:
+        """Run
+
+        Args:
+            units (Iterable[TranslationUnit]): The translations to import
+
+        Returns:
+            ImportReport: The number of translations read, imported and skipped, and
+                how long it took
+        """
+        report = ImportReport()
+        started = time.monotonic()
+        units = iter(units)
+
+        while batch := list(islice(units, self.batch_size)):
+            report.read += len(batch)
+            self.import_batch(batch, report)
+
+        report.seconds = time.monotonic() - started
+        return report
+
+    def import_batch(
+        self: Self, batch: list[TranslationUnit], report: ImportReport
+    ) -> None:
+        rows = {}
+        for unit in batch:
+            source_language = self.get_language(unit.source_language)
+            target_language = self.get_language(unit.target_language)
+            if source_language is None or target_language is None:
+                report.unknown_language += 1
+                continue
+
+            translator = (
+                unit.translator if unit.translator in TRANSLATORS else self.translator
+            )
+            key = (
+                content_hash(unit.source_text),
+                source_language.id,
+                target_language.id,
+                translator,
+            )
+            if key in rows:
+                report.duplicates += 1
+                continue
+
+            rows[key] = Translation(
+                source_text=unit.source_text,
+                source_hash=key[0],
+                translated_text=unit.translated_text,
+                translator=translator,
+                source_language=source_language,
+                target_language=target_language,
+            )
+
+        if not rows:
+            return
+
+        with transaction.atomic():
+            existing = set(
+                Translation.objects.filter(
+                    source_hash__in={key[0] for key in rows}
+                ).values_list(
+                    "source_hash",
+                    "source_language_id",
+                    "target_language_id",
+                    "translator",
+                )
+            )
+            new_rows = [
+                translation for key, translation in rows.items() if key not in existing
+            ]
+            # Rows stored by another process since the query above are skipped
+            Translation.objects.bulk_create(new_rows, ignore_conflicts=True)
+
+        report.imported += len(new_rows)
+        report.duplicates += len(rows) - len(new_rows)
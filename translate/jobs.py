@@ -0,0 +1,76 @@
+from typing import Self
+
+from django.conf import settings
+
+from decyphr.text import content_hash
+from jobs.exceptions import JobValidationException
+from jobs.handlers import register, split_document
+from preferences.snapshot import preferences_cache
+from translate.entities import TranslatorParams
+from translate.managers import TranslationManager
+from translate.models import Translation
+from translate.serializers import Deserializer, Serializer
+
+
+class TranslationJobHandler:
+    """Translation Job Handler
+
+    Translates a document in the background, `JOB_CHUNK_CHARACTERS` at a time. Each
+    chunk is translated sentence by sentence, as a segmented translation is, so that
+    sentences that have been translated before are not sent to the translator
+    again. The translation of the whole document is stored once every chunk has
+    been translated.
+    """
+
+    manager: TranslationManager
+
+    def __init__(self: Self) -> None:
+        self.manager = TranslationManager(Deserializer, Serializer)
+
+    def get_params(self: Self, request_data: dict, text: str) -> TranslatorParams:
+        return TranslatorParams(
+            preferences=preferences_cache.get(),
+            text=text,
+            translator=request_data.get("translator", None),
+            source_language_code=request_data.get("source_language_code", None),
+            target_language_code=request_data.get("target_language_code", None),
+            segment=True,
+        )
+
+    def plan(self: Self, request_data: dict) -> list[str]:
+        deserializer = Deserializer(data=request_data)
+
+        if not deserializer.is_valid():
+            raise JobValidationException(errors=deserializer.errors)
+
+        params = self.get_params(
+            deserializer.data, deserializer.data["text_to_be_translated"]
+        )
+        if params.source_language is None or params.target_language is None:
+            raise JobValidationException(
+                errors={"language_code": ["Unknown language code."]}
+            )
+
+        return split_document(params.text, settings.JOB_CHUNK_CHARACTERS)
+
+    def run_chunk(self: Self, request_data: dict, chunk: str) -> str:
+        return self.manager._translate(self.get_params(request_data, chunk))
+
+    def finish(self: Self, request_data: dict, results: list[str]) -> dict:
+        params = self.get_params(request_data, request_data["text_to_be_translated"])
+        (translation,) = self.manager._upsert(
+            [
+                Translation(
+                    source_text=params.text,
+                    source_hash=content_hash(params.text),
+                    translated_text="".join(results),
+                    translator=params.translator,
+                    source_language=params.source_language,
+                    target_language=params.target_language,
+                )
+            ]
+        )
+        return dict(Serializer(translation).data)
+
+
+register("translate", TranslationJobHandler())
@@ -0,0 +1,34 @@
+import sys
+from typing import Any, Self
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from decyphr.export import OUTPUTS, export_rows
+from translate.models import Translation
+from translate.serializers import EXPORT_FIELDS
+
+
+class Command(BaseCommand):
+    help = "Stream every translation to a file, or stdout, as NDJSON or CSV"
+
+    def add_arguments(self: Self, parser: CommandParser) -> None:
+        parser.add_argument("--output", choices=list(OUTPUTS), default="ndjson")
+        parser.add_argument("--gzip", action="store_true", help="Gzip the export")
+        parser.add_argument("--file", help="Where to write the export")
+
+    def handle(self: Self, *args: Any, **options: Any) -> None:
+        chunks = export_rows(
+            Translation.objects.order_by("id"),
+            EXPORT_FIELDS,
+            options["output"],
+            options["gzip"],
+        )
+
+        if options["file"] is None:
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            return
+
+        with open(options["file"], "wb") as file:
+            for chunk in chunks:
+                file.write(chunk)
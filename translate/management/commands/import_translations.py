@@ -0,0 +1,50 @@
+from pathlib import Path
+from typing import Any, Self
+from xml.etree.ElementTree import ParseError
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from preferences.models import SUPPORTED_TRANSLATORS
+from translate.importer import FORMATS, TranslationImporter, read_units
+
+
+class Command(BaseCommand):
+    help = "Import a translation memory from a TMX, TSV or CSV file"
+
+    def add_arguments(self: Self, parser: CommandParser) -> None:
+        parser.add_argument("path", help="The translation memory to import")
+        parser.add_argument(
+            "--format",
+            choices=list(FORMATS),
+            help="The format of the file, if it isn't given by its extension",
+        )
+        parser.add_argument(
+            "--translator",
+            choices=[name for name, _ in SUPPORTED_TRANSLATORS],
+            required=True,
+            help="The translator to store rows that don't name one under",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.TRANSLATION_IMPORT_BATCH_SIZE,
+            help="The number of translations written to the DB at a time",
+        )
+
+    def handle(self: Self, *args: Any, **options: Any) -> None:
+        path = Path(options["path"])
+        format = options["format"] or path.suffix.lstrip(".").lower()
+        if format not in FORMATS:
+            raise CommandError(
+                f"Can't tell the format of {path}, pass one with --format"
+            )
+
+        importer = TranslationImporter(options["translator"], options["batch_size"])
+        try:
+            with open(path, "rb") as file:
+                report = importer.run(read_units(file, format))
+        except (OSError, ValueError, ParseError) as error:
+            raise CommandError(error) from error
+
+        self.stdout.write(self.style.SUCCESS(str(report)))
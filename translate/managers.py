@@ -1,11 +1,53 @@
 # type: ignore
+from functools import partial
 from typing import Self, Type
 
-from preferences.models import Preferences
-from translate.entities import TranslatorParams
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+
+from decyphr.admission import admission
+from decyphr.errors import error_item
+from decyphr.export import export_response
+from decyphr.routing import order_candidates, router
+from decyphr.singleflight import single_flight
+from decyphr.text import content_hash
+from languages.models import Language
+from languages.registry import language_registry
+from preferences.snapshot import preferences_cache
+from translate.dispatcher import micro_batcher
+from translate.entities import BatchTranslatorParams, TranslatorParams
 from translate.exceptions import TranslationValidationException
-from translate.serializers import Deserializer, Serializer
-from translate.translators import get_translator
+from translate.fuzzy import fuzzy_matcher
+from translate.memory import translation_memory
+from translate.models import UNIQUE_FIELDS, Translation
+from translate.segmenter import join_sentences, split_sentences
+from translate.serializers import (
+    EXPORT_FIELDS,
+    Deserializer,
+    FuzzyMatchSerializer,
+    Serializer,
+)
+from translate.translators import get_translator, translate_in_batches, translators
+
+
+def unique_key(translation: Translation) -> tuple:
+    return (
+        translation.source_hash,
+        translation.source_language_id,
+        translation.target_language_id,
+        translation.translator,
+    )
+
+
+def unique_translations(translations: list[Translation]) -> dict[tuple, Translation]:
+    # A row can only be upserted once per query, so only the first translation of
+    # each text is kept
+    unique = {}
+    for translation in translations:
+        unique.setdefault(unique_key(translation), translation)
+    return unique
 
 
 class TranslationManager:
@@ -27,16 +69,466 @@ class TranslationManager:
         the string provided by the client and gets the translated text based on the
         text, target/source langs and tranlsation provider requested.
 
+        The translation memory is checked first and the provider is only called when
+        the text has not been translated by that translator before. Concurrent
+        requests to translate the same text share a single call to the provider.
+
+        With fuzzy matching enabled, the translation of the most similar stored text
+        is returned instead of calling the provider, if there is one similar enough.
+        `params.fuzzy_match` is set to the match.
+
+        In routing mode another translator may end up providing the translation, in
+        which case `params.translator` is updated to match.
+
         Args:
             params (TranslatorParams): The data required in order to be able
                 to perform the translation
         """
-        return get_translator(params.translator).get_translated_text(
+        translated_text = translation_memory.lookup(
+            params.translator,
             params.text,
             params.target_language,
             params.source_language,
         )
 
+        if translated_text is not None:
+            return translated_text
+
+        return self._translate_new(params)
+
+    def _translate_new(self: Self, params: TranslatorParams) -> str:
+        """Translate new
+
+        The part of `_translate` for texts that aren't in the translation memory,
+        which is shared with `_atranslate`
+
+        Args:
+            params (TranslatorParams): The data required in order to be able
+                to perform the translation
+        """
+        if settings.TRANSLATION_FUZZY_THRESHOLD and not params.segment:
+            params.fuzzy_match = fuzzy_matcher.match(
+                params.translator,
+                params.text,
+                params.target_language,
+                params.source_language,
+                settings.TRANSLATION_FUZZY_THRESHOLD,
+            )
+            if params.fuzzy_match is not None:
+                return params.fuzzy_match.translated_text
+
+        params.translator, translated_text = single_flight.do(
+            single_flight.make_key(
+                "translate",
+                *translation_memory.make_key(
+                    params.translator,
+                    params.text,
+                    params.target_language,
+                    params.source_language,
+                ),
+            ),
+            partial(self._call_translator, params),
+            decode=tuple,
+        )
+        return translated_text
+
+    def _call_translator(self: Self, params: TranslatorParams) -> tuple[str, str]:
+        """Call translator
+
+        Get the translated text from the translation provider, or in routing mode
+        from the first healthy provider, and add it to the translation memory.
+
+        Args:
+            params (TranslatorParams): The data required in order to be able
+                to perform the translation
+
+        Returns:
+            tuple[str, str]: The name of the translator used and the translated text
+        """
+        if settings.PROVIDER_ROUTING:
+            translator, translated_text = router.call(
+                order_candidates(params.translator, translators),
+                (
+                    "translate",
+                    params.source_language.code,
+                    params.target_language.code,
+                ),
+                partial(self._call_provider, params),
+            )
+        else:
+            translator = params.translator
+            translated_text = self._call_provider(params, translator)
+
+        translation_memory.store(
+            translator,
+            params.text,
+            translated_text,
+            params.target_language,
+            params.source_language,
+        )
+        return translator, translated_text
+
+    def _call_provider(self: Self, params: TranslatorParams, translator: str) -> str:
+        """Call provider
+
+        Get the translated text from the named translator. Long texts, or texts the
+        client asked to be segmented, are translated sentence by sentence. With
+        micro-batching enabled, other texts are merged with concurrent requests into
+        one multi-text call where the translator supports it.
+
+        Args:
+            params (TranslatorParams): The data required in order to be able
+                to perform the translation
+            translator (str): The name of the translator to use
+
+        Returns:
+            str: The translated text
+
+        Raises:
+            ProviderUnavailableException if the translator has too many calls in
+                flight
+        """
+        if params.segment or len(params.text) > settings.TRANSLATION_SEGMENT_THRESHOLD:
+            return self._translate_segmented(params, translator)
+
+        provider = get_translator(translator)
+        if settings.TRANSLATION_MICRO_BATCH_WINDOW and hasattr(
+            provider, "get_translated_texts"
+        ):
+            # Only the call made for the whole batch is admitted
+            return micro_batcher.translate(
+                translator,
+                provider,
+                params.text,
+                params.target_language,
+                params.source_language,
+                admission_name=f"translate.{translator}",
+            )
+
+        with admission.admit(f"translate.{translator}"):
+            return provider.get_translated_text(
+                params.text,
+                params.target_language,
+                params.source_language,
+            )
+
+    async def _atranslate(self: Self, params: TranslatorParams) -> str:
+        """Translate
+
+        Async equivalent of `_translate`. The translation memory is checked on the
+        event loop, and texts that aren't in it go through the same pipeline as on
+        the sync path, so that they are segmented, routed and shared in the same way
+
+        Args:
+            params (TranslatorParams): The data required in order to be able
+                to perform the translation
+        """
+        translated_text = await translation_memory.alookup(
+            params.translator,
+            params.text,
+            params.target_language,
+            params.source_language,
+        )
+
+        if translated_text is not None:
+            return translated_text
+
+        return await sync_to_async(self._translate_new)(params)
+
+    def _translate_texts(
+        self: Self,
+        translator: str,
+        texts: list[str],
+        target_language: Language,
+        source_language: Language | None,
+    ) -> tuple[dict[str, str | Exception], list[str]]:
+        """Translate texts
+
+        Translate many texts at once. Texts already in the translation memory are not
+        sent to the provider, each distinct text is only translated once and the rest
+        are sent in as few provider calls as the translator allows.
+
+        Args:
+            translator (str): The name of the translator to use
+            texts (list[str]): The texts to translate
+            target_language (Language): The language to translate to
+            source_language (Language): The language to translate from
+
+        Returns:
+            tuple[dict[str, str | Exception], list[str]]: The translated text, or the
+                error raised while translating it, for each distinct text and the
+                texts that had to be sent to the provider
+        """
+        texts = list(dict.fromkeys(texts))
+        results = translation_memory.lookup_many(
+            translator, texts, target_language, source_language
+        )
+
+        missing = [text for text in texts if text not in results]
+        if not missing:
+            return results, missing
+
+        translated_texts = translate_in_batches(
+            get_translator(translator),
+            missing,
+            target_language,
+            source_language,
+            admission_name=f"translate.{translator}",
+        )
+
+        for text, translated_text in zip(missing, translated_texts):
+            results[text] = translated_text
+            if not isinstance(translated_text, Exception):
+                translation_memory.store(
+                    translator, text, translated_text, target_language, source_language
+                )
+
+        return results, missing
+
+    def _translate_segmented(
+        self: Self, params: TranslatorParams, translator: str
+    ) -> str:
+        """Translate segmented
+
+        Split the text into sentences and only send the sentences that are not in the
+        translation memory to the provider, in parallel batches. The new sentence
+        translations are stored so that they can be reused, then the translated
+        sentences are put back together with the whitespace of the original text.
+
+        Args:
+            params (TranslatorParams): The data required in order to be able
+                to perform the translation
+            translator (str): The name of the translator to use
+
+        Returns:
+            str: The translated text
+
+        Raises:
+            The first error raised while translating any of the sentences
+        """
+        sentences, gaps = split_sentences(params.text)
+        results, missing = self._translate_texts(
+            translator,
+            sentences,
+            params.target_language,
+            params.source_language,
+        )
+
+        for result in results.values():
+            if isinstance(result, Exception):
+                raise result
+
+        self._upsert(
+            [
+                Translation(
+                    source_text=sentence,
+                    source_hash=content_hash(sentence),
+                    translated_text=results[sentence],
+                    translator=translator,
+                    source_language=params.source_language,
+                    target_language=params.target_language,
+                )
+                for sentence in missing
+            ]
+        )
+
+        return join_sentences([results[sentence] for sentence in sentences], gaps)
+
+    def _translate_batch(
+        self: Self, params: BatchTranslatorParams
+    ) -> list[str | Exception]:
+        """Translate batch
+
+        Batch equivalent of `_translate`
+
+        Args:
+            params (BatchTranslatorParams): The data required in order to be able
+                to perform the translations
+
+        Returns:
+            list[str | Exception]: The translated text, or the error raised while
+                translating it, for each of the texts in the order they were provided
+        """
+        results, _ = self._translate_texts(
+            params.translator,
+            params.texts,
+            params.target_language,
+            params.source_language,
+        )
+        return [results[text] for text in params.texts]
+
+    def _upsert(self: Self, translations: list[Translation]) -> list[Translation]:
+        """Upsert
+
+        Insert the translations with a single query. Where a translation of the same
+        text, language pair and translator is already stored, its translated text is
+        updated instead of a duplicate row being inserted. The fuzzy index is
+        updated with the stored translations, as `bulk_create` sends no `post_save`.
+
+        Args:
+            translations (list[Translation]): The unsaved translations, each of which
+                must have its `source_hash` set
+
+        Returns:
+            list[Translation]: The stored translations, in the same order. Texts that
+                appear more than once share the same stored translation
+        """
+        unique = unique_translations(translations)
+        Translation.objects.bulk_create(
+            list(unique.values()),
+            update_conflicts=True,
+            unique_fields=UNIQUE_FIELDS,
+            update_fields=["source_text", "translated_text"],
+        )
+        fuzzy_matcher.update(list(unique.values()))
+        return [unique[unique_key(translation)] for translation in translations]
+
+    async def _aupsert(
+        self: Self, translations: list[Translation]
+    ) -> list[Translation]:
+        """Upsert
+
+        Async equivalent of `_upsert`
+        """
+        unique = unique_translations(translations)
+        await Translation.objects.abulk_create(
+            list(unique.values()),
+            update_conflicts=True,
+            unique_fields=UNIQUE_FIELDS,
+            update_fields=["source_text", "translated_text"],
+        )
+        # Async requests don't run in a transaction, so the rows are committed
+        fuzzy_matcher.update_committed(list(unique.values()))
+        return [unique[unique_key(translation)] for translation in translations]
+
+    def filter_translations(
+        self: Self, queryset: QuerySet, query_params: dict[str, str]
+    ) -> QuerySet:
+        """Filter translations
+
+        Narrow down the translations listed by the endpoint using the query params
+
+        Args:
+            queryset (QuerySet): The translations to filter
+            query_params (dict[str, str]): The query params received by the endpoint
+
+        Returns:
+            QuerySet: The filtered translations
+        """
+        deserializer = self.deserializer(data=query_params)
+
+        if not deserializer.is_valid():
+            raise TranslationValidationException(errors=deserializer.errors)
+
+        return self._filter(queryset, deserializer.validated_data)
+
+    def _filter(self: Self, queryset: QuerySet, data: dict) -> QuerySet:
+        filters = {}
+
+        for field in ("source_language", "target_language"):
+            code = data.get(f"{field}_code")
+            if code:
+                filters[field] = language_registry.get(code)
+                if filters[field] is None:
+                    raise TranslationValidationException(
+                        errors={f"{field}_code": ["Unknown language code."]}
+                    )
+
+        if "translator" in data:
+            filters["translator"] = data["translator"]
+        if "created_after" in data:
+            filters["created_at__gte"] = data["created_after"]
+        if "created_before" in data:
+            filters["created_at__lt"] = data["created_before"]
+
+        return queryset.filter(**filters)
+
+    def export_translations(
+        self: Self, queryset: QuerySet, query_params: dict[str, str]
+    ) -> StreamingHttpResponse:
+        """Export translations
+
+        Stream the translations matching the filters in the query params
+
+        Args:
+            queryset (QuerySet): The translations to export
+            query_params (dict[str, str]): The query params received by the endpoint
+
+        Returns:
+            StreamingHttpResponse: The export
+        """
+        deserializer = self.deserializer(data=query_params)
+
+        if not deserializer.is_valid():
+            raise TranslationValidationException(errors=deserializer.errors)
+
+        data = deserializer.validated_data
+        return export_response(
+            self._filter(queryset, data).order_by("id"),
+            EXPORT_FIELDS,
+            "translations",
+            output=data["output"],
+            compress="compress" in data,
+        )
+
+    def create_new_translations(self: Self, request_data: dict) -> list[dict]:
+        """Create new translations
+
+        Batch equivalent of `create_new_translation`. Translates each of the texts
+        received by the endpoint and creates all of the new translation records in
+        the DB with a single query.
+
+        Args:
+            request_data (dict): The data received by the endpoint
+
+        Returns:
+            list[dict]: For each text, in the order they were provided, either the
+                serialised `Translation` instance or the error that prevented it from
+                being translated
+        """
+        deserializer = self.deserializer(data=request_data)
+
+        if not deserializer.is_valid():
+            raise TranslationValidationException(errors=deserializer.errors)
+
+        params = BatchTranslatorParams(
+            preferences=preferences_cache.get(),
+            texts=deserializer.data["texts_to_be_translated"],
+            translator=deserializer.data.get("translator", None),
+            source_language_code=deserializer.data.get("source_language_code", None),
+            target_language_code=deserializer.data.get("target_language_code", None),
+        )
+
+        if params.source_language is None or params.target_language is None:
+            raise TranslationValidationException(
+                errors={"language_code": ["Unknown language code."]}
+            )
+
+        translated_texts = self._translate_batch(params)
+
+        translations = self._upsert(
+            [
+                Translation(
+                    source_text=text,
+                    source_hash=content_hash(text),
+                    translated_text=translated_text,
+                    translator=params.translator,
+                    source_language=params.source_language,
+                    target_language=params.target_language,
+                )
+                for text, translated_text in zip(params.texts, translated_texts)
+                if not isinstance(translated_text, Exception)
+            ]
+        )
+        serialized = iter(self.serializer(translations, many=True).data)
+
+        return [
+            {"index": index, **error_item(translated_text)}
+            if isinstance(translated_text, Exception)
+            else {"index": index, "translation": next(serialized)}
+            for index, translated_text in enumerate(translated_texts)
+        ]
+
     def create_new_translation(self: Self, request_data: dict[str, str]) -> Serializer:
         """Create new translation
 
@@ -44,11 +536,15 @@ class TranslationManager:
         the text based on the provided request data. This will then create a new
         translation record in the DB and return that back to the caller
 
+        A fuzzy match is returned as is, flagged as fuzzy, without creating a record,
+        so that it is never served as an exact match later on
+
         Args:
             request_data (dict[str, str]): The data received by the endpoint
 
         Returns:
-            Serializer: The serialised `Translation` instance
+            Serializer: The serialised `Translation` instance, or the serialised
+                fuzzy match
         """
         deserializer = self.deserializer(data=request_data)
 
@@ -56,19 +552,32 @@ class TranslationManager:
             raise TranslationValidationException(errors=deserializer.errors)
 
         translator_params = TranslatorParams(
-            preferences=Preferences.objects.all().first(),
+            preferences=preferences_cache.get(),
             text=deserializer.data["text_to_be_translated"],
             translator=deserializer.data.get("translator", None),
             source_language_code=deserializer.data.get("source_language_code", None),
             target_language_code=deserializer.data.get("target_language_code", None),
+            segment=deserializer.data.get("segment", False),
         )
 
+        if (
+            translator_params.source_language is None
+            or translator_params.target_language is None
+        ):
+            raise TranslationValidationException(
+                errors={"language_code": ["Unknown language code."]}
+            )
+
         translated_text = self._translate(translator_params)
 
+        if translator_params.fuzzy_match is not None:
+            return self._serialize_fuzzy_match(translator_params, translated_text)
+
         translation = self.serializer(
             data={
                 "source_text": translator_params.text,
                 "translated_text": translated_text,
+                "translator": translator_params.translator,
                 "source_language": translator_params.source_language.id,
                 "target_language": translator_params.target_language.id,
             }
@@ -77,5 +586,84 @@ class TranslationManager:
         if not translation.is_valid():
             raise TranslationValidationException(errors=translation.errors)
 
-        translation.save()
+        (translation.instance,) = self._upsert(
+            [
+                Translation(
+                    **translation.validated_data,
+                    source_hash=content_hash(translator_params.text),
+                )
+            ]
+        )
         return translation
+
+    def _serialize_fuzzy_match(
+        self: Self, params: TranslatorParams, translated_text: str
+    ) -> FuzzyMatchSerializer:
+        match = params.fuzzy_match
+        return FuzzyMatchSerializer(
+            {
+                "source_text": params.text,
+                "translated_text": translated_text,
+                "translator": params.translator,
+                "source_language": params.source_language.id,
+                "target_language": params.target_language.id,
+                "fuzzy": True,
+                "similarity": match.similarity,
+                "matched_translation": match.translation_id,
+                "matched_source_text": match.source_text,
+            }
+        )
+
+    async def acreate_new_translation(self: Self, request_data: dict) -> Serializer:
+        """Create new translation
+
+        Async equivalent of `create_new_translation`, used by the async views. All of
+        the DB access goes through the async queryset API and the provider call does
+        not block the event loop.
+
+        Args:
+            request_data (dict): The data received by the endpoint
+
+        Returns:
+            Serializer: The serialised `Translation` instance
+        """
+        deserializer = self.deserializer(data=request_data)
+
+        if not deserializer.is_valid():
+            raise TranslationValidationException(errors=deserializer.errors)
+
+        translator_params = await TranslatorParams.acreate(
+            preferences=await preferences_cache.aget(),
+            text=deserializer.data["text_to_be_translated"],
+            translator=deserializer.data.get("translator", None),
+            source_language_code=deserializer.data.get("source_language_code", None),
+            target_language_code=deserializer.data.get("target_language_code", None),
+            segment=deserializer.data.get("segment", False),
+        )
+
+        if (
+            translator_params.source_language is None
+            or translator_params.target_language is None
+        ):
+            raise TranslationValidationException(
+                errors={"language_code": ["Unknown language code."]}
+            )
+
+        translated_text = await self._atranslate(translator_params)
+
+        if translator_params.fuzzy_match is not None:
+            return self._serialize_fuzzy_match(translator_params, translated_text)
+
+        (translation,) = await self._aupsert(
+            [
+                Translation(
+                    source_text=translator_params.text,
+                    source_hash=content_hash(translator_params.text),
+                    translated_text=translated_text,
+                    translator=translator_params.translator,
+                    source_language=translator_params.source_language,
+                    target_language=translator_params.target_language,
+                )
+            ]
+        )
+        return self.serializer(translation)
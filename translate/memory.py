@@ -0,0 +1,265 @@
+# type: ignore
+from threading import Lock
+from typing import Self
+
+from cachetools import TTLCache
+from django.conf import settings
+from django.db.models import QuerySet
+
+from decyphr import stats
+from decyphr.text import content_hash
+from languages.models import Language
+from translate.models import Translation
+
+
+class TranslationMemory:
+    """Translation Memory
+
+    Sits in front of the translators so that text which has already been translated
+    is not sent to the provider again. Lookups are made against a size bounded, TTL
+    expiring LRU held in process and, on a miss, against the `Translation` table
+    using the normalised content hash of the source text.
+
+    Entries are keyed per translator as different providers produce different
+    translations for the same text.
+    """
+
+    cache: TTLCache
+    lock: Lock
+    memory_hits: int
+    database_hits: int
+    misses: int
+
+    def __init__(self: Self, max_size: int, ttl: int) -> None:
+        self.cache = TTLCache(maxsize=max_size, ttl=ttl)
+        self.lock = Lock()
+        self.memory_hits = 0
+        self.database_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(
+        translator: str,
+        text: str,
+        target_lang: Language,
+        source_lang: Language | None,
+    ) -> tuple:
+        """Make key
+
+        Args:
+            translator (str): The name of the translator
+            text (str): The source text
+            target_lang (Language): The language being translated to
+            source_lang (Language): The language being translated from
+
+        Returns:
+            tuple: The key used to store the translation in the cache
+        """
+        return (
+            translator,
+            source_lang.id if source_lang else None,
+            target_lang.id,
+            content_hash(text),
+        )
+
+    def lookup(
+        self: Self,
+        translator: str,
+        text: str,
+        target_lang: Language,
+        source_lang: Language | None = None,
+    ) -> str | None:
+        """Lookup
+
+        Find a previous translation of the text, first in the in-process cache and
+        then in the DB. Translations found in the DB are added to the cache.
+
+        Args:
+            translator (str): The name of the translator
+            text (str): The source text
+            target_lang (Language): The language being translated to
+            source_lang (Language): The language being translated from
+
+        Returns:
+            str | None: The translated text, or `None` if it has not been translated
+                before
+        """
+        key = self.make_key(translator, text, target_lang, source_lang)
+        translated_text = self.lookup_cache(key)
+        if translated_text is not None:
+            return translated_text
+
+        return self.record_database_result(
+            key,
+            self.database_query(key, target_lang, source_lang).first(),
+        )
+
+    async def alookup(
+        self: Self,
+        translator: str,
+        text: str,
+        target_lang: Language,
+        source_lang: Language | None = None,
+    ) -> str | None:
+        """Lookup
+
+        Async equivalent of `lookup`
+        """
+        key = self.make_key(translator, text, target_lang, source_lang)
+        translated_text = self.lookup_cache(key)
+        if translated_text is not None:
+            return translated_text
+
+        return self.record_database_result(
+            key,
+            await self.database_query(key, target_lang, source_lang).afirst(),
+        )
+
+    def lookup_cache(self: Self, key: tuple) -> str | None:
+        with self.lock:
+            translated_text = self.cache.get(key)
+            if translated_text is not None:
+                self.memory_hits += 1
+            return translated_text
+
+    def database_query(
+        self: Self, key: tuple, target_lang: Language, source_lang: Language | None
+    ) -> QuerySet:
+        return Translation.objects.filter(
+            source_hash=key[3],
+            source_language=source_lang,
+            target_language=target_lang,
+            translator=key[0],
+        ).values_list("translated_text", flat=True)
+
+    def record_database_result(
+        self: Self, key: tuple, translated_text: str | None
+    ) -> str | None:
+        with self.lock:
+            if translated_text is None:
+                self.misses += 1
+            else:
+                self.database_hits += 1
+                self.cache[key] = translated_text
+        return translated_text
+
+    def lookup_many(
+        self: Self,
+        translator: str,
+        texts: list[str],
+        target_lang: Language,
+        source_lang: Language | None = None,
+    ) -> dict[str, str]:
+        """Lookup many
+
+        Batch equivalent of `lookup`. Texts missing from the in-process cache are
+        looked up in the DB with a single query.
+
+        Args:
+            translator (str): The name of the translator
+            texts (list[str]): The source texts
+            target_lang (Language): The language being translated to
+            source_lang (Language): The language being translated from
+
+        Returns:
+            dict[str, str]: The translated text of each source text that has been
+                translated before
+        """
+        keys = {
+            text: self.make_key(translator, text, target_lang, source_lang)
+            for text in texts
+        }
+        found = {}
+
+        with self.lock:
+            for text, key in keys.items():
+                translated_text = self.cache.get(key)
+                if translated_text is not None:
+                    found[text] = translated_text
+            self.memory_hits += len(found)
+
+        missing = {}
+        for text, key in keys.items():
+            if text not in found:
+                missing.setdefault(key[3], []).append(text)
+
+        if not missing:
+            return found
+
+        rows = list(
+            Translation.objects.filter(
+                source_hash__in=missing.keys(),
+                source_language=source_lang,
+                target_language=target_lang,
+                translator=translator,
+            ).values_list("source_hash", "translated_text")
+        )
+
+        with self.lock:
+            for source_hash, translated_text in rows:
+                for text in missing.pop(source_hash, []):
+                    found[text] = translated_text
+                    self.cache[keys[text]] = translated_text
+                    self.database_hits += 1
+            self.misses += sum(len(texts) for texts in missing.values())
+
+        return found
+
+    def store(
+        self: Self,
+        translator: str,
+        text: str,
+        translated_text: str,
+        target_lang: Language,
+        source_lang: Language | None = None,
+    ) -> None:
+        """Store
+
+        Add a freshly translated piece of text to the in-process cache. Persisting
+        the translation is left to the caller.
+
+        Args:
+            translator (str): The name of the translator
+            text (str): The source text
+            translated_text (str): The translation returned by the provider
+            target_lang (Language): The language being translated to
+            source_lang (Language): The language being translated from
+        """
+        key = self.make_key(translator, text, target_lang, source_lang)
+        with self.lock:
+            self.cache[key] = translated_text
+
+    def clear(self: Self) -> None:
+        """Clear
+
+        Empty the in-process cache and reset the counters
+        """
+        with self.lock:
+            self.cache.clear()
+            self.memory_hits = 0
+            self.database_hits = 0
+            self.misses = 0
+
+    def stats(self: Self) -> dict[str, int]:
+        """Stats
+
+        Returns:
+            dict[str, int]: The hit/miss counters and the current size of the cache
+        """
+        with self.lock:
+            return {
+                "hits": self.memory_hits + self.database_hits,
+                "memory_hits": self.memory_hits,
+                "database_hits": self.database_hits,
+                "misses": self.misses,
+                "size": len(self.cache),
+                "max_size": int(self.cache.maxsize),
+            }
+
+
+translation_memory = TranslationMemory(
+    max_size=settings.TRANSLATION_MEMORY_MAX_SIZE,
+    ttl=settings.TRANSLATION_MEMORY_TTL,
+)
+
+stats.register("translation_memory", translation_memory.stats)
@@ -0,0 +1,73 @@
+# Generated by Django 5.0.3 on 2026-10-17 09:12
+
+import hashlib
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def content_hash(text):
+    normalised = WHITESPACE_PATTERN.sub(" ", unicodedata.normalize("NFC", text))
+    return hashlib.sha256(normalised.strip().encode("utf-8")).hexdigest()
+
+
+def backfill_source_hashes(apps, schema_editor):
+    Translation = apps.get_model("translate", "Translation")
+
+    batch = []
+    for translation in Translation.objects.only("id", "source_text").iterator(
+        chunk_size=1000
+    ):
+        translation.source_hash = content_hash(translation.source_text)
+        batch.append(translation)
+
+        if len(batch) == 1000:
+            Translation.objects.bulk_update(batch, ["source_hash"])
+            batch = []
+
+    Translation.objects.bulk_update(batch, ["source_hash"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("languages", "0002_alter_language_managers"),
+        ("translate", "0002_translation_source_language_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="translation",
+            name="source_hash",
+            field=models.CharField(default="", editable=False, max_length=64),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="translation",
+            name="translator",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("amazon", "Amazon"),
+                    ("deepl", "Deepl"),
+                    ("google", "Goolge"),
+                ],
+                max_length=255,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="translation",
+            index=models.Index(
+                fields=[
+                    "source_hash",
+                    "source_language",
+                    "target_language",
+                    "translator",
+                ],
+                name="translation_memory_idx",
+            ),
+        ),
+        migrations.RunPython(backfill_source_hashes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("languages", "0002_alter_language_managers"),
+        ("translate", "0003_translation_memory"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="translation",
+            name="created_at",
+            field=models.DateTimeField(
+                auto_now_add=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name="translation",
+            index=models.Index(
+                fields=["source_language", "target_language", "id"],
+                name="translation_language_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="translation",
+            index=models.Index(
+                fields=["created_at"], name="translation_created_at_idx"
+            ),
+        ),
+    ]
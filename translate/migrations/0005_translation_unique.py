@@ -0,0 +1,87 @@
+import hashlib
+import re
+import unicodedata
+
+from django.db import migrations, models, transaction
+from django.db.models import Count, Min
+
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+BATCH_SIZE = 1000
+
+UNIQUE_FIELDS = ["source_hash", "source_language", "target_language", "translator"]
+
+
+def content_hash(text):
+    normalised = WHITESPACE_PATTERN.sub(" ", unicodedata.normalize("NFC", text))
+    return hashlib.sha256(normalised.strip().encode("utf-8")).hexdigest()
+
+
+def backfill_source_hashes(apps, schema_editor):
+    Translation = apps.get_model("translate", "Translation")
+
+    while True:
+        with transaction.atomic():
+            batch = list(
+                Translation.objects.filter(source_hash="").only("id", "source_text")[
+                    :BATCH_SIZE
+                ]
+            )
+            for translation in batch:
+                translation.source_hash = content_hash(translation.source_text)
+            Translation.objects.bulk_update(batch, ["source_hash"])
+
+        if len(batch) < BATCH_SIZE:
+            return
+
+
+def collapse_duplicates(apps, schema_editor):
+    """Keep the first of each set of duplicate translations and delete the rest,
+    a batch of sets at a time, each in its own short transaction"""
+    Translation = apps.get_model("translate", "Translation")
+
+    duplicates = list(
+        Translation.objects.values(*UNIQUE_FIELDS)
+        .annotate(keep=Min("id"), count=Count("id"))
+        .filter(count__gt=1)
+        .order_by()
+        .values_list(*UNIQUE_FIELDS, "keep")
+    )
+
+    for start in range(0, len(duplicates), BATCH_SIZE):
+        with transaction.atomic():
+            for *key, keep in duplicates[start : start + BATCH_SIZE]:
+                Translation.objects.filter(**dict(zip(UNIQUE_FIELDS, key))).exclude(
+                    id=keep
+                ).delete()
+
+
+class Migration(migrations.Migration):
+    # Each batch is committed on its own, so that the table is never locked for long
+    atomic = False
+
+    dependencies = [
+        ("languages", "0002_alter_language_managers"),
+        ("translate", "0004_translation_created_at"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_source_hashes, migrations.RunPython.noop),
+        migrations.RunPython(collapse_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="translation",
+            constraint=models.UniqueConstraint(
+                fields=(
+                    "source_hash",
+                    "source_language",
+                    "target_language",
+                    "translator",
+                ),
+                name="translation_unique_idx",
+            ),
+        ),
+        migrations.RemoveIndex(
+            model_name="translation",
+            name="translation_memory_idx",
+        ),
+    ]
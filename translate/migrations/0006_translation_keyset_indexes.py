@@ -0,0 +1,32 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("translate", "0005_translation_unique"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="translation",
+            name="translation_created_at_idx",
+        ),
+        migrations.AddIndex(
+            model_name="translation",
+            index=models.Index(
+                fields=["target_language", "id"], name="translation_target_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="translation",
+            index=models.Index(
+                fields=["translator", "id"], name="translation_translator_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="translation",
+            index=models.Index(
+                fields=["created_at", "id"], name="translation_created_at_idx"
+            ),
+        ),
+    ]
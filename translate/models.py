@@ -2,18 +2,52 @@ from typing import Self
 
 from django.db import models
 
+from decyphr.text import content_hash
 from languages.models import Language
+from preferences.models import SUPPORTED_TRANSLATORS
+
+# A translator stores a single translation of a text for each language pair
+UNIQUE_FIELDS = ["source_hash", "source_language", "target_language", "translator"]
 
 
 class Translation(models.Model):
     source_text = models.TextField()
+    source_hash = models.CharField(max_length=64, editable=False)
     translated_text = models.TextField()
+    translator = models.CharField(
+        max_length=255, choices=SUPPORTED_TRANSLATORS, blank=True
+    )
     source_language = models.ForeignKey(
         Language, on_delete=models.CASCADE, related_name="source_language"
     )
     target_language = models.ForeignKey(
         Language, on_delete=models.CASCADE, related_name="target_language"
     )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["source_language", "target_language", "id"],
+                name="translation_language_idx",
+            ),
+            models.Index(
+                fields=["target_language", "id"], name="translation_target_idx"
+            ),
+            models.Index(
+                fields=["translator", "id"], name="translation_translator_idx"
+            ),
+            models.Index(
+                fields=["created_at", "id"], name="translation_created_at_idx"
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=UNIQUE_FIELDS, name="translation_unique_idx")
+        ]
 
     def __str__(self: Self) -> str:
         return f"{self.source_text} -> {self.translated_text}"
+
+    def save(self: Self, *args, **kwargs) -> None:
+        self.source_hash = content_hash(self.source_text)
+        super().save(*args, **kwargs)
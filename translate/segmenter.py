@@ -0,0 +1,63 @@
+import re
+
+# A sentence ends after its terminal punctuation (and any closing quotes or
+# brackets after it) when followed by whitespace, or at the end of the line. Only
+# the boundaries are matched, and only from the start of a run of punctuation with
+# possessive quantifiers, so that the scan stays linear however the text is made
+# up, e.g. of long runs of whitespace or full stops
+BOUNDARY_PATTERN = re.compile(r"(?<![.!?…。！？])[.!?…。！？]++[\"'”’»)\]]*+(?=\s)|\n")
+
+
+def split_sentences(text: str) -> tuple[list[str], list[str]]:
+    """Split sentences
+
+    Split the text into sentences using a fast, regex based splitter. The whitespace
+    between the sentences is kept so that the translated sentences can be put back
+    together with the same layout.
+
+    Args:
+        text (str): The text to split
+
+    Returns:
+        tuple[list[str], list[str]]: The sentences and the whitespace around them.
+            There is one more piece of whitespace than there are sentences, the first
+            comes before the first sentence and the last after the last sentence
+    """
+    sentences = []
+    gaps = []
+    position = 0
+    start = 0
+
+    boundaries = [
+        match.start() if match.group() == "\n" else match.end()
+        for match in BOUNDARY_PATTERN.finditer(text)
+    ]
+    for end in boundaries + [len(text)]:
+        piece = text[start:end]
+        sentence = piece.strip()
+        if sentence:
+            sentence_start = start + len(piece) - len(piece.lstrip())
+            gaps.append(text[position:sentence_start])
+            sentences.append(sentence)
+            position = sentence_start + len(sentence)
+        start = end
+
+    gaps.append(text[position:])
+    return sentences, gaps
+
+
+def join_sentences(sentences: list[str], gaps: list[str]) -> str:
+    """Join sentences
+
+    The inverse of `split_sentences`
+
+    Args:
+        sentences (list[str]): The sentences
+        gaps (list[str]): The whitespace around the sentences
+
+    Returns:
+        str: The reassembled text
+    """
+    return "".join(
+        gap + sentence for gap, sentence in zip(gaps, sentences + [""], strict=True)
+    )
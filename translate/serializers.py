@@ -1,17 +1,78 @@
-from rest_framework.serializers import CharField, ModelSerializer
+from django.conf import settings
+from rest_framework.serializers import (
+    BooleanField,
+    CharField,
+    ChoiceField,
+    DateTimeField,
+    FloatField,
+    IntegerField,
+    ListField,
+    ModelSerializer,
+)
 from rest_framework.serializers import Serializer as DRFSerializer
 
 from translate.models import Translation
 
 
 class Deserializer(DRFSerializer):
-    text_to_be_translated = CharField(required=True)
+    text_to_be_translated = CharField(
+        required=True, max_length=settings.TRANSLATION_MAX_TEXT_LENGTH
+    )
     target_language_code = CharField(required=False)
     source_language_code = CharField(required=False)
     translator = CharField(required=False)
+    segment = BooleanField(required=False)
+
+
+class BatchDeserializer(DRFSerializer):
+    texts_to_be_translated = ListField(
+        child=CharField(),
+        allow_empty=False,
+        max_length=settings.TRANSLATION_BATCH_MAX_TEXTS,
+    )
+    target_language_code = CharField(required=False)
+    source_language_code = CharField(required=False)
+    translator = CharField(required=False)
+
+
+class ListFilterDeserializer(DRFSerializer):
+    source_language_code = CharField(required=False)
+    target_language_code = CharField(required=False)
+    translator = CharField(required=False)
+    created_after = DateTimeField(required=False)
+    created_before = DateTimeField(required=False)
+
+
+class ExportDeserializer(ListFilterDeserializer):
+    output = ChoiceField(choices=["ndjson", "csv"], default="ndjson")
+    compress = ChoiceField(choices=["gzip"], required=False)
+
+
+# The columns of an export and the field each one is read from
+EXPORT_FIELDS = {
+    "id": "id",
+    "source_text": "source_text",
+    "translated_text": "translated_text",
+    "translator": "translator",
+    "source_language": "source_language__code",
+    "target_language": "target_language__code",
+    "created_at": "created_at",
+}
 
 
 class Serializer(ModelSerializer):
     class Meta:
         model = Translation
-        fields = "__all__"
+        exclude = ["source_hash"]
+
+
+class FuzzyMatchSerializer(DRFSerializer):
+    source_text = CharField()
+    translated_text = CharField()
+    translator = CharField()
+    source_language = IntegerField()
+    target_language = IntegerField()
+    fuzzy = BooleanField()
+    similarity = FloatField()
+    matched_translation = IntegerField()
+    matched_source_text = CharField()
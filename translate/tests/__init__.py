@@ -1,3 +1,19 @@
+from translate.tests.batch import BatchTranslationTestCase
+from translate.tests.dispatcher import MicroBatcherTestCase
+from translate.tests.fuzzy import FuzzyMatcherTestCase
+from translate.tests.importer import TranslationImporterTestCase
 from translate.tests.managers import TanslationManagerTestCase
+from translate.tests.memory import TranslationMemoryTestCase
+from translate.tests.segmenter import SegmenterTestCase
+from translate.tests.views import TranslationListTestCase
 
-__all__ = [TanslationManagerTestCase]
+__all__ = [
+    FuzzyMatcherTestCase,
+    BatchTranslationTestCase,
+    MicroBatcherTestCase,
+    SegmenterTestCase,
+    TanslationManagerTestCase,
+    TranslationImporterTestCase,
+    TranslationListTestCase,
+    TranslationMemoryTestCase,
+]
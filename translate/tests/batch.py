@@ -0,0 +1,120 @@
+from typing import Self
+from unittest.mock import MagicMock, call, patch
+
+from django.test import TestCase
+
+from decyphr.exceptions import ProviderUnavailableException
+from languages.models import Language
+from translate.managers import TranslationManager
+from translate.memory import translation_memory
+from translate.models import Translation
+from translate.serializers import BatchDeserializer, Serializer
+from translate.translators import chunk_texts
+
+
+class BatchTranslationTestCase(TestCase):
+    def setUp(self: Self) -> None:
+        translation_memory.clear()
+        source_language = Language.language_manager.create(
+            name="Ireland English",
+            code="EN-IE",
+            short_code="EN",
+            description="Language spoken in Ireland",
+        )
+        target_language = Language.language_manager.create(
+            name="Brazilian Portuguese",
+            code="PT-BR",
+            short_code="PT",
+            description="Language spoken in Brazil",
+        )
+        Translation.objects.create(
+            source_text="Hello",
+            translated_text="Olá",
+            translator="deepl",
+            source_language=source_language,
+            target_language=target_language,
+        )
+        self.manager = TranslationManager(BatchDeserializer, Serializer)
+        self.data = {
+            "texts_to_be_translated": ["Goodbye", "Hello", "Yes", "Goodbye"],
+            "source_language_code": "en",
+            "target_language_code": "pt",
+            "translator": "deepl",
+        }
+
+    def test_chunk_texts(self: Self) -> None:
+        chunks = list(chunk_texts(["a", "bb", "ccc", "dddd", "e"], 2, 5))
+        self.assertEqual(chunks, [["a", "bb"], ["ccc"], ["dddd", "e"]])
+
+    @patch("translate.translators.admission")
+    @patch("translate.managers.get_translator")
+    def test_each_provider_call_is_admitted(
+        self: Self, mock_get_translator, mock_admission
+    ) -> None:
+        translator = MagicMock(max_batch_size=1, max_batch_characters=1000)
+        translator.get_translated_texts.side_effect = lambda texts, *args: texts
+        mock_get_translator.return_value = translator
+
+        self.manager.create_new_translations(self.data)
+
+        self.assertEqual(translator.get_translated_texts.call_count, 2)
+        self.assertEqual(
+            mock_admission.maybe_admit.call_args_list,
+            [call("translate.deepl"), call("translate.deepl")],
+        )
+
+    @patch("translate.managers.get_translator")
+    def test_create_new_translations(self: Self, mock_get_translator) -> None:
+        translator = MagicMock(max_batch_size=50, max_batch_characters=1000)
+        translator.get_translated_texts.return_value = ["Adeus", "Sim"]
+        mock_get_translator.return_value = translator
+
+        results = self.manager.create_new_translations(self.data)
+
+        translator.get_translated_texts.assert_called_once()
+        self.assertEqual(
+            translator.get_translated_texts.call_args.args[0], ["Goodbye", "Yes"]
+        )
+        self.assertEqual(
+            [result["translation"]["translated_text"] for result in results],
+            ["Adeus", "Olá", "Sim", "Adeus"],
+        )
+        self.assertEqual(
+            results[0]["translation"]["id"], results[3]["translation"]["id"]
+        )
+        self.assertEqual(Translation.objects.count(), 3)
+
+    @patch("translate.managers.get_translator")
+    def test_create_new_translations_reports_errors(
+        self: Self, mock_get_translator
+    ) -> None:
+        translations = {"Goodbye": "Adeus", "Yes": Exception("Throttled")}
+        translator = MagicMock(spec=["get_translated_text"])
+        translator.get_translated_text.side_effect = lambda text, *args: translations[
+            text
+        ]
+        mock_get_translator.return_value = translator
+
+        results = self.manager.create_new_translations(self.data)
+
+        self.assertEqual(results[0]["translation"]["translated_text"], "Adeus")
+        self.assertEqual(results[1]["translation"]["translated_text"], "Olá")
+        self.assertEqual(results[2], {"index": 2, "error": "Throttled"})
+
+    @patch("translate.managers.get_translator")
+    def test_create_new_translations_reports_refusals(
+        self: Self, mock_get_translator
+    ) -> None:
+        translator = MagicMock(spec=["get_translated_text"])
+        translator.get_translated_text.side_effect = ProviderUnavailableException(
+            "Too many requests are waiting.", 1
+        )
+        mock_get_translator.return_value = translator
+
+        results = self.manager.create_new_translations(self.data)
+
+        self.assertEqual(
+            results[0],
+            {"index": 0, "error": "Too many requests are waiting.", "retry_after": 1},
+        )
+        self.assertEqual(results[1]["translation"]["translated_text"], "Olá")
@@ -0,0 +1,121 @@
+import time
+from threading import Thread
+from typing import Self
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase
+
+from decyphr import deadlines
+from decyphr.exceptions import DeadlineExceededException
+from languages.models import Language
+from translate.dispatcher import MicroBatcher
+
+
+class MicroBatcherTestCase(SimpleTestCase):
+    def setUp(self: Self) -> None:
+        self.translator = MagicMock(max_batch_size=3, max_batch_characters=1000)
+        self.translator.get_translated_texts.side_effect = lambda texts, *args: [
+            text.upper() for text in texts
+        ]
+        self.target_language = Language(id=2, code="PT-BR", short_code="PT")
+        self.source_language = Language(id=1, code="EN-IE", short_code="EN")
+
+    def translate_concurrently(
+        self: Self,
+        batcher: MicroBatcher,
+        texts: list[str],
+        admission_name: str | None = None,
+    ) -> dict[str, str]:
+        results = {}
+
+        def translate(text: str) -> None:
+            results[text] = batcher.translate(
+                "deepl",
+                self.translator,
+                text,
+                self.target_language,
+                self.source_language,
+                admission_name=admission_name,
+            )
+
+        threads = [Thread(target=translate, args=(text,)) for text in texts]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_concurrent_requests_share_a_call(self: Self) -> None:
+        batcher = MicroBatcher(window=1)
+
+        results = self.translate_concurrently(batcher, ["a", "b", "c"])
+
+        self.assertEqual(results, {"a": "A", "b": "B", "c": "C"})
+        self.translator.get_translated_texts.assert_called_once()
+        self.assertEqual(batcher.stats()["max_batch_size"], 3)
+
+    @patch("translate.translators.admission")
+    def test_only_the_batch_call_is_admitted(self: Self, admission: MagicMock) -> None:
+        batcher = MicroBatcher(window=1)
+
+        results = self.translate_concurrently(
+            batcher, ["a", "b", "c"], admission_name="translate.deepl"
+        )
+
+        self.assertEqual(results, {"a": "A", "b": "B", "c": "C"})
+        admission.maybe_admit.assert_called_once_with("translate.deepl")
+
+    def test_batches_are_capped_at_the_provider_limits(self: Self) -> None:
+        batcher = MicroBatcher(window=0.05)
+
+        results = self.translate_concurrently(batcher, ["a", "b", "c", "d", "e"])
+
+        self.assertEqual(len(results), 5)
+        self.assertEqual(batcher.stats()["texts"], 5)
+        self.assertGreaterEqual(self.translator.get_translated_texts.call_count, 2)
+
+    def test_full_batches_dont_wait_for_the_window(self: Self) -> None:
+        batcher = MicroBatcher(window=10)
+
+        started = time.monotonic()
+        results = self.translate_concurrently(batcher, ["a", "b", "c"])
+
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(results, {"a": "A", "b": "B", "c": "C"})
+        self.translator.get_translated_texts.assert_called_once()
+
+    def test_errors_are_raised_to_each_request(self: Self) -> None:
+        self.translator.get_translated_texts.side_effect = ValueError("Throttled")
+        batcher = MicroBatcher(window=0)
+
+        with self.assertRaises(ValueError):
+            batcher.translate("deepl", self.translator, "a", self.target_language)
+
+    def test_calls_out_of_the_leaders_time_are_made_again(self: Self) -> None:
+        self.translator.get_translated_texts.side_effect = [
+            [DeadlineExceededException("translate.deepl")] * 2,
+            ["B"],
+        ]
+        batcher = MicroBatcher(window=0.2)
+        results = {}
+
+        def translate(text: str, timeout: float) -> None:
+            deadlines.deadline.set(time.monotonic() + timeout)
+            try:
+                results[text] = batcher.translate(
+                    "deepl", self.translator, text, self.target_language
+                )
+            except DeadlineExceededException as e:
+                results[text] = e.stage
+
+        leader = Thread(target=translate, args=("a", 0.1))
+        leader.start()
+        while not batcher.batches:
+            pass
+        follower = Thread(target=translate, args=("b", 10))
+        follower.start()
+        leader.join()
+        follower.join()
+
+        self.assertEqual(results, {"a": "translate.deepl", "b": "B"})
+        self.assertEqual(self.translator.get_translated_texts.call_count, 2)
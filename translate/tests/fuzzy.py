@@ -0,0 +1,169 @@
+import time
+from typing import Self
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from languages.models import Language
+from translate.fuzzy import FuzzyIndex, fuzzy_matcher
+from translate.managers import TranslationManager
+from translate.memory import translation_memory
+from translate.models import Translation
+from translate.serializers import Deserializer, Serializer
+
+
+class FuzzyMatcherTestCase(TestCase):
+    def setUp(self: Self) -> None:
+        translation_memory.clear()
+        fuzzy_matcher.clear()
+        self.addCleanup(fuzzy_matcher.clear)
+        self.source_language = Language.language_manager.create(
+            name="Ireland English",
+            code="EN-IE",
+            short_code="EN",
+            description="Language spoken in Ireland",
+        )
+        self.target_language = Language.language_manager.create(
+            name="Brazilian Portuguese",
+            code="PT-BR",
+            short_code="PT",
+            description="Language spoken in Brazil",
+        )
+        self.translation = Translation.objects.create(
+            source_text="Where is the nearest train station?",
+            translated_text="Onde fica a estação de trem mais próxima?",
+            translator="amazon",
+            source_language=self.source_language,
+            target_language=self.target_language,
+        )
+
+    def match(self: Self, text: str, translator: str = "amazon") -> object:
+        return fuzzy_matcher.match(
+            translator, text, self.target_language, self.source_language, 0.7
+        )
+
+    def test_near_duplicates_are_matched(self: Self) -> None:
+        for text in (
+            "where is the nearest train station",
+            "Where is the nearest train station!",
+            "Where is the closest train station?",
+        ):
+            match = self.match(text)
+
+            self.assertIsNotNone(match, text)
+            self.assertEqual(match.translation_id, self.translation.id)
+            self.assertGreaterEqual(match.similarity, 0.7)
+
+    def test_unrelated_texts_and_other_translators_are_not_matched(
+        self: Self,
+    ) -> None:
+        self.assertIsNone(self.match("I would like a cup of coffee"))
+        self.assertIsNone(self.match("Where is the nearest train station?", "deepl"))
+
+    def test_saved_translations_are_indexed(self: Self) -> None:
+        self.match("Warm up")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            translation = Translation.objects.create(
+                source_text="How much does a ticket to Dublin cost?",
+                translated_text="Quanto custa uma passagem para Dublin?",
+                translator="amazon",
+                source_language=self.source_language,
+                target_language=self.target_language,
+            )
+
+        with self.assertNumQueries(0):
+            match = self.match("How much does a ticket to Dublin cost")
+
+        self.assertEqual(match.translation_id, translation.id)
+
+    def test_rows_written_elsewhere_are_loaded_after_local_saves(
+        self: Self,
+    ) -> None:
+        self.match("Warm up")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Translation.objects.create(
+                id=self.translation.id + 100,
+                source_text="How much does a ticket to Dublin cost?",
+                translated_text="Quanto custa uma passagem para Dublin?",
+                translator="amazon",
+                source_language=self.source_language,
+                target_language=self.target_language,
+            )
+        (imported,) = Translation.objects.bulk_create(
+            [
+                Translation(
+                    id=self.translation.id + 1,
+                    source_text="What time does the museum open?",
+                    translated_text="A que horas abre o museu?",
+                    translator="amazon",
+                    source_language=self.source_language,
+                    target_language=self.target_language,
+                )
+            ]
+        )
+
+        with patch.object(fuzzy_matcher, "refresh_interval", 0):
+            match = self.match("What time does the museum open")
+
+        self.assertEqual(match.translation_id, imported.id)
+
+    def test_upserted_translations_are_reindexed(self: Self) -> None:
+        self.match("Warm up")
+        manager = TranslationManager(Deserializer, Serializer)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            manager._upsert(
+                [
+                    Translation(
+                        source_text=self.translation.source_text,
+                        source_hash=self.translation.source_hash,
+                        translated_text="Onde é a estação de comboios mais próxima?",
+                        translator="amazon",
+                        source_language=self.source_language,
+                        target_language=self.target_language,
+                    )
+                ]
+            )
+
+        match = self.match("Where is the nearest train station")
+        self.assertEqual(match.translation_id, self.translation.id)
+        self.assertEqual(
+            match.translated_text, "Onde é a estação de comboios mais próxima?"
+        )
+
+    def test_lookup_is_fast(self: Self) -> None:
+        index = FuzzyIndex()
+        for number in range(5000):
+            index.add(number, f"Order number {number} has been shipped", "")
+
+        started = time.perf_counter()
+        for number in range(100):
+            index.match(f"Order number {number} has been shipped!", 0.8)
+
+        self.assertLess((time.perf_counter() - started) / 100, 0.001)
+
+    @override_settings(TRANSLATION_FUZZY_THRESHOLD=0.7)
+    @patch("translate.managers.get_translator")
+    def test_manager_returns_the_match_flagged_as_fuzzy(
+        self: Self, mock_get_translator
+    ) -> None:
+        manager = TranslationManager(Deserializer, Serializer)
+
+        translation = manager.create_new_translation(
+            {
+                "text_to_be_translated": "Where is the nearest train station",
+                "target_language_code": "pt",
+                "source_language_code": "en",
+                "translator": "amazon",
+            }
+        )
+
+        mock_get_translator.assert_not_called()
+        self.assertTrue(translation.data["fuzzy"])
+        self.assertEqual(
+            translation.data["translated_text"], self.translation.translated_text
+        )
+        self.assertEqual(translation.data["matched_translation"], self.translation.id)
+        self.assertEqual(Translation.objects.count(), 1)
@@ -0,0 +1,118 @@
+import io
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Self
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from languages.models import Language
+from translate.importer import TranslationImporter, read_units
+from translate.memory import translation_memory
+from translate.models import Translation
+
+TMX = b"""<?xml version="1.0" encoding="UTF-8"?>
+<tmx version="1.4">
+  <header srclang="en" datatype="plaintext" segtype="sentence"/>
+  <body>
+    <tu>
+      <tuv xml:lang="en"><seg>Hello there</seg></tuv>
+      <tuv xml:lang="pt-BR"><seg>Ol\xc3\xa1</seg></tuv>
+    </tu>
+    <tu>
+      <tuv xml:lang="en"><seg>Good <bpt i="1">&lt;b&gt;</bpt>night</seg></tuv>
+      <tuv xml:lang="pt-BR"><seg>Boa noite</seg></tuv>
+      <tuv xml:lang="xx"><seg>Unknown</seg></tuv>
+    </tu>
+  </body>
+</tmx>
+"""
+
+CSV = (
+    "﻿source_language,source_text,target_language,translated_text,translator\n"
+    "en,Hello there,pt,Olá,\n"
+    "en,Hello   there,pt,Olá,\n"
+    "en,Thanks,pt,Obrigado,deepl\n"
+).encode("utf-8")
+
+
+class TranslationImporterTestCase(TestCase):
+    def setUp(self: Self) -> None:
+        translation_memory.clear()
+        self.source_language = Language.language_manager.create(
+            name="Ireland English",
+            code="EN-IE",
+            short_code="EN",
+            description="Language spoken in Ireland",
+        )
+        self.target_language = Language.language_manager.create(
+            name="Brazilian Portuguese",
+            code="PT-BR",
+            short_code="PT",
+            description="Language spoken in Brazil",
+        )
+
+    def test_tmx_is_imported(self: Self) -> None:
+        report = TranslationImporter("amazon", 1).run(
+            read_units(io.BytesIO(TMX), "tmx")
+        )
+
+        self.assertEqual(report.read, 3)
+        self.assertEqual(report.imported, 2)
+        self.assertEqual(report.unknown_language, 1)
+        self.assertEqual(
+            set(Translation.objects.values_list("source_text", "translated_text")),
+            {("Hello there", "Olá"), ("Good <b>night", "Boa noite")},
+        )
+
+    def test_imported_rows_are_served_from_memory(self: Self) -> None:
+        TranslationImporter("amazon", 100).run(read_units(io.BytesIO(TMX), "tmx"))
+
+        translated_text = translation_memory.lookup(
+            "amazon", "Hello there", self.target_language, self.source_language
+        )
+
+        self.assertEqual(translated_text, "Olá")
+
+    def test_duplicates_are_skipped(self: Self) -> None:
+        Translation.objects.create(
+            source_text="Thanks",
+            translated_text="Obrigado",
+            translator="deepl",
+            source_language=self.source_language,
+            target_language=self.target_language,
+        )
+
+        report = TranslationImporter("amazon", 100).run(
+            read_units(io.BytesIO(CSV), "csv")
+        )
+
+        self.assertEqual(report.read, 3)
+        self.assertEqual(report.imported, 1)
+        self.assertEqual(report.duplicates, 2)
+        self.assertEqual(Translation.objects.count(), 2)
+        self.assertEqual(
+            Translation.objects.get(source_text="Hello there").translator, "amazon"
+        )
+
+    def test_missing_columns_are_rejected(self: Self) -> None:
+        with self.assertRaises(ValueError):
+            list(read_units(io.BytesIO(b"source_text\tsource_language\n"), "tsv"))
+
+    def test_command_reports_throughput(self: Self) -> None:
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = Path(directory.name) / "memory.tsv"
+        path.write_bytes(CSV.replace(b",", b"\t"))
+        stdout = io.StringIO()
+
+        call_command(
+            "import_translations",
+            str(path),
+            translator="google",
+            batch_size=2,
+            stdout=stdout,
+        )
+
+        self.assertIn("2 imported, 1 duplicates skipped", stdout.getvalue())
+        self.assertEqual(Translation.objects.count(), 2)
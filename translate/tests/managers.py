@@ -1,9 +1,10 @@
 from typing import Self
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 from languages.models import Language
+from translate.exceptions import TranslationValidationException
 from translate.managers import TranslationManager
 from translate.models import Translation
 from translate.serializers import Deserializer, Serializer
@@ -44,13 +45,101 @@ class TanslationManagerTestCase(TestCase):
             "translator": "amazon",
         }
         actual_translation = manager.create_new_translation(data).data
+        self.assertIsNotNone(actual_translation.pop("created_at"))
 
         expected_translation = {
             "id": 2,
             "source_text": "Hello",
             "translated_text": "Hi",
+            "translator": "amazon",
             "source_language": 2,
             "target_language": 1,
         }
 
         self.assertEqual(actual_translation, expected_translation)
+
+    @patch("translate.views.TranslationManager._translate")
+    def test_create_new_translation_unknown_language(
+        self: Self, mock_translate
+    ) -> None:
+        manager = TranslationManager(Deserializer, Serializer)
+        data = {
+            "text_to_be_translated": "Hello",
+            "target_language_code": "xx",
+            "source_language_code": "en",
+            "translator": "amazon",
+        }
+
+        with self.assertRaises(TranslationValidationException) as context:
+            manager.create_new_translation(data)
+
+        self.assertIn("language_code", context.exception.errors)
+        mock_translate.assert_not_called()
+
+    @patch("translate.views.TranslationManager._translate")
+    def test_create_new_translation_upserts(self: Self, mock_translate) -> None:
+        manager = TranslationManager(Deserializer, Serializer)
+        data = {
+            "text_to_be_translated": "Hello",
+            "target_language_code": "pt",
+            "source_language_code": "en",
+            "translator": "amazon",
+        }
+
+        mock_translate.return_value = "Oi"
+        first = manager.create_new_translation(data).data
+        mock_translate.return_value = "Olá"
+        second = manager.create_new_translation(
+            {**data, "text_to_be_translated": " Hello "}
+        ).data
+
+        self.assertEqual(first["id"], second["id"])
+        self.assertEqual(Translation.objects.get(id=first["id"]).translated_text, "Olá")
+        self.assertEqual(Translation.objects.count(), 2)
+
+    @patch("translate.managers.get_translator")
+    async def test_async_view(self: Self, mock_get_translator) -> None:
+        mock_get_translator.return_value = MagicMock(spec=["get_translated_text"])
+        mock_get_translator.return_value.get_translated_text.return_value = "Bom dia"
+        data = {
+            "text_to_be_translated": "Good morning",
+            "target_language_code": "pt",
+            "source_language_code": "en",
+            "translator": "deepl",
+        }
+
+        response = await self.async_client.post(
+            "/translate/async/", data, content_type="application/json"
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["translated_text"], "Bom dia")
+        self.assertEqual(await Translation.objects.acount(), 2)
+
+    @override_settings(TRANSLATION_SEGMENT_THRESHOLD=20)
+    @patch("translate.managers.get_translator")
+    async def test_async_view_segments_long_texts(
+        self: Self, mock_get_translator
+    ) -> None:
+        mock_get_translator.return_value = MagicMock(spec=["get_translated_text"])
+        mock_get_translator.return_value.get_translated_text.side_effect = (
+            lambda text, *args: text.upper()
+        )
+        data = {
+            "text_to_be_translated": "Good morning. Good night.",
+            "target_language_code": "pt",
+            "source_language_code": "en",
+            "translator": "deepl",
+        }
+
+        response = await self.async_client.post(
+            "/translate/async/", data, content_type="application/json"
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            response.json()["translated_text"], "GOOD MORNING. GOOD NIGHT."
+        )
+        self.assertEqual(
+            mock_get_translator.return_value.get_translated_text.call_count, 2
+        )
@@ -0,0 +1,67 @@
+from typing import Self
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from languages.models import Language
+from translate.managers import TranslationManager
+from translate.memory import translation_memory
+from translate.models import Translation
+from translate.serializers import Deserializer, Serializer
+
+
+class TranslationMemoryTestCase(TestCase):
+    def setUp(self: Self) -> None:
+        translation_memory.clear()
+        self.target_language = Language.language_manager.create(
+            name="Brazilian Portuguese",
+            code="PT-BR",
+            short_code="PT",
+            description="Language spoken in Brazil",
+        )
+        self.source_language = Language.language_manager.create(
+            name="Ireland English",
+            code="EN-IE",
+            short_code="EN",
+            description="Language spoken in Ireland",
+        )
+        Translation.objects.create(
+            source_text="Hello there",
+            translated_text="Olá",
+            translator="amazon",
+            source_language=self.source_language,
+            target_language=self.target_language,
+        )
+
+    def test_lookup_falls_back_to_the_db(self: Self) -> None:
+        translated_text = translation_memory.lookup(
+            "amazon", "  Hello   there ", self.target_language, self.source_language
+        )
+
+        self.assertEqual(translated_text, "Olá")
+        self.assertEqual(translation_memory.stats()["database_hits"], 1)
+
+    def test_lookup_is_keyed_per_translator(self: Self) -> None:
+        translated_text = translation_memory.lookup(
+            "deepl", "Hello there", self.target_language, self.source_language
+        )
+
+        self.assertIsNone(translated_text)
+        self.assertEqual(translation_memory.stats()["misses"], 1)
+
+    @patch("translate.managers.get_translator")
+    def test_provider_is_only_called_on_a_miss(self: Self, mock_get_translator) -> None:
+        mock_get_translator.return_value.get_translated_text.return_value = "Oi"
+        manager = TranslationManager(Deserializer, Serializer)
+        data = {
+            "text_to_be_translated": "Hi",
+            "target_language_code": "pt",
+            "source_language_code": "en",
+            "translator": "google",
+        }
+
+        manager.create_new_translation(data)
+        manager.create_new_translation(data)
+
+        mock_get_translator.return_value.get_translated_text.assert_called_once()
+        self.assertEqual(translation_memory.stats()["memory_hits"], 1)
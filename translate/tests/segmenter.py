@@ -0,0 +1,88 @@
+import time
+from typing import Self
+from unittest.mock import MagicMock, patch
+
+from django.conf import settings
+from django.test import TestCase
+
+from languages.models import Language
+from translate.managers import TranslationManager
+from translate.memory import translation_memory
+from translate.models import Translation
+from translate.segmenter import join_sentences, split_sentences
+from translate.serializers import Deserializer, Serializer
+
+
+class SegmenterTestCase(TestCase):
+    def setUp(self: Self) -> None:
+        translation_memory.clear()
+        source_language = Language.language_manager.create(
+            name="Ireland English",
+            code="EN-IE",
+            short_code="EN",
+            description="Language spoken in Ireland",
+        )
+        target_language = Language.language_manager.create(
+            name="Brazilian Portuguese",
+            code="PT-BR",
+            short_code="PT",
+            description="Language spoken in Brazil",
+        )
+        Translation.objects.create(
+            source_text="Hello.",
+            translated_text="Olá.",
+            translator="google",
+            source_language=source_language,
+            target_language=target_language,
+        )
+
+    def test_split_sentences(self: Self) -> None:
+        text = "  Hello. How are you?\n\nFine thanks!  "
+        sentences, gaps = split_sentences(text)
+
+        self.assertEqual(sentences, ["Hello.", "How are you?", "Fine thanks!"])
+        self.assertEqual(join_sentences(sentences, gaps), text)
+
+    def test_split_sentences_with_long_runs_of_whitespace(self: Self) -> None:
+        text = "Hello." + " " * 100_000 + "How are you?" + "\n" * 100_000 + "Fine."
+        started = time.perf_counter()
+        sentences, gaps = split_sentences(text)
+
+        self.assertLess(time.perf_counter() - started, 1)
+        self.assertEqual(sentences, ["Hello.", "How are you?", "Fine."])
+        self.assertEqual(join_sentences(sentences, gaps), text)
+
+    def test_text_length_is_limited(self: Self) -> None:
+        deserializer = Deserializer(
+            data={
+                "text_to_be_translated": "a"
+                * (settings.TRANSLATION_MAX_TEXT_LENGTH + 1)
+            }
+        )
+
+        self.assertFalse(deserializer.is_valid())
+        self.assertIn("text_to_be_translated", deserializer.errors)
+
+    @patch("translate.managers.get_translator")
+    def test_only_new_sentences_are_translated(self: Self, mock_get_translator) -> None:
+        translator = MagicMock(max_batch_size=128, max_batch_characters=30_000)
+        translator.get_translated_texts.return_value = ["Como vai?"]
+        mock_get_translator.return_value = translator
+        manager = TranslationManager(Deserializer, Serializer)
+
+        translation = manager.create_new_translation(
+            {
+                "text_to_be_translated": "Hello.\nHow are you?",
+                "target_language_code": "pt",
+                "source_language_code": "en",
+                "translator": "google",
+                "segment": True,
+            }
+        )
+
+        translator.get_translated_texts.assert_called_once()
+        self.assertEqual(
+            translator.get_translated_texts.call_args.args[0], ["How are you?"]
+        )
+        self.assertEqual(translation.data["translated_text"], "Olá.\nComo vai?")
+        self.assertTrue(Translation.objects.filter(source_text="How are you?").exists())
@@ -0,0 +1,195 @@
+import csv
+import gzip
+import json
+import time
+from datetime import timedelta
+from typing import Self
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from decyphr.exceptions import ProviderUnavailableException
+from languages.models import Language
+from translate.models import Translation
+
+
+def translate_slowly(*args: str, **kwargs: str) -> None:
+    time.sleep(0.3)
+    raise TimeoutError()
+
+
+class TranslationListTestCase(TestCase):
+    def setUp(self: Self) -> None:
+        self.client = APIClient()
+        source_language = Language.language_manager.create(
+            name="Ireland English",
+            code="EN-IE",
+            short_code="EN",
+            description="Language spoken in Ireland",
+        )
+        target_languages = [
+            Language.language_manager.create(
+                name="Brazilian Portuguese",
+                code="PT-BR",
+                short_code="PT",
+                description="Language spoken in Brazil",
+            ),
+            Language.language_manager.create(
+                name="German",
+                code="DE",
+                short_code="DE",
+                description="Language spoken in Germany",
+            ),
+        ]
+        for index in range(5):
+            Translation.objects.create(
+                source_text=f"Hello {index}",
+                translated_text=f"Olá {index}",
+                translator="deepl",
+                source_language=source_language,
+                target_language=target_languages[index % 2],
+            )
+
+    def test_pages_are_keyset_paginated(self: Self) -> None:
+        response = self.client.get("/translate/", {"page_size": 2})
+        self.assertEqual(response.status_code, 200)
+        first_page = [result["source_text"] for result in response.data["results"]]
+
+        response = self.client.get(response.data["next"])
+        second_page = [result["source_text"] for result in response.data["results"]]
+
+        self.assertEqual(first_page, ["Hello 4", "Hello 3"])
+        self.assertEqual(second_page, ["Hello 2", "Hello 1"])
+
+    def test_filters(self: Self) -> None:
+        response = self.client.get(
+            "/translate/",
+            {
+                "target_language_code": "pt",
+                "created_after": (timezone.now() - timedelta(minutes=1)).isoformat(),
+            },
+        )
+        self.assertEqual(
+            [result["source_text"] for result in response.data["results"]],
+            ["Hello 4", "Hello 2", "Hello 0"],
+        )
+
+        response = self.client.get(
+            "/translate/", {"created_before": timezone.now() - timedelta(days=1)}
+        )
+        self.assertEqual(response.data["results"], [])
+
+    def test_filtered_pages_are_read_in_index_order(self: Self) -> None:
+        created_after = (timezone.now() - timedelta(minutes=1)).isoformat()
+
+        for params in (
+            {"target_language_code": "pt"},
+            {"translator": "deepl"},
+            {"created_after": created_after},
+        ):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get("/translate/", {**params, "page_size": 2})
+            self.assertEqual(response.status_code, 200)
+
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN QUERY PLAN {queries[-1]['sql']}")
+                plan = " ".join(row[-1] for row in cursor.fetchall())
+            self.assertIn("USING INDEX", plan)
+            self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_date_range_pages(self: Self) -> None:
+        created_after = (timezone.now() - timedelta(minutes=1)).isoformat()
+
+        response = self.client.get(
+            "/translate/", {"created_after": created_after, "page_size": 3}
+        )
+        first_page = [result["source_text"] for result in response.data["results"]]
+        response = self.client.get(response.data["next"])
+        second_page = [result["source_text"] for result in response.data["results"]]
+
+        self.assertEqual(first_page, ["Hello 4", "Hello 3", "Hello 2"])
+        self.assertEqual(second_page, ["Hello 1", "Hello 0"])
+
+    def test_unknown_language_code(self: Self) -> None:
+        response = self.client.get("/translate/", {"source_language_code": "xx"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_export(self: Self) -> None:
+        response = self.client.get("/translate/export/", {"target_language_code": "de"})
+
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        rows = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).splitlines()
+        ]
+        self.assertEqual(
+            [(row["source_text"], row["target_language"]) for row in rows],
+            [("Hello 1", "DE"), ("Hello 3", "DE")],
+        )
+
+    def test_export_gzipped_csv(self: Self) -> None:
+        response = self.client.get(
+            "/translate/export/", {"output": "csv", "compress": "gzip"}
+        )
+
+        self.assertEqual(
+            response["Content-Disposition"],
+            'attachment; filename="translations.csv.gz"',
+        )
+        rows = list(
+            csv.reader(
+                gzip.decompress(b"".join(response.streaming_content))
+                .decode("utf-8")
+                .splitlines()
+            )
+        )
+        self.assertEqual(rows[0][:3], ["id", "source_text", "translated_text"])
+        self.assertEqual(len(rows), 6)
+
+    @patch("translate.translators.deepl.get_deepl_translator")
+    def test_create_past_deadline(self: Self, get_deepl_translator) -> None:
+        get_deepl_translator.return_value.translate_text.side_effect = translate_slowly
+
+        response = self.client.post(
+            "/translate/",
+            {
+                "text_to_be_translated": "Goodbye",
+                "source_language_code": "EN-IE",
+                "target_language_code": "DE",
+                "translator": "deepl",
+            },
+            format="json",
+            headers={"X-Request-Timeout": "0.2"},
+        )
+
+        self.assertEqual(response.status_code, 504)
+        self.assertEqual(response.json()["stage"], "translate.deepl")
+
+    @patch("translate.translators.deepl.get_deepl_translator")
+    def test_create_while_provider_unavailable(
+        self: Self, get_deepl_translator
+    ) -> None:
+        translate_text = get_deepl_translator.return_value.translate_text
+        translate_text.side_effect = ProviderUnavailableException("Busy.", 7)
+        data = {
+            "text_to_be_translated": "Goodbye",
+            "source_language_code": "EN-IE",
+            "target_language_code": "DE",
+            "translator": "deepl",
+        }
+
+        for response in (
+            self.client.post("/translate/", data, format="json"),
+            self.client.post(
+                "/translate/async/",
+                json.dumps(data),
+                content_type="application/json",
+            ),
+        ):
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response.json(), {"detail": "Busy."})
+            self.assertTrue(response.has_header("Retry-After"))
@@ -1,5 +1,12 @@
+from functools import partial
+from typing import Iterator
+
 from django.conf import settings
 
+from decyphr.admission import admission
+from decyphr.deadlines import raise_exceeded
+from decyphr.executors import map_in_provider_executor
+from languages.models import Language
 from translate.translators.amazon import AmazonTranslator
 from translate.translators.deepl import DeeplTranslator
 from translate.translators.google import GoogleTranslator
@@ -16,3 +23,139 @@ translators = {
 
 def get_translator(name: str) -> TranslatorProtocol:
     return translators[name]
+
+
+def chunk_texts(
+    texts: list[str], max_size: int, max_characters: int
+) -> Iterator[list[str]]:
+    """Chunk texts
+
+    Split the texts into the largest consecutive chunks that stay within both the
+    maximum number of texts and the maximum number of characters. A single text that
+    is longer than `max_characters` is given a chunk of its own.
+
+    Args:
+        texts (list[str]): The texts to split
+        max_size (int): The maximum number of texts in a chunk
+        max_characters (int): The maximum number of characters in a chunk
+
+    Yields:
+        list[str]: The next chunk
+    """
+    chunk: list[str] = []
+    characters = 0
+
+    for text in texts:
+        if chunk and (
+            len(chunk) == max_size or characters + len(text) > max_characters
+        ):
+            yield chunk
+            chunk = []
+            characters = 0
+
+        chunk.append(text)
+        characters += len(text)
+
+    if chunk:
+        yield chunk
+
+
+def translate_text(
+    translator: TranslatorProtocol,
+    target_lang: Language,
+    source_lang: Language | None,
+    text: str,
+    admission_name: str | None = None,
+) -> str | Exception:
+    try:
+        with admission.maybe_admit(admission_name):
+            return translator.get_translated_text(text, target_lang, source_lang)
+    except Exception as e:
+        return e
+
+
+def translate_chunk(
+    translator: TranslatorProtocol,
+    target_lang: Language,
+    source_lang: Language | None,
+    chunk: list[str],
+    admission_name: str | None = None,
+) -> list[str | Exception]:
+    try:
+        with admission.maybe_admit(admission_name):
+            return translator.get_translated_texts(chunk, target_lang, source_lang)
+    except Exception as e:
+        return [e] * len(chunk)
+
+
+def translate_in_batches(
+    translator: TranslatorProtocol,
+    texts: list[str],
+    target_lang: Language,
+    source_lang: Language | None = None,
+    admission_name: str | None = None,
+) -> list[str | Exception]:
+    """Translate in batches
+
+    Translate the texts using the provider's multi-text API where it has one, making
+    as few calls as the provider's batch limits allow, and falling back to one call
+    per text for providers that don't. Up to `TRANSLATION_MAX_PARALLEL_BATCHES` of
+    the calls are made in parallel, each of which is admitted separately when
+    `admission_name` is given, so that they count towards the provider's concurrency.
+
+    A failed call does not fail the whole list. The exception raised is returned in
+    place of the translation of each text that was part of the failed call, unless
+    the call ran out of time before the request's deadline.
+
+    Args:
+        translator (TranslatorProtocol): The translator to use
+        texts (list[str]): The texts to translate
+        target_lang (Language): The language to translate to
+        source_lang (Language): The language to translate from
+        admission_name (str): The name the calls are admitted under, e.g.
+            `translate.amazon`
+
+    Returns:
+        list[str | Exception]: The translated texts, in the same order as `texts`
+
+    Raises:
+        DeadlineExceededException if the request's deadline passed
+    """
+    max_parallel = settings.TRANSLATION_MAX_PARALLEL_BATCHES
+
+    if not hasattr(translator, "get_translated_texts"):
+        results = map_in_provider_executor(
+            partial(
+                translate_text,
+                translator,
+                target_lang,
+                source_lang,
+                admission_name=admission_name,
+            ),
+            texts,
+            max_parallel,
+        )
+    else:
+        chunks = list(
+            chunk_texts(
+                texts, translator.max_batch_size, translator.max_batch_characters
+            )
+        )
+        results = [
+            result
+            for chunk_results in map_in_provider_executor(
+                partial(
+                    translate_chunk,
+                    translator,
+                    target_lang,
+                    source_lang,
+                    admission_name=admission_name,
+                ),
+                chunks,
+                max_parallel,
+            )
+            for result in chunk_results
+        ]
+
+    raise_exceeded(results)
+    return results
@@ -1,8 +1,10 @@
 # type: ignore
 from typing import Any, Self
 
-from boto3 import client
-
+from decyphr.clients import get_boto3_client
+from decyphr.deadlines import within_deadline
+from decyphr.executors import run_in_provider_executor
+from decyphr.ratelimit import rate_limiter
 from languages.models import Language
 
 
@@ -18,23 +20,24 @@ class AmazonTranslator:
         self.secret_key = aws_secret_access_key
         self.region = aws_region
 
+    def initialise_client(self: Self, timeout: float | None = None):
+        return get_boto3_client(
+            "translate", self.region, self.api_key, self.secret_key, timeout
+        )
+
     def translate(
         self: Self,
         text: str,
         target_lang: Language,
         source_lang: Language | None = None,
     ) -> Any:
-        translate = client(
-            "translate",
-            region_name=self.region,
-            aws_access_key_id=self.api_key,
-            aws_secret_access_key=self.secret_key,
-        )
-        return translate.translate_text(
-            Text=text,
-            TargetLanguageCode=target_lang.code,
-            SourceLanguageCode=source_lang.code,
-        )
+        with rate_limiter.metered("translate.amazon", len(text), self.region):
+            with within_deadline("translate.amazon") as timeout:
+                return self.initialise_client(timeout).translate_text(
+                    Text=text,
+                    TargetLanguageCode=target_lang.code,
+                    SourceLanguageCode=source_lang.code,
+                )
 
     def get_translated_text(
         self: Self,
@@ -45,3 +48,13 @@ class AmazonTranslator:
         return self.translate(
             text=text, target_lang=target_lang, source_lang=source_lang
         )["TranslatedText"]  # type: ignore
+
+    async def aget_translated_text(
+        self: Self,
+        text: str,
+        target_lang: Language,
+        source_lang: Language | None = None,
+    ) -> str:
+        return await run_in_provider_executor(
+            self.get_translated_text, text, target_lang, source_lang
+        )
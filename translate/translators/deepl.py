@@ -3,6 +3,10 @@ from typing import Any, Self
 
 from deepl import Translator
 
+from decyphr.clients import get_deepl_translator
+from decyphr.deadlines import within_deadline
+from decyphr.executors import run_in_provider_executor
+from decyphr.ratelimit import rate_limiter
 from languages.models import Language
 
 
@@ -15,20 +19,27 @@ class DeeplTranslator:
 
     api_key: str
     secret_key: str | None
+    max_batch_size: int = 50
+    max_batch_characters: int = 100_000
 
     def __init__(self: Self, api_key: str, secret_key: str | None = None) -> None:
         self.api_key = api_key
         self.secret = secret_key
 
+    def initialise_client(self: Self) -> Translator:
+        return get_deepl_translator(self.api_key)
+
     def translate(
         self: Self,
         text: str,
         target_lang: Language,
         source_lang: Language | None = None,
     ) -> Any:
-        return Translator(self.api_key).translate_text(
-            text, target_lang=target_lang.code
-        )
+        with rate_limiter.metered("translate.deepl", len(text)):
+            with within_deadline("translate.deepl"):
+                return self.initialise_client().translate_text(
+                    text, target_lang=target_lang.code
+                )
 
     def get_translated_text(
         self: Self,
@@ -37,3 +48,26 @@ class DeeplTranslator:
         source_lang: Language | None = None,
     ) -> str:
         return self.translate(text, target_lang=target_lang).text
+
+    async def aget_translated_text(
+        self: Self,
+        text: str,
+        target_lang: Language,
+        source_lang: Language | None = None,
+    ) -> str:
+        return await run_in_provider_executor(
+            self.get_translated_text, text, target_lang, source_lang
+        )
+
+    def get_translated_texts(
+        self: Self,
+        texts: list[str],
+        target_lang: Language,
+        source_lang: Language | None = None,
+    ) -> list[str]:
+        with rate_limiter.metered("translate.deepl", sum(map(len, texts))):
+            with within_deadline("translate.deepl"):
+                results = self.initialise_client().translate_text(
+                    texts, target_lang=target_lang.code
+                )
+        return [result.text for result in results]
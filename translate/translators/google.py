@@ -1,16 +1,20 @@
 # type: ignore
 from typing import Any, Self
 
-from django.conf import settings
 from google.cloud import translate_v2 as translate
-from google.oauth2 import service_account
 
+from decyphr.clients import DeadlineSession, get_google_credentials, registry
+from decyphr.deadlines import within_deadline
+from decyphr.executors import run_in_provider_executor
+from decyphr.ratelimit import rate_limiter
 from languages.models import Language
 
 
 class GoogleTranslator:
     api_key: str | None
     secret_key: str | None
+    max_batch_size: int = 128
+    max_batch_characters: int = 30_000
 
     def __init__(
         self: Self, api_key: str | None = None, secret_key: str | None = None
@@ -19,11 +23,12 @@ class GoogleTranslator:
         self.secret_key = secret_key
 
     def initialise_client(self: Self):
-        return translate.Client(
-            credentials=service_account.Credentials.from_service_account_file(
-                filename=settings.GOOGLE_CLOUD_CRED_FILE_NAME,
-                scopes=settings.GOOGLE_CLOUD_SCOPES,
-            )
+        return registry.get(
+            "google.translate",
+            lambda: translate.Client(
+                credentials=get_google_credentials(),
+                _http=DeadlineSession(get_google_credentials()),
+            ),
         )
 
     def translate(
@@ -32,11 +37,13 @@ class GoogleTranslator:
         target_lang: Language,
         source_lang: Language | None = None,
     ) -> Any:
-        return self.initialise_client().translate(
-            text,
-            target_language=target_lang.short_code,
-            source_language=source_lang.code,
-        )
+        with rate_limiter.metered("translate.google", len(text)):
+            with within_deadline("translate.google"):
+                return self.initialise_client().translate(
+                    text,
+                    target_language=target_lang.short_code,
+                    source_language=source_lang.code,
+                )
 
     def get_translated_text(
         self: Self,
@@ -47,3 +54,28 @@ class GoogleTranslator:
         return self.translate(
             text=text, target_lang=target_lang, source_lang=source_lang
         )["translatedText"]
+
+    async def aget_translated_text(
+        self: Self,
+        text: str,
+        target_lang: Language,
+        source_lang: Language | None = None,
+    ) -> str:
+        return await run_in_provider_executor(
+            self.get_translated_text, text, target_lang, source_lang
+        )
+
+    def get_translated_texts(
+        self: Self,
+        texts: list[str],
+        target_lang: Language,
+        source_lang: Language | None = None,
+    ) -> list[str]:
+        with rate_limiter.metered("translate.google", sum(map(len, texts))):
+            with within_deadline("translate.google"):
+                results = self.initialise_client().translate(
+                    texts,
+                    target_language=target_lang.short_code,
+                    source_language=source_lang.code,
+                )
+        return [result["translatedText"] for result in results]
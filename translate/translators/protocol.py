@@ -7,6 +7,8 @@ from languages.models import Language
 class TranslatorProtocol(Protocol):
     api_key: str
     secret_key: str | None
+    max_batch_size: int
+    max_batch_characters: int
 
     def translate(
         self: Self,
@@ -58,3 +60,53 @@ class TranslatorProtocol(Protocol):
         Returns:
             str: The translated text
         """
+
+    async def aget_translated_text(
+        self: Self,
+        text: str,
+        target_lang: Language,
+        source_lang: Language | None = None,
+    ) -> str:
+        """Get translated text
+
+        Async equivalent of `get_translated_text`. Implementations must not block the
+        event loop while waiting on the provider.
+
+        Args:
+            text (str): Text to translate
+            target_lang (Language): The Language record containing the relevant data
+                for the target language
+            source_lang (Language): The Language record containing the relevant data
+                for the source language
+
+        Returns:
+            str: The translated text
+        """
+
+    def get_translated_texts(
+        self: Self,
+        texts: list[str],
+        target_lang: Language,
+        source_lang: Language | None = None,
+    ) -> list[str]:
+        """Get translated texts
+
+        Translate a list of texts to the provided target language in a single call to
+        the provider and return the translated text strings in the same order.
+
+        This is optional. Providers without a multi-text API can leave it out and
+        `translate.translators.translate_in_batches` will fall back to calling
+        `get_translated_text` for each text. Providers that implement it should also
+        set `max_batch_size` and `max_batch_characters` to the largest batch the
+        provider accepts.
+
+        Args:
+            texts (list[str]): Texts to translate
+            target_lang (Language): The Language record containing the relevant data
+                for the target language
+            source_lang (Language): The Language record containing the relevant data
+                for the source language
+
+        Returns:
+            list[str]: The translated texts
+        """
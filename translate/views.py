@@ -1,22 +1,44 @@
 # type: ignore
+import json
 from typing import Self
 
-from django.http import Http404
+from django.http import Http404, HttpRequest, JsonResponse, StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 from rest_framework import status
+from rest_framework.decorators import action
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
+from decyphr.errors import json_error_response
+from decyphr.exceptions import DeadlineExceededException, ProviderUnavailableException
+from decyphr.pagination import KeysetPagination
+from idempotency.keys import idempotent
+from jobs.views import submit_job
+
 from .exceptions import TranslationValidationException
 from .managers import TranslationManager
+from .memory import translation_memory
 from .models import Translation
-from .serializers import Deserializer, Serializer
+from .serializers import (
+    BatchDeserializer,
+    Deserializer,
+    ExportDeserializer,
+    ListFilterDeserializer,
+    Serializer,
+)
 
 
 class TranslationViewSet(ModelViewSet):
     queryset = Translation.objects.all()
     deserializer_class = Deserializer
+    batch_deserializer_class = BatchDeserializer
+    list_filter_deserializer_class = ListFilterDeserializer
+    export_deserializer_class = ExportDeserializer
     serializer_class = Serializer
+    pagination_class = KeysetPagination
     manager = TranslationManager
 
     def _get_object(self: Self, pk: int) -> Translation:
@@ -60,6 +82,7 @@ class TranslationViewSet(ModelViewSet):
         """
         return Response(self.serializer_class(self._get_object(pk)).data)
 
+    @idempotent("translate")
     def create(self: Self, request: Request) -> Response:
         """Create
 
@@ -67,6 +90,23 @@ class TranslationViewSet(ModelViewSet):
         language specified. Then creates the record and returns the translation info
         to the client
 
+        With fuzzy matching enabled, the translation of a similar enough text that
+        has been translated before may be returned instead. It is flagged with
+        `"fuzzy": true`, along with its `similarity` and the `matched_source_text`,
+        and no record is created
+
+        Requests are `interactive` unless the `X-Priority: bulk` header, or an API
+        key in `PRIORITY_API_KEYS`, says otherwise. Bulk requests queue behind
+        interactive ones for the provider
+
+        The `X-Request-Timeout` header sets how many seconds the client will wait,
+        overriding the default for the endpoint. Work that can't finish in time is
+        abandoned
+
+        Requests with an `Idempotency-Key` header are safe to retry: a retry with the
+        same key gets the first response back, flagged with the
+        `Idempotent-Replayed` header, rather than translating the text again
+
         Args:
             request.data (dict[str, str]):
                 text_to_be_translated (str): The text to be translated
@@ -76,10 +116,19 @@ class TranslationViewSet(ModelViewSet):
                     translate the text to
                 translator (str): The name of the translator to use to translate the
                     text
+                segment (bool): Translate the text sentence by sentence, so that only
+                    sentences that haven't been translated before are sent to the
+                    translator. Always done for texts over
+                    `TRANSLATION_SEGMENT_THRESHOLD` characters
 
         Returns:
             Response: 201 if the request completes successfully
             Response: 400 if the data cannot be validated
+            Response: 503 if no translator is available right now
+            Response: 504 if the request's deadline passed, naming the stage
+            Response: 409 if a request with the same `Idempotency-Key` is still
+                running
+            Response: 422 if the `Idempotency-Key` was used for a different request
 
         Example Usage:
             echo '{
@@ -108,57 +157,234 @@ class TranslationViewSet(ModelViewSet):
 
         return Response(translation.data, status=status.HTTP_201_CREATED)
 
-    def list(self: Self, request: Request) -> Response:
-        """List
+    @action(detail=False, methods=["post"])
+    def batch(self: Self, request: Request) -> Response:
+        """Batch
 
-        Gets a full list of all Translations in the DB
+        Accepts a list of texts and language codes and translates all of the texts
+        to the language specified, using as few calls to the translation provider as
+        possible. Then creates the records and returns the translation info for each
+        text to the client, in the same order as the texts were provided
+
+        Args:
+            request.data (dict):
+                texts_to_be_translated (list[str]): The texts to be translated
+                source_language_code (str): The ISO representation of the language of
+                    the texts to translate
+                target_language_code (str): The ISO representation of the language to
+                    translate the texts to
+                translator (str): The name of the translator to use to translate the
+                    texts
 
         Returns:
-            Response: 200 with all Translation records if successful
+            Response: 201 if every text was translated successfully
+            Response: 207 if some of the texts could not be translated
+            Response: 400 if the data cannot be validated
+            Response: 503 if the translator is busy
+            Response: 504 if the request's deadline passed, naming the stage
 
         Example Usage:
-            http GET http://127.0.0.1:8000/translate/
+            echo '{
+                "texts_to_be_translated": ["Hello", "Goodbye"],
+                "target_language_code": "PT-BR",
+                "translator": "deepl"
+            }' |  \
+            http POST http://127.0.0.1:8000/translate/batch/ \
+            Content-Type:application/json
 
         Example Response:
             [
                 {
-                    "id": 1,
-                    "source_text": "Hello",
-                    "translated_text": "Ola"
+                    "index": 0,
+                    "translation": {
+                        "id": 8,
+                        "source_text": "Hello",
+                        "translated_text": "Olá",
+                        "translator": "deepl",
+                        "source_language": 1,
+                        "target_language": 2
+                    }
                 },
                 {
-                    "id": 2,
-                    "source_text": "Hello",
-                    "translated_text": "Ola"
-                },
-                {
-                    "id": 3,
-                    "source_text": "Hello",
-                    "translated_text": "Olá"
-                },
-                {
-                    "id": 4,
-                    "source_text": "Hello",
-                    "translated_text": "Olá"
-                },
-                {
-                    "id": 5,
-                    "source_text": "Hello",
-                    "translated_text": "Olá"
-                },
-                {
-                    "id": 6,
-                    "source_text": "Hello",
-                    "translated_text": "Olá"
-                },
-                {
-                    "id": 7,
-                    "source_text": "Hello",
-                    "translated_text": "Olá"
+                    "index": 1,
+                    "error": "Too many requests, DeepL servers are currently
+                        experiencing high load"
                 }
             ]
         """
-        return Response(self.get_serializer(self.queryset, many=True).data)
+        manager = self.manager(
+            deserializer=self.batch_deserializer_class,
+            serializer=self.serializer_class,
+        )
+
+        try:
+            results = manager.create_new_translations(request_data=request.data)
+        except TranslationValidationException as e:
+            return Response(e.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        if any("error" in result for result in results):
+            return Response(results, status=status.HTTP_207_MULTI_STATUS)
+        return Response(results, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=["post"])
+    def jobs(self: Self, request: Request) -> Response:
+        """Jobs
+
+        Accepts the same data as `create`, for documents too long to be translated
+        within a request. The document is translated in the background by the
+        `run_jobs` workers, and the job is returned straight away so that the client
+        can poll `/jobs/<id>/` for its progress and, once it is done, the translation
+
+        Returns:
+            Response: 202 with the queued job
+            Response: 400 if the data cannot be validated
+
+        Example Usage:
+            echo '{
+                "text_to_be_translated": "Chapter 1 ...",
+                "target_language_code": "PT-BR"
+            }' |  \
+            http POST http://127.0.0.1:8000/translate/jobs/ \
+            Content-Type:application/json
+
+        Example Response:
+            {
+                "id": 3,
+                "kind": "translate",
+                "status": "queued",
+                "chunks_done": 0,
+                "chunks_total": 5,
+                ...
+            }
+        """
+        return submit_job("translate", request)
+
+    def list(self: Self, request: Request) -> Response:
+        """List
+
+        Gets a page of the Translations in the DB, newest first. Follow the `next`
+        link to get the next page.
+
+        Args:
+            request.query_params (dict[str, str]):
+                source_language_code (str): Only list translations from this language
+                target_language_code (str): Only list translations to this language
+                translator (str): Only list translations made by this translator
+                created_after (str): Only list translations created at or after this
+                    ISO 8601 date/time
+                created_before (str): Only list translations created before this
+                    ISO 8601 date/time
+                page_size (int): The number of translations per page, up to 1000
+                cursor (str): The position of the page, taken from a `next` or
+                    `previous` link
+
+        Returns:
+            Response: 200 with a page of Translation records if successful
+            Response: 400 if the filters cannot be validated
+
+        Example Usage:
+            http GET "http://127.0.0.1:8000/translate/?target_language_code=pt&page_size=2"
+
+        Example Response:
+            {
+                "next": "http://127.0.0.1:8000/translate/?cursor=cD03&page_size=2",
+                "previous": null,
+                "results": [
+                    {
+                        "id": 9,
+                        "source_text": "Hello",
+                        "translated_text": "Olá",
+                        "translator": "deepl",
+                        "source_language": 1,
+                        "target_language": 2,
+                        "created_at": "2024-04-12T10:00:00Z"
+                    },
+                    {
+                        "id": 8,
+                        "source_text": "Goodbye",
+                        "translated_text": "Adeus",
+                        "translator": "deepl",
+                        "source_language": 1,
+                        "target_language": 2,
+                        "created_at": "2024-04-12T09:58:00Z"
+                    }
+                ]
+            }
+        """
+        manager = self.manager(
+            deserializer=self.list_filter_deserializer_class,
+            serializer=self.serializer_class,
+        )
+
+        try:
+            queryset = manager.filter_translations(self.queryset, request.query_params)
+        except TranslationValidationException as e:
+            return Response(e.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+    @action(detail=False, methods=["get"])
+    def export(self: Self, request: Request) -> StreamingHttpResponse | Response:
+        """Export
+
+        Streams every Translation matching the filters, oldest first, as the rows
+        are read from the DB. Use this rather than paging through the list to pull
+        the whole table.
+
+        Args:
+            request.query_params (dict[str, str]):
+                output (str): `ndjson` (the default) for one JSON object per line,
+                    or `csv`
+                compress (str): `gzip` to compress the export
+                source_language_code, target_language_code, translator,
+                created_after, created_before: See `list`
+
+        Returns:
+            StreamingHttpResponse: 200 with the export
+            Response: 400 if the query params cannot be validated
+
+        Example Usage:
+            http --download GET "http://127.0.0.1:8000/translate/export/?output=csv&compress=gzip"
+
+        Example Response:
+            {"id": 1, "source_text": "Hello", "translated_text": "Olá", "translator": "deepl", "source_language": "EN-IE", "target_language": "PT-BR", "created_at": "2024-04-12T10:00:00Z"}
+            {"id": 2, "source_text": "Goodbye", "translated_text": "Adeus", "translator": "deepl", "source_language": "EN-IE", "target_language": "PT-BR", "created_at": "2024-04-12T10:01:00Z"}
+        """
+        manager = self.manager(
+            deserializer=self.export_deserializer_class,
+            serializer=self.serializer_class,
+        )
+
+        try:
+            return manager.export_translations(self.queryset, request.query_params)
+        except TranslationValidationException as e:
+            return Response(e.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    @action(detail=False, methods=["get"])
+    def memory(self: Self, request: Request) -> Response:
+        """Memory
+
+        Reports the hit/miss counters of the translation memory for the process
+        handling the request
+
+        Returns:
+            Response: 200 with the translation memory stats
+
+        Example Usage:
+            http GET http://127.0.0.1:8000/translate/memory/
+
+        Example Response:
+            {
+                "hits": 12,
+                "memory_hits": 9,
+                "database_hits": 3,
+                "misses": 4,
+                "size": 7,
+                "max_size": 10000
+            }
+        """
+        return Response(translation_memory.stats())
 
     def delete(self: Self, request: Request, pk: int) -> Response:
         """Delete
@@ -176,3 +402,54 @@ class TranslationViewSet(ModelViewSet):
         """
         self._get_object(pk).delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncTranslationView(View):
+    deserializer_class = Deserializer
+    serializer_class = Serializer
+    manager = TranslationManager
+
+    async def post(self: Self, request: HttpRequest) -> JsonResponse:
+        """Post
+
+        Async equivalent of `TranslationViewSet.create`. When served over ASGI the
+        request does not hold a thread while waiting on the translation provider.
+
+        Args:
+            request.body (dict[str, str]): See `TranslationViewSet.create`
+
+        Returns:
+            JsonResponse: 201 if the request completes successfully
+            JsonResponse: 400 if the data cannot be validated
+            JsonResponse: 503 if the translator is busy
+            JsonResponse: 504 if the request's deadline passed, naming the stage
+
+        Example Usage:
+            echo '{
+                "text_to_be_translated": "Hello",
+                "target_language_code": "PT-BR"
+            }' |  \
+            http POST http://127.0.0.1:8000/translate/async/ \
+            Content-Type:application/json
+        """
+        try:
+            request_data = json.loads(request.body)
+        except ValueError:
+            return JsonResponse({"detail": "JSON parse error"}, status=400)
+
+        manager = self.manager(
+            deserializer=self.deserializer_class,
+            serializer=self.serializer_class,
+        )
+
+        try:
+            translation = await manager.acreate_new_translation(
+                request_data=request_data
+            )
+        except TranslationValidationException as e:
+            return JsonResponse(e.errors, status=400)
+        except (ProviderUnavailableException, DeadlineExceededException) as e:
+            return json_error_response(e)
+
+        return JsonResponse(translation.data, status=201)